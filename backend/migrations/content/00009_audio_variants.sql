@@ -0,0 +1,12 @@
+-- depends: 00001_audios
+CREATE TABLE audio_variants (
+    id VARCHAR(36) NOT NULL,
+    audio_id VARCHAR(36) NOT NULL,
+    format VARCHAR(20) NOT NULL,
+    url VARCHAR(255) NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY (audio_id) REFERENCES audios(id),
+    CONSTRAINT uc_audio_variants_audio_format UNIQUE (audio_id, format),
+    CONSTRAINT uc_audio_variants_url UNIQUE (url)
+);
@@ -1,37 +1,208 @@
-from fastapi import APIRouter, Response
-from src.exceptions.http import HTTPWrongAttributesException, WrongArgumentException
+import os
+from dataclasses import asdict
+
+from anyio import to_thread
+from fastapi import APIRouter, Depends, Header, Request, Response, status
+from fastapi.responses import FileResponse
+from src.config.audio import source_audio_format
+from src.config.aws import aws_config
+from src.config.runtime import USES_LOCAL_AUDIO_FILES
+from src.dependencies.conditional import conditional_get, is_not_modified
+from src.exceptions.http import (
+    HTTPSNotFoundException,
+    HTTPWrongAttributesException,
+    NotFoundException,
+    WrongArgumentException,
+)
 from src.logger import get_logger
+from src.models.database import (
+    AudioVariants,
+    Stories,
+    StoryAudioMetadata,
+    StoryChunkAudioMetadata,
+    StoryChunks,
+)
 from src.models.uuid4str import UUID4Str
+from src.modules.audio_cache import audio_cache, cached_audio_response
 
 from .models import AudioMetadata
-from .service import load_audio_bytes, load_metadata, load_sentence_metadata
+from .service import (
+    audio_format_of,
+    get_audio_path,
+    get_variant_filename,
+    load_cached_audio,
+    load_metadata,
+    load_sentence_metadata,
+    negotiate_audio_format,
+    presigned_url_cache,
+)
 
 router = APIRouter(prefix="/audio")
 logger = get_logger()
 
+# The presigned S3 urls in the metadata expire, the ETags roll over well before (the urls
+# handed out stay valid for aws_config.presigned_url_min_remaining_s at least), and with
+# the urls when they are signed by window
+metadata_valid_for_s = (
+    None if USES_LOCAL_AUDIO_FILES else aws_config.presigned_url_window_s or 600
+)
+# Audio files are named by a uuid, and never rewritten, a WAV url may serve a variant
+audio_file_headers = {
+    "cache-control": "public, max-age=31536000, immutable",
+    "vary": "Accept",
+}
+# A WAV served in place of a variant not transcoded yet, the url serves it once it is
+pending_variant_headers = {
+    "cache-control": "public, max-age=300",
+    "vary": "Accept",
+}
+
 
-@router.get("/metadata", response_model=AudioMetadata)
-async def get_metadata(story_id: UUID4Str, speed: int) -> AudioMetadata:
-    logger.info(f"On GET /audio/metadata with {story_id=}, {speed=}")
+@router.get(
+    "/metadata",
+    response_model=AudioMetadata,
+    dependencies=[
+        Depends(
+            conditional_get(
+                StoryAudioMetadata,
+                Stories,
+                AudioVariants,
+                vary=("Accept",),
+                valid_for_s=metadata_valid_for_s,
+            )
+        )
+    ],
+)
+async def get_metadata(
+    story_id: UUID4Str,
+    speed: int,
+    format: str | None = None,
+    accept: str | None = Header(default=None),
+) -> AudioMetadata:
+    logger.info(f"On GET /audio/metadata with {story_id=}, {speed=}, {format=}")
 
     try:
-        return await load_metadata(story_id=story_id, speed=speed)
+        return await load_metadata(
+            story_id=story_id,
+            speed=speed,
+            audio_format=negotiate_audio_format(accept, format),
+        )
     except WrongArgumentException as e:
         raise HTTPWrongAttributesException(str(e))
 
 
-@router.get("/metadata/sentence", response_model=list[AudioMetadata])
-async def get_sentence_metadata(story_id: UUID4Str, speed: int) -> list[AudioMetadata]:
-    logger.info(f"On GET /audio/metadata/sentence with {story_id=}, {speed=}")
+@router.get(
+    "/metadata/sentence",
+    response_model=list[AudioMetadata],
+    dependencies=[
+        Depends(
+            conditional_get(
+                StoryChunkAudioMetadata,
+                Stories,
+                StoryChunks,
+                AudioVariants,
+                vary=("Accept",),
+                valid_for_s=metadata_valid_for_s,
+            )
+        )
+    ],
+)
+async def get_sentence_metadata(
+    story_id: UUID4Str,
+    speed: int,
+    format: str | None = None,
+    accept: str | None = Header(default=None),
+) -> list[AudioMetadata]:
+    logger.info(
+        f"On GET /audio/metadata/sentence with {story_id=}, {speed=}, {format=}"
+    )
 
     try:
-        return await load_sentence_metadata(story_id=story_id, speed=speed)
+        return await load_sentence_metadata(
+            story_id=story_id,
+            speed=speed,
+            audio_format=negotiate_audio_format(accept, format),
+        )
     except WrongArgumentException as e:
         raise HTTPWrongAttributesException(str(e))
 
 
-@router.get("/{filename}", response_class=Response)
-async def get_audio(filename: str):
-    logger.info(f"On GET /audio/{{filename}} with {filename=}")
-    audio_bytes = await load_audio_bytes(filename)
-    return Response(content=audio_bytes, media_type="audio/wav")
+@router.get("/cache-stats")
+async def cache_stats() -> dict[str, dict[str, float]]:
+    audio_file_cache = audio_cache.stats()
+    url_cache = presigned_url_cache.stats()
+    return dict(
+        audio_cache=dict(
+            **asdict(audio_file_cache), hit_ratio=audio_file_cache.hit_ratio
+        ),
+        presigned_url_cache=dict(**asdict(url_cache), hit_ratio=url_cache.hit_ratio),
+    )
+
+
+@router.get("/{filename}", response_class=FileResponse)
+async def get_audio(
+    request: Request, filename: str, format: str | None = None
+) -> Response:
+    logger.info(f"On GET /audio/{{filename}} with {filename=}, {format=}")
+
+    try:
+        audio_format = negotiate_audio_format(request.headers.get("accept"), format)
+        variant = await get_variant_filename(filename, audio_format)
+        cached = await load_cached_audio(variant)
+    except WrongArgumentException as e:
+        raise HTTPWrongAttributesException(str(e))
+    except NotFoundException as e:
+        raise HTTPSNotFoundException(str(e))
+    headers = (
+        pending_variant_headers
+        if variant == filename
+        and audio_format not in (None, source_audio_format)
+        and audio_format_of(filename) == source_audio_format
+        else audio_file_headers
+    )
+    filename = variant
+    media_type = audio_format_of(filename).media_types[0]
+
+    if cached is not None:
+        if is_not_modified(request.headers, cached.etag, cached.mtime):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={
+                    "etag": cached.etag,
+                    "last-modified": cached.last_modified,
+                    **headers,
+                },
+            )
+        response = cached_audio_response(
+            request.headers, cached, media_type=media_type, headers=headers
+        )
+        # Multiple ranges are left to the FileResponse
+        if response is not None:
+            return response
+
+    try:
+        path = get_audio_path(filename)
+        stat_result = await to_thread.run_sync(os.stat, path)
+    except WrongArgumentException as e:
+        raise HTTPWrongAttributesException(str(e))
+    except NotFoundException as e:
+        raise HTTPSNotFoundException(str(e))
+    except FileNotFoundError:
+        # Removed since it was resolved
+        raise HTTPSNotFoundException(f"no audio file for {filename=}")
+    # Streamed in bounded chunks (or handed to the server with pathsend), honoring Range
+    response = FileResponse(
+        path,
+        media_type=media_type,
+        stat_result=stat_result,
+        headers=headers,
+    )
+    if is_not_modified(request.headers, response.headers["etag"], stat_result.st_mtime):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={
+                k: response.headers[k]
+                for k in ("etag", "last-modified", "cache-control", "vary")
+            },
+        )
+    return response
@@ -1,106 +1,245 @@
-from src.clients.aws import S3Client
-from src.clients.sqlite import SQLiteClient, SqliteIdNotFoundError
+from pathlib import Path
+from typing import Iterable
+
+from anyio import to_thread
+from src.clients.aws import PresignedUrlCache, get_s3_client
+from src.clients.sqlite import AsyncSQLiteClient
+from src.config.audio import AudioFormat, audio_formats, source_audio_format
 from src.config.aws import aws_config
 from src.config.path import path_config
 from src.config.runtime import USES_LOCAL_AUDIO_FILES
-from src.exceptions.http import WrongArgumentException
+from src.exceptions.http import NotFoundException, WrongArgumentException
 from src.logger import get_logger
 from src.models.database import (
-    Audios,
+    AudioVariants,
     Stories,
-    StoryAudios,
-    StoryChunkAudios,
+    StoryAudioMetadata,
+    StoryChunkAudioMetadata,
     StoryChunks,
+    WanikaniStories,
 )
 from src.models.uuid4str import UUID4Str
+from src.modules.audio_cache import CachedAudio, audio_cache
 
 from .models import AudioMetadata
 
 logger = get_logger()
 
 
-## TODO: async
+presigned_url_cache = PresignedUrlCache(
+    maxsize=aws_config.presigned_url_cache_size,
+    min_remaining_s=aws_config.presigned_url_min_remaining_s,
+    window_s=aws_config.presigned_url_window_s,
+)
+
+
 def get_audio_url(audio_url: str) -> str:
     if USES_LOCAL_AUDIO_FILES:
         return f"/api/audio/{audio_url}"
 
-    s3 = S3Client()
-    try:
-        return s3.presigned_url(
-            bucket=aws_config.s3_buckets.japanese_dictation,
-            prefix="audio",
-            filename=audio_url,
-        )
-    finally:
-        s3.close()
+    # Presigning is local, no request to S3 is sent
+    return presigned_url_cache.presigned_url(
+        s3=get_s3_client(),
+        bucket=aws_config.s3_buckets.japanese_dictation,
+        prefix="audio",
+        filename=audio_url,
+        expires_in_s=aws_config.presigned_url_expires_in_s,
+    )
+
 
+def negotiate_audio_format(
+    accept: str | None, format: str | None = None
+) -> AudioFormat | None:
+    """
+    Format named by the format parameter, else the preferred one among the audio types
+    listed in Accept. None if neither names one, wildcards do not.
+    """
+    if format is not None:
+        try:
+            return audio_formats[format.upper()]
+        except KeyError:
+            raise WrongArgumentException(f"unsupported audio {format=}")
+    if not accept:
+        return None
+
+    qualities: dict[str, float] = dict()
+    for part in accept.split(","):
+        media_type, *params = (p.strip() for p in part.split(";"))
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[media_type.lower()] = q
+
+    best, best_q = None, 0.0
+    for audio_format in audio_formats.values():
+        q = max(qualities.get(t, 0.0) for t in audio_format.media_types)
+        if q > best_q:
+            best, best_q = audio_format, q
+    return best
+
+
+def audio_format_of(filename: str) -> AudioFormat:
+    suffix = Path(filename).suffix.lower()
+    for audio_format in audio_formats.values():
+        if audio_format.extension == suffix:
+            return audio_format
+    return source_audio_format
+
+
+async def load_audio_urls(
+    sqlite: AsyncSQLiteClient, audios: list[dict], audio_format: AudioFormat | None
+) -> list[str]:
+    """
+    Urls of the audio_format variants of the audios, the original url of the ones without.
+    """
+    if audio_format is None or audio_format == source_audio_format:
+        return [get_audio_url(a["audio_url"]) for a in audios]
+
+    variants = {
+        v["audio_id"]: v["url"]
+        for v in await sqlite.select_rows(
+            table=AudioVariants,
+            columns=["audio_id", "url"],
+            cond_in=dict(audio_id=[a["audio_id"] for a in audios]),
+            cond_equal=dict(format=audio_format.name),
+        )
+    }
+    return [get_audio_url(variants.get(a["audio_id"], a["audio_url"])) for a in audios]
 
-async def load_metadata(story_id: UUID4Str, speed: int) -> AudioMetadata:
-    sqlite = SQLiteClient(logger)
 
-    try:
-        story = sqlite.select_by_id(table=Stories, id=story_id)
-    except SqliteIdNotFoundError:
-        raise WrongArgumentException(f"no story found for {story_id=}")
+async def load_metadata(
+    story_id: UUID4Str, speed: int, audio_format: AudioFormat | None = None
+) -> AudioMetadata:
+    sqlite = AsyncSQLiteClient(logger, read_only=True, cache_results=True)
 
-    story_audios = sqlite.select(
-        table=StoryAudios, cond_equal=dict(story_id=story_id, speed_percentage=speed)
+    story_audios = await sqlite.select_rows(
+        table=StoryAudioMetadata,
+        columns=["story_text", "audio_id", "audio_url"],
+        cond_equal=dict(story_id=story_id, speed_percentage=speed),
+        limit=1,
     )
     if not story_audios:
+        if not await sqlite.id_exists(table=Stories, id=story_id):
+            raise WrongArgumentException(f"no story found for {story_id=}")
         raise WrongArgumentException(f"no audio for {story_id=}, {speed=}")
 
-    audio = sqlite.select_by_id(table=Audios, id=story_audios[0].audio_id)
-
-    return AudioMetadata(audio_text=story.text, audio_url=get_audio_url(audio.url))
-
+    (audio_url,) = await load_audio_urls(sqlite, story_audios, audio_format)
+    return AudioMetadata(
+        audio_text=story_audios[0]["story_text"],
+        audio_url=audio_url,
+    )
 
-async def load_sentence_metadata(story_id: UUID4Str, speed: int) -> list[AudioMetadata]:
-    sqlite = SQLiteClient(logger)
 
-    if not sqlite.id_exists(table=Stories, id=story_id):
-        raise WrongArgumentException(f"no story found for {story_id=}")
+async def load_sentence_metadata(
+    story_id: UUID4Str, speed: int, audio_format: AudioFormat | None = None
+) -> list[AudioMetadata]:
+    sqlite = AsyncSQLiteClient(logger, read_only=True, cache_results=True)
 
-    story_chunks = sqlite.select(
-        table=StoryChunks,
-        cond_equal=dict(
-            story_id=story_id,
-        ),
-    )
-    if not story_chunks:
-        raise WrongArgumentException(f"no story chunks for {story_id=}")
-    story_chunks.sort(key=lambda sc: sc.position)
-
-    story_chunks_audio = sqlite.select(
-        table=StoryChunkAudios,
-        cond_equal=dict(speed_percentage=speed),
-        cond_in=dict(story_chunk_id=[s.id for s in story_chunks]),
+    # Single indexed query, the other ones only run to explain an empty result
+    chunk_audios = await sqlite.select_rows(
+        table=StoryChunkAudioMetadata,
+        columns=["text", "audio_id", "audio_url", "story_chunk_count"],
+        cond_equal=dict(story_id=story_id, speed_percentage=speed),
+        order_by="position",
     )
-    if not story_chunks_audio:
+    if not chunk_audios:
+        if not await sqlite.id_exists(table=Stories, id=story_id):
+            raise WrongArgumentException(f"no story found for {story_id=}")
+        if not await sqlite.exists(
+            table=StoryChunks, cond_equal=dict(story_id=story_id)
+        ):
+            raise WrongArgumentException(f"no story chunks for {story_id=}")
         raise WrongArgumentException(f"no audio chunks for {story_id=}, {speed=}")
 
-    audios = sqlite.select(
-        table=Audios, cond_in=dict(id=[sca.audio_id for sca in story_chunks_audio])
-    )
-    audio_id_to_url_map = {a.id: get_audio_url(a.url) for a in audios}
-    chunk_id_to_audio_url_map = {
-        sca.story_chunk_id: audio_id_to_url_map[sca.audio_id]
-        for sca in story_chunks_audio
-    }
-    if len(chunk_id_to_audio_url_map) != len(story_chunks):
+    if len(chunk_audios) != chunk_audios[0]["story_chunk_count"]:
         raise Exception(f"missing audio chunks compared to the story chunks")
 
+    audio_urls = await load_audio_urls(sqlite, chunk_audios, audio_format)
     return [
-        AudioMetadata(
-            audio_text=sc.text,
-            audio_url=chunk_id_to_audio_url_map[sc.id],
-        )
-        for sc in story_chunks
+        AudioMetadata(audio_text=sca["text"], audio_url=audio_url)
+        for sca, audio_url in zip(chunk_audios, audio_urls)
     ]
 
 
-async def load_audio_bytes(filename: str) -> bytes:
+def get_audio_path(filename: str) -> Path:
+    """
+    Path of a local audio file, only a file directly in the audio folder can be served.
+    """
     ## NOTE: This is only used when USES_LOCAL_FILE==True, this is local workaround.
-    with open(path_config.audio / filename, "rb") as f:
-        audio_bytes = f.read()
-
-    return audio_bytes
+    audio_dir = path_config.audio.resolve()
+    path = (audio_dir / filename).resolve()
+    if Path(filename).name != filename or path.parent != audio_dir:
+        raise WrongArgumentException(f"invalid audio {filename=}")
+    if not path.is_file():
+        raise NotFoundException(f"no audio file for {filename=}")
+
+    return path
+
+
+async def get_variant_filename(filename: str, audio_format: AudioFormat | None) -> str:
+    """
+    Local audio_format variant of a WAV file, filename itself if there is none.
+    """
+    if audio_format is None or audio_format_of(filename) != source_audio_format:
+        return filename
+    variant = str(Path(filename).with_suffix(audio_format.extension))
+    if variant == filename:
+        return filename
+    # The variants are written next to their WAV, a cached one skips the disk
+    if variant in audio_cache or await to_thread.run_sync(
+        (path_config.audio / variant).is_file
+    ):
+        return variant
+    return filename
+
+
+async def load_cached_audio(filename: str) -> CachedAudio | None:
+    """
+    Content of a local audio file from memory, read into the cache on a miss.
+    None if the file is not cached and has to be streamed from disk.
+    """
+    cached = audio_cache.get(filename)
+    if cached is not None:
+        return cached
+    # Only the validated filenames get an entry, a hit skips the validation as well
+    path = get_audio_path(filename)
+    return await to_thread.run_sync(audio_cache.load, filename, path)
+
+
+async def prewarm_audio_cache(levels: Iterable[int]) -> int:
+    """
+    Loads the local audio files of the WaniKani stories of the levels, lowest levels
+    first and without evicting, returns the number of files loaded.
+    """
+    sqlite = AsyncSQLiteClient(logger, read_only=True)
+    loaded = 0
+    for level in sorted(levels):
+        story_ids = [
+            ws["story_id"]
+            for ws in await sqlite.select_rows(
+                table=WanikaniStories,
+                columns=["story_id"],
+                cond_equal=dict(level=level),
+            )
+        ]
+        if not story_ids:
+            continue
+        for table in (StoryAudioMetadata, StoryChunkAudioMetadata):
+            for audio in await sqlite.select_rows(
+                table=table, columns=["audio_url"], cond_in=dict(story_id=story_ids)
+            ):
+                try:
+                    path = get_audio_path(audio["audio_url"])
+                except (NotFoundException, WrongArgumentException):
+                    logger.warning(f"no local audio file for {audio['audio_url']=}")
+                    continue
+                if await to_thread.run_sync(
+                    audio_cache.load, audio["audio_url"], path, False
+                ):
+                    loaded += 1
+    return loaded
@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Depends, status
 from src.dependencies.authentification import get_current_user
+from src.dependencies.conditional import conditional_get
+from src.dependencies.readiness import require_ready
 from src.exceptions.http import (
     HTTPUnAuthorizedException,
     HTTPWrongAttributesException,
@@ -7,6 +9,7 @@ from src.exceptions.http import (
     WrongArgumentException,
 )
 from src.logger import get_logger
+from src.models.database import Configs, Users
 from src.models.uuid4str import UUID4Str
 
 from .models import ConfigModel
@@ -16,14 +19,31 @@ router = APIRouter(prefix="/config")
 logger = get_logger()
 
 
-@router.get("", response_model=list[ConfigModel])
+@router.get(
+    "",
+    response_model=list[ConfigModel],
+    dependencies=[
+        # Creates the configs of a new user, not possible on the bundled database
+        Depends(require_ready),
+        Depends(
+            conditional_get(
+                Configs,
+                Users,
+                cache_control="private, no-cache",
+                vary=("Authorization",),
+            )
+        ),
+    ],
+)
 async def get_configs(user_id: str = Depends(get_current_user)) -> list[ConfigModel]:
     logger.info(f"On GET /config")
 
     return await load_configs(user_id)
 
 
-@router.post("", status_code=status.HTTP_204_NO_CONTENT)
+@router.post(
+    "", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_ready)]
+)
 async def post_config(
     config: ConfigModel, user_id: UUID4Str = Depends(get_current_user)
 ) -> None:
@@ -37,7 +57,9 @@ async def post_config(
     return
 
 
-@router.delete("", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete(
+    "", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_ready)]
+)
 async def delete_config(config_id: UUID4Str) -> None:
     logger.info(f"On DELETE /config, with {config_id=}")
 
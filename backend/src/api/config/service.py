@@ -1,6 +1,6 @@
 import json
 
-from src.clients.sqlite import SQLiteClient, SqliteIdNotFoundError
+from src.clients.sqlite import AsyncSQLiteClient, SqliteIdNotFoundError
 from src.config.env_var import DEFAULT_CONFIG_ID, DEFAULT_USER_ID
 from src.exceptions.http import UnAuthorizedException, WrongArgumentException
 from src.logger import get_logger
@@ -34,17 +34,17 @@ def sequence_to_str(
 
 
 async def load_configs(user_id: str) -> list[ConfigModel]:
-    sqlite = SQLiteClient(logger)
+    sqlite = AsyncSQLiteClient(logger)
 
-    configs = sqlite.select(table=Configs, cond_equal=dict(user_id=user_id))
+    configs = await sqlite.select(table=Configs, cond_equal=dict(user_id=user_id))
 
     # If no configs, copy default one for the user
     if not configs:
-        default_config = sqlite.select_by_id(table=Configs, id=DEFAULT_CONFIG_ID)
+        default_config = await sqlite.select_by_id(table=Configs, id=DEFAULT_CONFIG_ID)
         new_config = Configs(
             name=default_config.name, sequence=default_config.sequence, user_id=user_id
         )
-        sqlite.insert_one(table=Configs, to_insert=new_config)
+        await sqlite.insert_one(table=Configs, to_insert=new_config)
         configs = [new_config]
     return [
         ConfigModel(id=c.id, name=c.name, sequence=str_to_sequence(c.sequence))
@@ -53,9 +53,9 @@ async def load_configs(user_id: str) -> list[ConfigModel]:
 
 
 async def remove_config(config_id: UUID4Str) -> None:
-    sqlite = SQLiteClient(logger)
+    sqlite = AsyncSQLiteClient(logger)
     try:
-        sqlite.delete_by_id(table=Configs, id=config_id)
+        await sqlite.delete_by_id(table=Configs, id=config_id, returning=False)
     except SqliteIdNotFoundError:
         raise WrongArgumentException(f"no config with {config_id=}")
     return
@@ -67,7 +67,7 @@ async def add_or_update_config(config: ConfigModel, user_id: UUID4Str) -> str:
             "Cannot add or modify a configuration if user is not connected."
         )
 
-    sqlite = SQLiteClient(logger)
+    sqlite = AsyncSQLiteClient(logger)
 
     config_table = Configs(
         id=config.id,
@@ -77,7 +77,7 @@ async def add_or_update_config(config: ConfigModel, user_id: UUID4Str) -> str:
     )
 
     try:
-        sqlite.update_by_id(
+        await sqlite.update_by_id(
             table=Configs,
             id=config.id,
             update_col_value=dict(
@@ -86,6 +86,6 @@ async def add_or_update_config(config: ConfigModel, user_id: UUID4Str) -> str:
             ),
         )
     except SqliteIdNotFoundError:
-        sqlite.insert_one(table=Configs, to_insert=config_table)
+        await sqlite.insert_one(table=Configs, to_insert=config_table)
 
     return config_table.id
@@ -1,14 +1,52 @@
-from fastapi import APIRouter, status
+import asyncio
+from dataclasses import asdict
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, status
+from src.clients.sqlite import SQLiteClient
+from src.dependencies.readiness import require_ready
+from src.exceptions.http import HTTPWrongAttributesException
 from src.logger import get_logger
-from src.scripts.manage_dbfile_s3 import load_sqlite_file
+from src.scripts.manage_dbfile_s3 import (
+    BackupReport,
+    DatabaseIntegrityError,
+    backup_reports,
+    load_sqlite_file,
+)
 
 router = APIRouter(prefix="/database")
 logger = get_logger()
 
 
-@router.post("/reload", status_code=status.HTTP_204_NO_CONTENT)
-async def reload_db(custom_file_name: str | None = None) -> None:
-    logger.info(f"On POST /database/reload")
-    load_sqlite_file(custom_file_name)
+@router.post(
+    "/reload",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(require_ready)],
+)
+async def reload_db(
+    custom_file_name: str | None = None, at: datetime | None = None
+) -> None:
+    logger.info(f"On POST /database/reload, {at=}")
+    try:
+        # Downloaded and checked off the loop, requests keep being served meanwhile
+        await asyncio.to_thread(load_sqlite_file, custom_file_name, at)
+    except (DatabaseIntegrityError, ValueError) as e:
+        raise HTTPWrongAttributesException(str(e))
 
     return
+
+
+@router.get("/cache-stats")
+async def cache_stats() -> dict[str, dict[str, float]]:
+    sqlite = SQLiteClient(logger, read_only=True)
+    result_cache = sqlite.result_cache_stats()
+    query_cache = sqlite.query_cache_stats()
+    return dict(
+        result_cache=dict(**asdict(result_cache), hit_ratio=result_cache.hit_ratio),
+        query_cache=dict(**asdict(query_cache), hit_ratio=query_cache.hit_ratio),
+    )
+
+
+@router.get("/backups")
+async def list_backups() -> list[BackupReport]:
+    return list(backup_reports)
@@ -0,0 +1,3 @@
+from .router import router as health_router
+
+__all__ = ["health_router"]
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Response, status
+from src.modules.boot import BootReport, boot_status
+
+router = APIRouter(prefix="/health")
+
+
+@router.get("/live")
+async def liveness() -> BootReport:
+    return boot_status.report()
+
+
+@router.get("/ready")
+async def readiness(response: Response) -> BootReport:
+    report = boot_status.report()
+    if not report.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return report
@@ -1,5 +1,7 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from src.dependencies.conditional import conditional_get
 from src.logger import get_logger
+from src.models.database import Stories, WanikaniStories
 
 from .models import StoryMetadata
 from .service import load_wanikani_stories
@@ -8,7 +10,18 @@ router = APIRouter(prefix="/story")
 logger = get_logger()
 
 
-@router.get("/wanikani", response_model=list[StoryMetadata])
+@router.get(
+    "/wanikani",
+    response_model=list[StoryMetadata],
+    # Content only changes with a new database, a short max-age spares the revalidations
+    dependencies=[
+        Depends(
+            conditional_get(
+                WanikaniStories, Stories, cache_control="public, max-age=300"
+            )
+        )
+    ],
+)
 async def get_stories(level: int) -> list[StoryMetadata]:
     logger.info(f"On GET /wanikani with {level=}")
 
@@ -1,4 +1,4 @@
-from src.clients.sqlite import SQLiteClient
+from src.clients.sqlite import AsyncSQLiteClient
 from src.logger import get_logger
 from src.models.database import Stories, WanikaniStories
 
@@ -8,12 +8,12 @@ logger = get_logger()
 
 
 async def load_wanikani_stories(level: int) -> list[StoryMetadata]:
-    sqlite = SQLiteClient(logger)
+    sqlite = AsyncSQLiteClient(logger, read_only=True, cache_results=True)
 
-    wanikani_stories = sqlite.select(
+    wanikani_stories = await sqlite.select(
         table=WanikaniStories, cond_equal=dict(level=level)
     )
-    stories = sqlite.select(
+    stories = await sqlite.select(
         table=Stories, cond_in=dict(id=[s.story_id for s in wanikani_stories])
     )
 
@@ -1,3 +1,15 @@
-from .s3 import S3Client
+from .s3 import (
+    PresignedUrlCache,
+    PresignedUrlCacheStats,
+    S3Client,
+    S3Presigner,
+    get_s3_client,
+)
 
-__all__ = ["S3Client"]
+__all__ = [
+    "get_s3_client",
+    "PresignedUrlCache",
+    "PresignedUrlCacheStats",
+    "S3Client",
+    "S3Presigner",
+]
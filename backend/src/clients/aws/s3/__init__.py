@@ -1,3 +1,11 @@
-from .client import S3Client
+from .client import S3Client, get_s3_client
+from .presign import S3Presigner
+from .presigned_url_cache import PresignedUrlCache, PresignedUrlCacheStats
 
-__all__ = ["S3Client"]
+__all__ = [
+    "get_s3_client",
+    "PresignedUrlCache",
+    "PresignedUrlCacheStats",
+    "S3Client",
+    "S3Presigner",
+]
@@ -1,19 +1,40 @@
+import threading
+from datetime import datetime
 from logging import Logger
 from pathlib import Path
 from typing import Literal
 
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from src.config.aws import aws_config
 from src.logger import get_logger
 
+from .presign import S3Presigner
+
 
 class S3Client:
     def __init__(self, logger: Logger | None = None) -> None:
         self.logger = logger or get_logger("S3Client-logger")
         self.client = boto3.client(
             service_name="s3",
+            region_name=aws_config.region,
+            endpoint_url=aws_config.endpoint_url,
             aws_access_key_id=aws_config.access_key,
             aws_secret_access_key=aws_config.secret_access_key,
+            config=Config(
+                # Pinned, S3Presigner builds the same SigV4 urls
+                signature_version="s3v4",
+                max_pool_connections=aws_config.s3_max_pool_connections,
+                # Exponential backoff on throttling, timeouts and 5xx
+                retries=dict(mode="standard", max_attempts=aws_config.s3_max_attempts),
+            ),
+        )
+        self.presigner = S3Presigner(
+            access_key=aws_config.access_key,
+            secret_key=aws_config.secret_access_key,
+            region_name=aws_config.region,
+            endpoint_url=aws_config.endpoint_url,
         )
 
     def upload_file(
@@ -22,15 +43,18 @@ class S3Client:
         bucket: str,
         key_prefix: str,
         dst_filename: str | None = None,
+        transfer_config: TransferConfig | None = None,
     ) -> None:
         """
         Uploads a file to s3.
         If no dst_filename is provided, dst_filename will be same as the one as src_filepath.name
+        transfer_config sets when and how the upload is split into a multipart upload.
         """
         self.client.upload_file(
             Filename=str(src_filepath.resolve()),
             Bucket=bucket,
             Key=key_prefix + "/" + (dst_filename or src_filepath.name),
+            Config=transfer_config,
         )
 
     def download_file(
@@ -51,6 +75,30 @@ class S3Client:
             Filename=str(dst_folder / (dst_filename or s3_filename)),
         )
 
+    def put_bytes(self, bucket: str, key: str, data: bytes) -> None:
+        self.client.put_object(Bucket=bucket, Key=key, Body=data)
+
+    def get_bytes(self, bucket: str, key: str) -> bytes:
+        return self.client.get_object(Bucket=bucket, Key=key)["Body"].read()
+
+    def list_keys(self, bucket: str, prefix: str) -> list[str]:
+        """
+        Lists all the keys starting with prefix, following the pagination.
+        """
+        keys: list[str] = list()
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            keys.extend(o["Key"] for o in page.get("Contents", []))
+        return keys
+
+    def delete_keys(self, bucket: str, keys: list[str]) -> None:
+        # delete_objects takes at most 1000 keys
+        for i in range(0, len(keys), 1000):
+            self.client.delete_objects(
+                Bucket=bucket,
+                Delete=dict(Objects=[dict(Key=k) for k in keys[i : i + 1000]]),
+            )
+
     def close(self) -> None:
         self.client.close()
 
@@ -61,9 +109,38 @@ class S3Client:
         filename: str,
         expires_in_s: int = 1800,
         client_method: Literal["get_object"] = "get_object",
+        signed_at: datetime | None = None,
     ) -> str:
+        """
+        Presigned url of the object. With signed_at, signed with SigV4 as of signed_at
+        instead of now, the same signed_at giving the same url.
+        """
+        if signed_at is not None:
+            # Without the botocore machinery, the url is computed in a few microseconds
+            return self.presigner.presign_get_object(
+                bucket=bucket,
+                key=f"{prefix}/{filename}",
+                expires_in_s=expires_in_s,
+                signed_at=signed_at,
+            )
         return self.client.generate_presigned_url(
             ClientMethod=client_method,
             Params=dict(Bucket=bucket, Key=f"{prefix}/{filename}"),
             ExpiresIn=expires_in_s,
         )
+
+
+_shared_client: S3Client | None = None
+_shared_client_lock = threading.Lock()
+
+
+def get_s3_client() -> S3Client:
+    """
+    Process wide client, boto3 clients are thread safe once created. Never to be closed.
+    """
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = S3Client()
+    return _shared_client
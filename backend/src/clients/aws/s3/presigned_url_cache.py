@@ -0,0 +1,105 @@
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from cachetools import LRUCache
+
+from .client import S3Client
+from .presign import signing_window_start
+
+
+@dataclass(frozen=True)
+class PresignedUrlCacheStats:
+    hits: int
+    misses: int
+    entries: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class PresignedUrlCache:
+    """
+    Thread safe LRU cache of presigned urls, keyed by bucket and key.
+
+    An url is handed out again only while it stays valid for min_remaining_s, so the one a
+    client just received never expires before that, whether it was cached or not. With
+    window_s, urls are signed as of the start of their window instead, the same for
+    everyone until the next window.
+    """
+
+    def __init__(
+        self, maxsize: int, min_remaining_s: float, window_s: int | None = None
+    ) -> None:
+        self.min_remaining_s = min_remaining_s
+        self.window_s = window_s
+        # (bucket, key) -> (url, expires_at)
+        self._entries: LRUCache[tuple[str, str], tuple[str, float]] = LRUCache(
+            maxsize=maxsize
+        )
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def presigned_url(
+        self,
+        s3: S3Client,
+        bucket: str,
+        prefix: str,
+        filename: str,
+        expires_in_s: int,
+        now: float | None = None,
+    ) -> str:
+        """
+        Url signed with SigV4 as of now, or as of the start of the window of now.
+        now, the current time by default, is only given to simulate the passing time.
+        """
+        now = time.time() if now is None else now
+        if self.window_s:
+            # The last url of a window still has min_remaining_s left
+            assert expires_in_s - self.window_s >= self.min_remaining_s
+            signed_at = signing_window_start(now, self.window_s)
+            expires_at = signed_at.timestamp() + expires_in_s
+        else:
+            assert expires_in_s > self.min_remaining_s
+            signed_at = datetime.fromtimestamp(now, tz=timezone.utc)
+            expires_at = now + expires_in_s
+
+        key = (bucket, f"{prefix}/{filename}")
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (
+                entry[1] == expires_at
+                if self.window_s
+                else entry[1] - now >= self.min_remaining_s
+            ):
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+
+        # Signed outside of the lock, two misses on the same key both sign, both are valid
+        url = s3.presigned_url(
+            bucket=bucket,
+            prefix=prefix,
+            filename=filename,
+            expires_in_s=expires_in_s,
+            signed_at=signed_at,
+        )
+        with self._lock:
+            self._entries[key] = (url, expires_at)
+        return url
+
+    def stats(self) -> PresignedUrlCacheStats:
+        with self._lock:
+            return PresignedUrlCacheStats(
+                hits=self._hits, misses=self._misses, entries=len(self._entries)
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
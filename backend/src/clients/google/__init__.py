@@ -0,0 +1,10 @@
+from .exceptions import InvalidTokenError
+from .id_token import GoogleIdTokenVerifier
+from .jwks import JwksCache, fetch_jwks
+
+__all__ = [
+    "fetch_jwks",
+    "GoogleIdTokenVerifier",
+    "InvalidTokenError",
+    "JwksCache",
+]
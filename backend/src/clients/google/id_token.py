@@ -0,0 +1,72 @@
+import json
+import time
+from typing import Any
+
+import rsa
+from src.config.google import google_auth_config
+
+from .exceptions import InvalidTokenError
+from .jwks import JwksCache, base64url_decode
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+
+class GoogleIdTokenVerifier:
+    """
+    Verifies Google ID tokens (RS256 JWTs) locally, against the cached Google signing keys,
+    with the checks of google.oauth2.id_token.verify_oauth2_token.
+    """
+
+    def __init__(self, audience: str | None, jwks: JwksCache | None = None) -> None:
+        self.audience = audience
+        self.jwks = jwks or JwksCache()
+
+    def verify(self, token: str) -> dict[str, Any]:
+        """
+        Claims of the token, raises InvalidTokenError if it is not a valid one for audience.
+        """
+        try:
+            header_b64, payload_b64, signature_b64 = token.split(".")
+            header = json.loads(base64url_decode(header_b64))
+            claims = json.loads(base64url_decode(payload_b64))
+            signature = base64url_decode(signature_b64)
+        except ValueError as e:
+            raise InvalidTokenError(f"malformed token: {e}")
+        if not isinstance(header, dict) or not isinstance(claims, dict):
+            raise InvalidTokenError("malformed token")
+        if header.get("alg") != "RS256":
+            raise InvalidTokenError(f"unsupported {header.get('alg')=}")
+
+        kid = header.get("kid")
+        if not isinstance(kid, str):
+            raise InvalidTokenError(f"malformed token {kid=}")
+        key = self.jwks.get_key(kid)
+        try:
+            hash_method = rsa.verify(
+                f"{header_b64}.{payload_b64}".encode(), signature, key
+            )
+        except rsa.VerificationError:
+            raise InvalidTokenError("invalid signature")
+        if hash_method != "SHA-256":
+            raise InvalidTokenError(f"unexpected {hash_method=}")
+
+        now = time.time()
+        skew = google_auth_config.clock_skew_s
+        if (
+            not isinstance(claims.get("exp"), (int, float))
+            or claims["exp"] < now - skew
+        ):
+            raise InvalidTokenError("expired token")
+        if (
+            not isinstance(claims.get("iat"), (int, float))
+            or claims["iat"] > now + skew
+        ):
+            raise InvalidTokenError("token used too early")
+        if claims.get("iss") not in GOOGLE_ISSUERS:
+            raise InvalidTokenError(f"wrong issuer {claims.get('iss')=}")
+        audience = claims.get("aud")
+        if self.audience is not None and self.audience not in (
+            audience if isinstance(audience, list) else [audience]
+        ):
+            raise InvalidTokenError(f"wrong audience {audience=}")
+        return claims
@@ -0,0 +1,102 @@
+import base64
+import re
+import threading
+import time
+from logging import Logger
+from typing import Callable, Mapping
+
+import requests
+import rsa
+from src.config.google import google_auth_config
+from src.logger import get_logger
+
+from .exceptions import InvalidTokenError
+
+# Fetches a JWKS url, returns its json and response headers
+JwksFetcher = Callable[[str], tuple[dict, Mapping[str, str]]]
+
+
+def fetch_jwks(url: str) -> tuple[dict, Mapping[str, str]]:
+    response = requests.get(url, timeout=google_auth_config.jwks_timeout_s)
+    response.raise_for_status()
+    return response.json(), response.headers
+
+
+def base64url_decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def max_age_s(cache_control: str | None) -> int | None:
+    match = re.search(r"max-age=(\d+)", cache_control or "")
+    return int(match.group(1)) if match else None
+
+
+class JwksCache:
+    """
+    RSA signing keys of a JWKS endpoint, kept in memory for the max-age of its response.
+
+    An unknown kid refreshes them right away, a key rotation is picked up before the
+    max-age ends. A failed refresh keeps the keys already known.
+    """
+
+    def __init__(
+        self,
+        url: str = google_auth_config.jwks_url,
+        fetch: JwksFetcher = fetch_jwks,
+        logger: Logger | None = None,
+    ) -> None:
+        self.url = url
+        self.logger = logger or get_logger()
+        self._fetch = fetch
+        self._keys: dict[str, rsa.PublicKey] = dict()
+        self._expires_at = 0.0
+        self._refreshed_at = float("-inf")
+        # Refreshes one at a time, the requests waiting on it use its keys
+        self._refresh_lock = threading.Lock()
+
+    def get_key(self, kid: str) -> rsa.PublicKey:
+        keys = self._keys
+        if kid in keys and time.monotonic() < self._expires_at:
+            return keys[kid]
+
+        with self._refresh_lock:
+            now = time.monotonic()
+            stale = now >= self._expires_at
+            unknown = kid not in self._keys
+            min_interval = google_auth_config.jwks_min_refresh_interval_s
+            if stale or (unknown and now - self._refreshed_at >= min_interval):
+                self._refresh(now)
+
+        key = self._keys.get(kid)
+        if key is None:
+            raise InvalidTokenError(f"no signing key for {kid=}")
+        return key
+
+    def _refresh(self, now: float) -> None:
+        self._refreshed_at = now
+        try:
+            jwks, headers = self._fetch(self.url)
+            keys = {
+                k["kid"]: rsa.PublicKey(
+                    n=int.from_bytes(base64url_decode(k["n"])),
+                    e=int.from_bytes(base64url_decode(k["e"])),
+                )
+                for k in jwks["keys"]
+                if k.get("kty") == "RSA" and k.get("use", "sig") == "sig"
+            }
+        except Exception:
+            # Retried on the next miss past the min interval
+            self.logger.exception(
+                f"JWKS refresh failed, keeping {len(self._keys)} keys"
+            )
+            self._expires_at = now + google_auth_config.jwks_min_refresh_interval_s
+            return
+
+        max_age = max_age_s(
+            next((v for k, v in headers.items() if k.lower() == "cache-control"), None)
+        )
+        self._keys = keys
+        self._expires_at = now + (
+            google_auth_config.jwks_default_max_age_s if max_age is None else max_age
+        )
+        self.logger.info(f"JWKS refreshed, {list(keys)=}, {max_age=}")
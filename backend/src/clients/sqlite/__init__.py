@@ -1,4 +1,11 @@
-from .client import SQLiteClient
+from .async_client import AsyncSQLiteClient, shutdown_executor
+from .client import (
+    SQLiteClient,
+    bump_table_versions,
+    serve_read_only_from,
+    table_versions,
+    tables_modified_at,
+)
 from .exceptions import (
     SqliteColumnInconsistencyError,
     SqliteDuplicateColumnUpdateError,
@@ -6,10 +13,30 @@ from .exceptions import (
     SqliteNoConnectionError,
     SqliteNoUpdateValuesError,
     SqliteNoValueInsertionError,
+    SqlitePoolTimeoutError,
+    SqliteQueryTimeoutError,
     SqliteWrongQueryError,
 )
+from .models import BulkInsertReport
+from .monitor import DatabaseChangeMonitor
+from .pool import PoolHealth, PoolStats, close_all_pools, drained_pools, list_pools
+from .query_cache import QueryCacheStats
+from .result_cache import ResultCacheStats
 
 __all__ = [
+    "AsyncSQLiteClient",
+    "BulkInsertReport",
+    "bump_table_versions",
+    "close_all_pools",
+    "DatabaseChangeMonitor",
+    "drained_pools",
+    "list_pools",
+    "PoolHealth",
+    "PoolStats",
+    "QueryCacheStats",
+    "ResultCacheStats",
+    "serve_read_only_from",
+    "shutdown_executor",
     "SQLiteClient",
     "SqliteColumnInconsistencyError",
     "SqliteDuplicateColumnUpdateError",
@@ -17,5 +44,9 @@ __all__ = [
     "SqliteNoConnectionError",
     "SqliteNoUpdateValuesError",
     "SqliteNoValueInsertionError",
+    "SqlitePoolTimeoutError",
+    "SqliteQueryTimeoutError",
     "SqliteWrongQueryError",
+    "table_versions",
+    "tables_modified_at",
 ]
@@ -0,0 +1,605 @@
+import asyncio
+import copy
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from itertools import islice
+from logging import Logger
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Iterable, Type, TypeVar
+
+from src.config.sqlite import sqlite_config
+from src.logger import get_logger
+
+from .client import GenericTableModel, SQLiteClient, bump_table_versions
+from .exceptions import SqliteNoConnectionError, SqliteQueryTimeoutError
+from .models import BulkInsertReport
+from .pool import PoolHealth, PoolStats
+from .query_cache import QueryCacheStats
+from .result_cache import ResultCacheStats
+
+T = TypeVar("T")
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Returns the process wide executor running the queries of the async clients.
+
+    It is bounded, so that a burst of requests queues on it instead of on the connection
+    pools, and separate from the default executor used by asyncio.to_thread.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=sqlite_config.async_max_workers,
+                thread_name_prefix="sqlite",
+            )
+        return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+
+
+class _Job:
+    """
+    A call running on the executor with a connection, interruptible from the event loop.
+    """
+
+    def __init__(self, client: SQLiteClient, connection: sqlite3.Connection | None):
+        self._client = client
+        # Leased for the call only if None
+        self._connection = connection
+        self._lock = threading.Lock()
+        self._active: sqlite3.Connection | None = None
+        self._interrupted = False
+        self.finished = threading.Event()
+
+    def run(self, fn: Callable[[sqlite3.Connection], T]) -> T | None:
+        try:
+            with self._lock:
+                if self._interrupted:
+                    # Cancelled while queued
+                    return None
+            conn = self._connection or self._client._pool.acquire()
+            try:
+                with self._lock:
+                    self._active = conn
+                    if self._interrupted:
+                        return None
+                return fn(conn)
+            finally:
+                with self._lock:
+                    self._active = None
+                if self._connection is None:
+                    self._client._pool.release(conn)
+        finally:
+            self.finished.set()
+
+    def interrupt(self) -> None:
+        """
+        Aborts the statement running on the job connection, the call then raises
+        sqlite3.OperationalError in its worker and its write transaction is rolled back.
+        """
+        with self._lock:
+            self._interrupted = True
+            if self._active is not None:
+                self._active.interrupt()
+
+
+class AsyncSQLiteClient:
+    """
+    SQLiteClient counterpart for the async code, queries run on a bounded executor.
+
+    Each call leases a pooled connection on its worker, so a slow query only holds one worker
+    and the event loop keeps serving the other requests. A call still running after timeout_s,
+    or whose awaiting task is cancelled, has its statement interrupted.
+    """
+
+    def __init__(
+        self,
+        logger: Logger | None = None,
+        read_only: bool = False,
+        db_file: Path | None = None,
+        timeout_s: float = sqlite_config.async_query_timeout_s,
+        cache_results: bool = False,
+        content_db_file: Path | None = None,
+    ) -> None:
+        self.logger = logger or get_logger("AsyncSQLiteClient-logger")
+        self.timeout_s = timeout_s
+        self._client = SQLiteClient(
+            self.logger,
+            read_only=read_only,
+            db_file=db_file,
+            cache_results=cache_results,
+            content_db_file=content_db_file,
+        )
+        self._pool = self._client._pool
+        # Connection pinned for a transaction
+        self.connection: sqlite3.Connection | None = None
+        self._savepoints = 0
+        # Tables written in the transaction, their cached results are invalidated on commit
+        self._tx_written: set[str] = set()
+
+    def _bind(self, conn: sqlite3.Connection) -> SQLiteClient:
+        client = copy.copy(self._client)
+        client.connection = conn
+        client._tx_written = set()
+        return client
+
+    def _record_write(self, table: Type[GenericTableModel]) -> None:
+        if self.connection is not None:
+            self._tx_written.add(table.__tablename__)
+
+    async def _wait(self, job: _Job, fn: Callable[[sqlite3.Connection], T]) -> T:
+        future = get_executor().submit(job.run, fn)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout_s)  # type: ignore
+        except TimeoutError:
+            job.interrupt()
+            raise SqliteQueryTimeoutError(f"Query interrupted after {self.timeout_s}s")
+        except asyncio.CancelledError:
+            job.interrupt()
+            raise
+
+    async def _run(self, fn: Callable[[SQLiteClient], T]) -> T:
+        """
+        Runs fn on the executor with a client bound to the pinned or a leased connection.
+        """
+        return await self._wait(
+            _Job(self._client, self.connection), lambda conn: fn(self._bind(conn))
+        )
+
+    async def _lease(self) -> sqlite3.Connection:
+        """
+        Acquires a connection to keep across calls, to be given back with _pool.release.
+        """
+        future = get_executor().submit(self._pool.acquire)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout_s)
+        except BaseException:
+            # The worker may still get a connection after we stopped waiting for it
+            future.add_done_callback(
+                lambda f: (
+                    self._pool.release(f.result())
+                    if not f.cancelled() and f.exception() is None
+                    else None
+                )
+            )
+            raise
+
+    def pool_stats(self) -> PoolStats:
+        return self._client.pool_stats()
+
+    async def pool_health(self) -> PoolHealth:
+        return await self._run(lambda c: c.pool_health())
+
+    def query_cache_stats(self) -> QueryCacheStats:
+        return self._client.query_cache_stats()
+
+    def result_cache_stats(self) -> ResultCacheStats:
+        return self._client.result_cache_stats()
+
+    async def checkpoint(self) -> None:
+        await self._run(lambda c: c.checkpoint())
+
+    async def execute(
+        self, query: str, args: tuple | None = None
+    ) -> list[dict[str, Any]]:
+        return await self._run(lambda c: c.execute(query=query, args=args))
+
+    async def count(
+        self,
+        table: Type[GenericTableModel],
+        select_col: list[str] = list(),
+        cond_null: list[str] = list(),
+        cond_not_null: list[str] = list(),
+        cond_in: dict[str, list] = dict(),
+        cond_equal: dict[str, object] = dict(),
+        cond_non_equal: dict[str, object] = dict(),
+        cond_less_or_eq: dict[str, object] = dict(),
+        cond_greater_or_eq: dict[str, object] = dict(),
+        cond_less: dict[str, object] = dict(),
+        cond_greater: dict[str, object] = dict(),
+        limit: int = 0,
+    ) -> int:
+        return await self._run(
+            lambda c: c.count(
+                table=table,
+                select_col=select_col,
+                cond_equal=cond_equal,
+                cond_greater=cond_greater,
+                cond_greater_or_eq=cond_greater_or_eq,
+                cond_in=cond_in,
+                cond_less=cond_less,
+                cond_less_or_eq=cond_less_or_eq,
+                cond_non_equal=cond_non_equal,
+                cond_not_null=cond_not_null,
+                cond_null=cond_null,
+                limit=limit,
+            )
+        )
+
+    async def exists(
+        self,
+        table: Type[GenericTableModel],
+        cond_null: list[str] = list(),
+        cond_not_null: list[str] = list(),
+        cond_in: dict[str, list] = dict(),
+        cond_equal: dict[str, object] = dict(),
+        cond_non_equal: dict[str, object] = dict(),
+        cond_less_or_eq: dict[str, object] = dict(),
+        cond_greater_or_eq: dict[str, object] = dict(),
+        cond_less: dict[str, object] = dict(),
+        cond_greater: dict[str, object] = dict(),
+    ) -> bool:
+        return await self._run(
+            lambda c: c.exists(
+                table=table,
+                cond_equal=cond_equal,
+                cond_greater=cond_greater,
+                cond_greater_or_eq=cond_greater_or_eq,
+                cond_in=cond_in,
+                cond_less=cond_less,
+                cond_less_or_eq=cond_less_or_eq,
+                cond_non_equal=cond_non_equal,
+                cond_not_null=cond_not_null,
+                cond_null=cond_null,
+            )
+        )
+
+    async def select_rows(
+        self,
+        table: Type[GenericTableModel],
+        columns: list[str] = list(),
+        cond_null: list[str] = list(),
+        cond_not_null: list[str] = list(),
+        cond_in: dict[str, list] = dict(),
+        cond_equal: dict[str, object] = dict(),
+        cond_non_equal: dict[str, object] = dict(),
+        cond_less_or_eq: dict[str, object] = dict(),
+        cond_greater_or_eq: dict[str, object] = dict(),
+        cond_less: dict[str, object] = dict(),
+        cond_greater: dict[str, object] = dict(),
+        order_by: str = "",
+        ascending_order: bool = True,
+        limit: int = 0,
+        offset: int = 0,
+    ) -> list[sqlite3.Row]:
+        return await self._run(
+            lambda c: c.select_rows(
+                table=table,
+                columns=columns,
+                cond_equal=cond_equal,
+                cond_greater=cond_greater,
+                cond_greater_or_eq=cond_greater_or_eq,
+                cond_in=cond_in,
+                cond_less=cond_less,
+                cond_less_or_eq=cond_less_or_eq,
+                cond_non_equal=cond_non_equal,
+                cond_not_null=cond_not_null,
+                cond_null=cond_null,
+                order_by=order_by,
+                ascending_order=ascending_order,
+                limit=limit,
+                offset=offset,
+            )
+        )
+
+    async def select(
+        self,
+        table: Type[GenericTableModel],
+        cond_null: list[str] = list(),
+        cond_not_null: list[str] = list(),
+        cond_in: dict[str, list] = dict(),
+        cond_equal: dict[str, object] = dict(),
+        cond_non_equal: dict[str, object] = dict(),
+        cond_less_or_eq: dict[str, object] = dict(),
+        cond_greater_or_eq: dict[str, object] = dict(),
+        cond_less: dict[str, object] = dict(),
+        cond_greater: dict[str, object] = dict(),
+        order_by: str = "",
+        ascending_order: bool = True,
+        limit: int = 0,
+        offset: int = 0,
+    ) -> list[GenericTableModel]:
+        return await self._run(
+            lambda c: c.select(
+                table=table,
+                cond_equal=cond_equal,
+                cond_greater=cond_greater,
+                cond_greater_or_eq=cond_greater_or_eq,
+                cond_in=cond_in,
+                cond_less=cond_less,
+                cond_less_or_eq=cond_less_or_eq,
+                cond_non_equal=cond_non_equal,
+                cond_not_null=cond_not_null,
+                cond_null=cond_null,
+                order_by=order_by,
+                ascending_order=ascending_order,
+                limit=limit,
+                offset=offset,
+            )
+        )
+
+    async def select_rows_iter(
+        self,
+        table: Type[GenericTableModel],
+        columns: list[str] = list(),
+        cond_null: list[str] = list(),
+        cond_not_null: list[str] = list(),
+        cond_in: dict[str, list] = dict(),
+        cond_equal: dict[str, object] = dict(),
+        cond_non_equal: dict[str, object] = dict(),
+        cond_less_or_eq: dict[str, object] = dict(),
+        cond_greater_or_eq: dict[str, object] = dict(),
+        cond_less: dict[str, object] = dict(),
+        cond_greater: dict[str, object] = dict(),
+        batch_size: int = 1000,
+        keyset_column: str | None = None,
+    ) -> AsyncIterator[sqlite3.Row]:
+        """
+        See SQLiteClient.select_rows_iter, each batch is fetched by its own executor call.
+        Without keyset_column, a connection is held until the iterator is exhausted or closed.
+        """
+        owned = (
+            await self._lease()
+            if keyset_column is None and self.connection is None
+            else None
+        )
+        client = copy.copy(self._client)
+        rows = client.select_rows_iter(
+            table=table,
+            columns=columns,
+            cond_equal=cond_equal,
+            cond_greater=cond_greater,
+            cond_greater_or_eq=cond_greater_or_eq,
+            cond_in=cond_in,
+            cond_less=cond_less,
+            cond_less_or_eq=cond_less_or_eq,
+            cond_non_equal=cond_non_equal,
+            cond_not_null=cond_not_null,
+            cond_null=cond_null,
+            batch_size=batch_size,
+            keyset_column=keyset_column,
+        )
+
+        def next_batch(conn: sqlite3.Connection) -> list[sqlite3.Row]:
+            client.connection = conn
+            return list(islice(rows, batch_size))
+
+        job = None
+        try:
+            while True:
+                job = _Job(self._client, owned or self.connection)
+                batch = await self._wait(job, next_batch)
+                for r in batch:
+                    yield r
+                if len(batch) < batch_size:
+                    return
+        finally:
+
+            def cleanup() -> None:
+                # An interrupted batch may still be running
+                if job is not None:
+                    job.finished.wait()
+                rows.close()
+                if owned is not None:
+                    self._pool.release(owned)
+
+            get_executor().submit(cleanup)
+
+    async def select_iter(
+        self,
+        table: Type[GenericTableModel],
+        cond_null: list[str] = list(),
+        cond_not_null: list[str] = list(),
+        cond_in: dict[str, list] = dict(),
+        cond_equal: dict[str, object] = dict(),
+        cond_non_equal: dict[str, object] = dict(),
+        cond_less_or_eq: dict[str, object] = dict(),
+        cond_greater_or_eq: dict[str, object] = dict(),
+        cond_less: dict[str, object] = dict(),
+        cond_greater: dict[str, object] = dict(),
+        batch_size: int = 1000,
+        keyset_column: str | None = None,
+    ) -> AsyncIterator[GenericTableModel]:
+        async for r in self.select_rows_iter(
+            table=table,
+            cond_equal=cond_equal,
+            cond_greater=cond_greater,
+            cond_greater_or_eq=cond_greater_or_eq,
+            cond_in=cond_in,
+            cond_less=cond_less,
+            cond_less_or_eq=cond_less_or_eq,
+            cond_non_equal=cond_non_equal,
+            cond_not_null=cond_not_null,
+            cond_null=cond_null,
+            batch_size=batch_size,
+            keyset_column=keyset_column,
+        ):
+            yield table.from_row(r)
+
+    async def select_by_id(
+        self, table: Type[GenericTableModel], id: str
+    ) -> GenericTableModel:
+        return await self._run(lambda c: c.select_by_id(table=table, id=id))
+
+    async def id_exists(self, table: Type[GenericTableModel], id: str) -> bool:
+        return await self._run(lambda c: c.id_exists(table=table, id=id))
+
+    async def start_transaction(self) -> None:
+        """
+        Pins a connection of the pool and opens a transaction on it until commit or rollback.
+        """
+        if self.connection is None:
+            self.connection = await self._lease()
+        try:
+            await self._run(lambda c: c.start_transaction())
+        except BaseException:
+            await self.close()
+            raise
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        """
+        See SQLiteClient.transaction, nested blocks run in savepoints.
+        """
+        if self.connection is None:
+            await self.start_transaction()
+            try:
+                yield
+            except BaseException:
+                await self.rollback()
+                raise
+            await self.commit()
+            return
+
+        self._savepoints += 1
+        savepoint = f"async_sp_{self._savepoints}"
+        await self.execute(f"SAVEPOINT {savepoint};")
+        try:
+            yield
+        except BaseException:
+            await self.execute(f"ROLLBACK TO {savepoint};")
+            await self.execute(f"RELEASE {savepoint};")
+            raise
+        else:
+            await self.execute(f"RELEASE {savepoint};")
+        finally:
+            self._savepoints -= 1
+
+    async def commit(self) -> None:
+        if not self.connection:
+            raise SqliteNoConnectionError("Cannot commit if transaction is closed.")
+        try:
+            await self._run(lambda c: c.connection.commit())  # type: ignore
+            bump_table_versions(self._tx_written)
+        finally:
+            self._tx_written = set()
+            await self.close()
+
+    async def rollback(self) -> None:
+        if not self.connection:
+            raise SqliteNoConnectionError("Cannot commit if transaction is closed.")
+        try:
+            await self._run(lambda c: c.connection.rollback())  # type: ignore
+        finally:
+            self._tx_written = set()
+            await self.close()
+
+    async def close(self) -> None:
+        """
+        Gives back the pinned connection to the pool, rolling back any pending transaction.
+        """
+        if self.connection is not None:
+            conn, self.connection = self.connection, None
+            await asyncio.wrap_future(get_executor().submit(self._pool.release, conn))
+
+    async def insert_one(
+        self,
+        table: Type[GenericTableModel],
+        to_insert: GenericTableModel,
+        or_ignore=False,
+    ) -> None:
+        self._record_write(table)
+        await self._run(
+            lambda c: c.insert_one(
+                table=table, to_insert=to_insert, or_ignore=or_ignore
+            )
+        )
+
+    async def insert(
+        self,
+        table: Type[GenericTableModel],
+        to_insert: list[GenericTableModel],
+        or_ignore=False,
+    ) -> None:
+        self._record_write(table)
+        await self._run(
+            lambda c: c.insert(table=table, to_insert=to_insert, or_ignore=or_ignore)
+        )
+
+    async def insert_many(
+        self,
+        table: Type[GenericTableModel],
+        to_insert: Iterable[GenericTableModel],
+        or_ignore=False,
+        chunk_size: int = sqlite_config.bulk_insert_chunk_size,
+        defer_foreign_keys: bool = False,
+    ) -> BulkInsertReport:
+        self._record_write(table)
+        return await self._run(
+            lambda c: c.insert_many(
+                table=table,
+                to_insert=to_insert,
+                or_ignore=or_ignore,
+                chunk_size=chunk_size,
+                defer_foreign_keys=defer_foreign_keys,
+            )
+        )
+
+    async def update_by_id(
+        self,
+        table: Type[GenericTableModel],
+        id: str,
+        update_col_col: dict[str, str] = dict(),
+        update_col_value: dict[str, object] = dict(),
+    ) -> None:
+        self._record_write(table)
+        await self._run(
+            lambda c: c.update_by_id(
+                table=table,
+                id=id,
+                update_col_col=update_col_col,
+                update_col_value=update_col_value,
+            )
+        )
+
+    async def delete(
+        self,
+        table: Type[GenericTableModel],
+        cond_null: list[str] = list(),
+        cond_not_null: list[str] = list(),
+        cond_in: dict[str, list] = dict(),
+        cond_equal: dict[str, object] = dict(),
+        cond_non_equal: dict[str, object] = dict(),
+        cond_less_or_eq: dict[str, object] = dict(),
+        cond_greater_or_eq: dict[str, object] = dict(),
+        cond_less: dict[str, object] = dict(),
+        cond_greater: dict[str, object] = dict(),
+        returning: bool = True,
+    ) -> list[GenericTableModel]:
+        self._record_write(table)
+        return await self._run(
+            lambda c: c.delete(
+                table=table,
+                cond_equal=cond_equal,
+                cond_greater=cond_greater,
+                cond_greater_or_eq=cond_greater_or_eq,
+                cond_in=cond_in,
+                cond_less=cond_less,
+                cond_less_or_eq=cond_less_or_eq,
+                cond_non_equal=cond_non_equal,
+                cond_not_null=cond_not_null,
+                cond_null=cond_null,
+                returning=returning,
+            )
+        )
+
+    async def delete_by_id(
+        self, table: Type[GenericTableModel], id: str, returning: bool = True
+    ) -> GenericTableModel | None:
+        self._record_write(table)
+        return await self._run(
+            lambda c: c.delete_by_id(table=table, id=id, returning=returning)
+        )
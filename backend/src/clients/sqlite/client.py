@@ -1,13 +1,17 @@
 import sqlite3
-import threading
+import time
 import traceback
 from abc import ABC
+from contextlib import contextmanager
+from itertools import batched, chain
 from logging import Logger
-from typing import Any, Literal, Type, TypeVar
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Literal, Type, TypeVar
 
 from src.config.path import path_config
+from src.config.sqlite import sqlite_config
 from src.logger import get_logger
-from src.models.database import BaseTableModel
+from src.models.database import BaseTableModel, BaseViewModel
 
 from .exceptions import (
     SqliteColumnInconsistencyError,
@@ -16,11 +20,59 @@ from .exceptions import (
     SqliteNoConnectionError,
     SqliteNoUpdateValuesError,
     SqliteNoValueInsertionError,
+    SqliteWrongQueryError,
 )
+from .models import BulkInsertReport
+from .pool import PoolHealth, PoolStats, get_pool, list_pools
+from .query_cache import QueryCache, QueryCacheStats, in_arity_bucket
+from .result_cache import ResultCache, ResultCacheStats
 
 GenericTableModel = TypeVar("GenericTableModel", bound=BaseTableModel)
 
-_thread_local = threading.local()
+_query_cache = QueryCache(maxsize=sqlite_config.query_cache_size)
+_result_cache = ResultCache(max_bytes=sqlite_config.result_cache_max_bytes)
+# Database served read-only to the clients without db_file while the configured one is not there yet
+_fallback_db_file: Path | None = None
+
+
+def bump_table_versions(tables: Iterable[str] | None = None) -> None:
+    """
+    Invalidates the cached results of the given tables, all of them if None.
+    Needed for the writes not done through SQLiteClient write methods.
+    """
+    if tables is None:
+        _result_cache.bump_all()
+    else:
+        _result_cache.bump(tables)
+
+
+def table_versions(tables: Iterable[str]) -> tuple[int, ...]:
+    """
+    Versions of the tables in this process, moving with every committed write on them.
+    """
+    return _result_cache.versions(tables)
+
+
+def tables_modified_at(tables: Iterable[str]) -> float:
+    """
+    Timestamp of the last write on the tables, at most the start of the process.
+    """
+    return _result_cache.modified_at(tables)
+
+
+def serve_read_only_from(db_file: Path | None) -> None:
+    """
+    Points the clients created from now on without db_file to db_file, opened read-only,
+    back to the configured database if None. The results cached so far are invalidated.
+    """
+    global _fallback_db_file
+    previous, _fallback_db_file = _fallback_db_file, db_file
+    _result_cache.bump_all()
+    if previous is not None and previous != db_file:
+        # Leased connections are closed when released
+        for pool in list_pools():
+            if pool.db_file == previous:
+                pool.close_all()
 
 
 class SQLiteClient(ABC):
@@ -28,28 +80,220 @@ class SQLiteClient(ABC):
         self,
         logger: Logger | None = None,
         isolation_level: Literal["DEFERRED"] | None = None,
+        read_only: bool = False,
+        db_file: Path | None = None,
+        cache_results: bool = False,
+        content_db_file: Path | None = None,
+        write_content: bool = False,
     ) -> None:
+        """
+        Tables live in the user database (db_file) or the content one (content_db_file),
+        as routed by their __database__. The content database is attached read-only and
+        immutable, unless write_content, e.g. for the scripts generating the content.
+        Both are the same file when content_db_file is db_file.
+        """
         self.logger = logger or get_logger("SQLiteClient-logger")
+        # Connection pinned for a transaction, queries otherwise lease one from the pool
         self.connection: sqlite3.Connection | None = None
         self.cursor: sqlite3.Cursor | None = None
         assert isolation_level in {"DEFERRED", None}
+        if db_file is None and _fallback_db_file is not None:
+            db_file, read_only = _fallback_db_file, True
+        db_file = db_file or path_config.sqlite_db_file
+        content_db_file = content_db_file or path_config.content_db_file
+        attach_content = content_db_file.resolve() != db_file.resolve()
+        # Schema of each database in the queries
+        self._schemas = dict(
+            user="main", content="content" if attach_content else "main"
+        )
         self._isolation_level = isolation_level
-        self._connect()
+        self._read_only = read_only
+        # Nesting level of the transaction opened by this client, savepoints above 1
+        self._tx_depth = 0
+        # Whether the transaction acquired the pinned connection, to release it at the end
+        self._tx_release = False
+        self._tx_commit_every = 0
+        self._tx_units = 0
+        # Tables written in the transaction, their cached results are invalidated on commit
+        self._tx_written: set[str] = set()
+        # Reads of count, exists and select_rows go through the process wide result cache
+        self._cache_results = cache_results
+        self._pool = get_pool(
+            db_file=db_file,
+            read_only=read_only,
+            isolation_level=isolation_level,
+            content_db_file=content_db_file if attach_content else None,
+            write_content=write_content,
+        )
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Yields the pinned connection if any, a connection leased for the query otherwise.
+        """
+        if self.connection is None and self._isolation_level is not None:
+            # sqlite3 opens transactions implicitly, the connection is kept until commit
+            self.connection = self._pool.acquire()
+
+        if self.connection is not None:
+            yield self.connection
+            return
+
+        with self._pool.connection() as conn:
+            yield conn
+
+    def close(self) -> None:
+        """
+        Gives back the pinned connection to the pool, rolling back any pending transaction.
+        """
+        if self.connection is not None:
+            self._pool.release(self.connection)
+            self.connection = None
+
+    def pool_stats(self) -> PoolStats:
+        """
+        Usage of the connection pool this client leases its connections from.
+        """
+        return self._pool.stats()
+
+    def pool_health(self) -> PoolHealth:
+        """
+        Runs a probe query on a pooled connection.
+        """
+        return self._pool.health()
 
-    def _connect(self) -> None:
-        connection_identifier = f"sqlite_connection_{self._isolation_level or 'NONE'}"
+    def checkpoint(self) -> None:
+        """
+        Writes the WAL content back into the database file and truncates the WAL.
+        """
+        self.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+
+    @contextmanager
+    def transaction(self, commit_every: int = 0) -> Iterator[sqlite3.Connection]:
+        """
+        Runs the block in a transaction, committed on success and rolled back on error.
+
+        Nested blocks, and the writes of the client inside a block, run in savepoints: an
+        error only rolls back its own savepoint, the enclosing transaction can go on.
+
+        Parameters
+        ----------
+        commit_every : int, optional
+            Outermost transaction only. If > 0, commits every commit_every units of work,
+            a unit being a write of the client or a nested block, so that many small writes
+            share a commit (and its fsync) without holding the write lock for the whole run.
+            An error then only rolls back the units since the last commit. By default 0,
+            a single commit at the end
+
+        Yields
+        ------
+        sqlite3.Connection
+            The connection pinned for the transaction
+        """
+        if self._tx_depth == 0 and not (
+            self.connection is not None and self.connection.in_transaction
+        ):
+            self.start_transaction(commit_every=commit_every)
+            try:
+                yield self.connection  # type: ignore
+            except BaseException:
+                self.rollback()
+                raise
+            self.commit()
+            return
+
+        # A transaction is open on the pinned connection
+        conn: sqlite3.Connection = self.connection  # type: ignore
+        self._tx_depth += 1
+        savepoint = f"sp_{self._tx_depth}"
+        conn.execute(f"SAVEPOINT {savepoint};")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute(f"ROLLBACK TO {savepoint};")
+            conn.execute(f"RELEASE {savepoint};")
+            raise
+        else:
+            conn.execute(f"RELEASE {savepoint};")
+        finally:
+            self._tx_depth -= 1
+
+        if self._tx_depth == 1 and self._tx_commit_every > 0:
+            self._tx_units += 1
+            if self._tx_units >= self._tx_commit_every:
+                conn.commit()
+                _result_cache.bump(self._tx_written)
+                self._tx_written = set()
+                conn.execute(self._begin_statement())
+                self._tx_units = 0
+
+    @contextmanager
+    def _write_transaction(
+        self, table: Type[BaseTableModel]
+    ) -> Iterator[sqlite3.Connection]:
+        """
+        Yields a connection for a write, atomic on its own: in its own transaction, or in a
+        savepoint of the current one. With a DEFERRED isolation level, the transaction sqlite3
+        opens implicitly is left to commit.
+        """
+        if self._isolation_level is not None:
+            with self._connection() as conn:
+                self._tx_written.add(table.__tablename__)
+                yield conn
+            return
+
+        with self.transaction() as conn:
+            self._tx_written.add(table.__tablename__)
+            yield conn
+
+    def _begin_statement(self) -> str:
+        # Taking the write lock upfront, a deferred transaction upgrading to a write one can
+        # fail with SQLITE_BUSY without waiting for busy_timeout
+        return "BEGIN;" if self._read_only else "BEGIN IMMEDIATE;"
+
+    def _table_ref(self, table: Type[BaseTableModel]) -> str:
+        """
+        Table name qualified by the schema of the database it lives in.
+        """
+        return f"{self._schemas[table.__database__]}.{table.__tablename__}"
 
-        if not hasattr(_thread_local, connection_identifier):
-            conn = sqlite3.connect(
-                path_config.sqlite_db_file,
-                check_same_thread=False,
-                isolation_level=self._isolation_level,  # type: ignore
+    def _from(self, table: Type[BaseTableModel]) -> str:
+        """
+        FROM clause target of the table, views are inlined as a named subquery.
+        """
+        if issubclass(table, BaseViewModel):
+            return f"({" ".join(table.__view_sql__.split())}) AS {table.__tablename__}"
+        return self._table_ref(table)
+
+    @staticmethod
+    def _check_writable(table: Type[BaseTableModel]) -> None:
+        if issubclass(table, BaseViewModel):
+            raise SqliteWrongQueryError(
+                f"{table.__tablename__} is a view, it cannot be written to"
             )
-            conn.row_factory = sqlite3.Row
-            conn.execute("PRAGMA foreign_keys = ON;")
-            setattr(_thread_local, connection_identifier, conn)
 
-        self.connection = getattr(_thread_local, connection_identifier)
+    @staticmethod
+    def _insertable_row(to_insert: BaseTableModel) -> dict[str, object]:
+        row = to_insert.model_dump()
+        row.pop("createdAt", None)
+        row.pop("updatedAt", None)
+        return row
+
+    def _insert_query(
+        self, table: Type[GenericTableModel], cols: list[str], or_ignore: bool
+    ) -> str:
+        def compile() -> str:
+            query_parts = [
+                f"INSERT {"OR IGNORE" if or_ignore else ""} INTO {self._table_ref(table)}"
+            ]
+            query_parts.append(f"({",".join(cols)})")
+            query_parts.append(f"VALUES ({",".join(["?"] * len(cols))})")
+            query_parts.append(";")
+            return " ".join(query_parts)
+
+        return _query_cache.get_or_compile(
+            ("insert", self._table_ref(table), tuple(cols), or_ignore), compile
+        )
 
     def _logging(
         self, cursor: sqlite3.Cursor, query: str, params: tuple | None
@@ -58,7 +302,7 @@ class SQLiteClient(ABC):
             f"SQLiteClient executed: {cursor.rowcount=}, {query=}, {params=}"
         )
 
-    def _generate_cond(
+    def _cond_shape(
         self,
         cond_null: list[str] = list(),
         cond_not_null: list[str] = list(),
@@ -69,59 +313,115 @@ class SQLiteClient(ABC):
         cond_greater_or_eq: dict[str, object] = dict(),
         cond_less: dict[str, object] = dict(),
         cond_greater: dict[str, object] = dict(),
-    ) -> tuple[str, tuple]:
+    ) -> tuple[tuple, tuple]:
         """
-        Function that generates the condition as well as the args for any query
+        Function that normalizes the conditions of any query into a hashable shape
+
+        The shape only depends on the columns, the operators and the arity buckets of cond_in,
+        so that queries differing only by their values share the same compiled statement.
 
         Returns
         -------
-        str
-            The condition Starting with WHERE of the sql query
+        tuple
+            The shape of the condition, to give to SQLiteClient._generate_cond
         tuple
             The args parameter to give to SqlClient.execute
         """
-        conds = ["WHERE 1 = 1"]
+        shape: list[tuple[str, str, int]] = list()
         args = list()
 
-        for col in cond_null:
-            conds.append(f"AND {col} IS NULL")
-
-        for col in cond_not_null:
-            conds.append(f"AND {col} IS NOT NULL")
-
-        for col, ls_val in cond_in.items():
-            if len(ls_val) == 0:
-                # No values in the in -> no match
-                conds.append("AND 1 = 0")
-                continue
-            conds.append(f"AND {col} IN (" + ",".join(["?"] * len(ls_val)) + ")")
-            args.extend(ls_val)
-
-        for col, val in cond_equal.items():
-            conds.append(f"AND {col} = ?")
-            args.append(val)
-
-        for col, val in cond_non_equal.items():
-            conds.append(f"AND {col} <> ?")
-            args.append(val)
-
-        for col, val in cond_less_or_eq.items():
-            conds.append(f"AND {col} <= ?")
-            args.append(val)
-
-        for col, val in cond_greater_or_eq.items():
-            conds.append(f"AND {col} >= ?")
-            args.append(val)
+        for col in sorted(cond_null):
+            shape.append(("IS NULL", col, 0))
+
+        for col in sorted(cond_not_null):
+            shape.append(("IS NOT NULL", col, 0))
+
+        for col in sorted(cond_in):
+            ls_val = list(cond_in[col])
+            bucket = in_arity_bucket(len(ls_val))
+            shape.append(("IN", col, bucket))
+            # Padding with the last value does not change the IN result
+            args.extend(ls_val + ls_val[-1:] * (bucket - len(ls_val)))
+
+        for operator, cond in (
+            ("=", cond_equal),
+            ("<>", cond_non_equal),
+            ("<=", cond_less_or_eq),
+            (">=", cond_greater_or_eq),
+            ("<", cond_less),
+            (">", cond_greater),
+        ):
+            for col in sorted(cond):
+                shape.append((operator, col, 1))
+                args.append(cond[col])
+
+        return tuple(shape), tuple(args)
+
+    @staticmethod
+    def _generate_cond(shape: tuple) -> str:
+        """
+        Function that generates the condition of any query from its shape
 
-        for col, val in cond_less.items():
-            conds.append(f"AND {col} < ?")
-            args.append(val)
+        Returns
+        -------
+        str
+            The condition Starting with WHERE of the sql query
+        """
+        conds = ["WHERE 1 = 1"]
 
-        for col, val in cond_greater.items():
-            conds.append(f"AND {col} > ?")
-            args.append(val)
+        for operator, col, arity in shape:
+            if operator in {"IS NULL", "IS NOT NULL"}:
+                conds.append(f"AND {col} {operator}")
+            elif operator == "IN":
+                if arity == 0:
+                    # No values in the in -> no match
+                    conds.append("AND 1 = 0")
+                    continue
+                conds.append(f"AND {col} IN (" + ",".join(["?"] * arity) + ")")
+            else:
+                conds.append(f"AND {col} {operator} ?")
+
+        return " ".join(conds)
+
+    def _execute_read(
+        self, query: str, args: tuple, table: Type[BaseTableModel]
+    ) -> list[sqlite3.Row]:
+        """
+        Runs a read built by the client, through the result cache if enabled. The statements
+        of the query cache are already normalized, so (query, args) is the cache key.
+        Reads inside a transaction bypass the cache, they can see uncommitted writes.
+        """
+        if not self._cache_results or (
+            self.connection is not None and self.connection.in_transaction
+        ):
+            return self.execute(query=query, args=args)
+
+        tables = (
+            table.__view_tables__
+            if issubclass(table, BaseViewModel)
+            else (table.__tablename__,)
+        )
+        key = (query, args)
+        rows = _result_cache.get(key, tables)
+        if rows is None:
+            # Versions taken before reading, a write committed meanwhile makes the entry stale
+            versions = _result_cache.versions(tables)
+            rows = self.execute(query=query, args=args)
+            _result_cache.put(key, versions, rows)
+        # Callers may modify the list, not the cached rows
+        return list(rows)
+
+    def result_cache_stats(self) -> ResultCacheStats:
+        """
+        Hits, misses and size of the query results cache, shared by all the clients.
+        """
+        return _result_cache.stats()
 
-        return " ".join(conds), tuple(args)
+    def query_cache_stats(self) -> QueryCacheStats:
+        """
+        Hits and misses of the compiled statements cache, shared by all the clients.
+        """
+        return _query_cache.stats()
 
     def execute(self, query: str, args: tuple | None = None) -> list[dict[str, Any]]:
         """
@@ -139,22 +439,31 @@ class SQLiteClient(ABC):
         tuple
             Results of the query execution
         """
-        if not self.connection:
-            raise SqliteNoConnectionError("Could not execute query, no connection yet.")
-        self.cursor = self.connection.cursor()
-        try:
-            self.cursor.execute(query, args or ())
-            res = self.cursor.fetchall()
-        except Exception:
-            self.logger.warning(
-                f"error while executing query, {traceback.format_exc()}"
-            )
-            raise
-        self._logging(self.cursor, query, args)
-        self.cursor.close()
-        self.cursor = None
+        res, _ = self._execute(query=query, args=args)
         return res
 
+    def _execute(
+        self, query: str, args: tuple | None = None
+    ) -> tuple[list[sqlite3.Row], int]:
+        """
+        Execute a SQL query and return the results along with the number of modified rows.
+        """
+        with self._connection() as conn:
+            self.cursor = conn.cursor()
+            try:
+                self.cursor.execute(query, args or ())
+                res = self.cursor.fetchall()
+            except Exception:
+                self.logger.warning(
+                    f"error while executing query, {traceback.format_exc()}"
+                )
+                raise
+            self._logging(self.cursor, query, args)
+            rowcount = self.cursor.rowcount
+            self.cursor.close()
+            self.cursor = None
+        return res, rowcount
+
     def count(
         self,
         table: Type[GenericTableModel],
@@ -168,6 +477,7 @@ class SQLiteClient(ABC):
         cond_greater_or_eq: dict[str, object] = dict(),
         cond_less: dict[str, object] = dict(),
         cond_greater: dict[str, object] = dict(),
+        limit: int = 0,
     ) -> int:
         """
         Execute a SELECT COUNT(...) query with various conditions.
@@ -196,6 +506,9 @@ class SQLiteClient(ABC):
             Column values that must be less than given value
         cond_g : dict[str, object], optional
             Column values that must be greater than given value
+        limit : int, optional
+            Stops counting once limit rows matched, 0 means no limit, by default 0.
+            Cheaper than a full count when only a threshold matters
 
         Returns
         -------
@@ -204,10 +517,7 @@ class SQLiteClient(ABC):
         None
             if query went wrong
         """
-        query_parts = [
-            f"SELECT COUNT({', '.join(select_col) if select_col else '*'}) AS ct FROM {table.__tablename__}"
-        ]
-        cond, args = self._generate_cond(
+        shape, args = self._cond_shape(
             cond_equal=cond_equal,
             cond_greater=cond_greater,
             cond_greater_or_eq=cond_greater_or_eq,
@@ -219,13 +529,205 @@ class SQLiteClient(ABC):
             cond_null=cond_null,
         )
 
-        query_parts.append(cond)
-        query_parts.append(";")
-
-        res_Sql = self.execute(query=" ".join(query_parts), args=args)
+        def compile() -> str:
+            count_col = ", ".join(select_col) if select_col else "*"
+            if limit > 0:
+                # The subquery stops scanning as soon as limit rows matched
+                query_parts = [
+                    f"SELECT COUNT({count_col}) AS ct FROM (SELECT {', '.join(select_col) if select_col else '1'} FROM {self._from(table)}"
+                ]
+                query_parts.append(self._generate_cond(shape))
+                query_parts.append("LIMIT ?)")
+            else:
+                query_parts = [
+                    f"SELECT COUNT({count_col}) AS ct FROM {self._from(table)}"
+                ]
+                query_parts.append(self._generate_cond(shape))
+            query_parts.append(";")
+            return " ".join(query_parts)
+
+        query = _query_cache.get_or_compile(
+            ("count", self._table_ref(table), tuple(select_col), shape, limit > 0),
+            compile,
+        )
+        if limit > 0:
+            args += (limit,)
+        res_Sql = self._execute_read(query=query, args=args, table=table)
         res = res_Sql[0]["ct"]
         return int(str(res))
 
+    def exists(
+        self,
+        table: Type[GenericTableModel],
+        cond_null: list[str] = list(),
+        cond_not_null: list[str] = list(),
+        cond_in: dict[str, list] = dict(),
+        cond_equal: dict[str, object] = dict(),
+        cond_non_equal: dict[str, object] = dict(),
+        cond_less_or_eq: dict[str, object] = dict(),
+        cond_greater_or_eq: dict[str, object] = dict(),
+        cond_less: dict[str, object] = dict(),
+        cond_greater: dict[str, object] = dict(),
+    ) -> bool:
+        """
+        Check if at least one row matches the conditions, with a SELECT 1 ... LIMIT 1 probe.
+
+        Parameters
+        ----------
+        table : Type[T]
+            Table to query
+        cond_null : list[str], optional
+            Columns that must be NULL
+        cond_not_null : list[str], optional
+            Columns that must not be NULL
+        cond_in : dict[str, list], optional
+            Column values that must be in given list
+        cond_eq : dict[str, object], optional
+            Column values that must equal given value
+        cond_neq : dict[str, object], optional
+            Column values that must not equal given value
+        cond_leq : dict[str, object], optional
+            Column values that must be less than or equal to given value
+        cond_geq : dict[str, object], optional
+            Column values that must be greater than or equal to given value
+        cond_l : dict[str, object], optional
+            Column values that must be less than given value
+        cond_g : dict[str, object], optional
+            Column values that must be greater than given value
+
+        Returns
+        -------
+        bool
+            True if a row matched
+        """
+        shape, args = self._cond_shape(
+            cond_equal=cond_equal,
+            cond_greater=cond_greater,
+            cond_greater_or_eq=cond_greater_or_eq,
+            cond_in=cond_in,
+            cond_less=cond_less,
+            cond_less_or_eq=cond_less_or_eq,
+            cond_non_equal=cond_non_equal,
+            cond_not_null=cond_not_null,
+            cond_null=cond_null,
+        )
+
+        def compile() -> str:
+            query_parts = [f"SELECT 1 FROM {self._from(table)}"]
+            query_parts.append(self._generate_cond(shape))
+            query_parts.append("LIMIT 1")
+            query_parts.append(";")
+            return " ".join(query_parts)
+
+        query = _query_cache.get_or_compile(
+            ("exists", self._table_ref(table), shape), compile
+        )
+        return len(self._execute_read(query=query, args=args, table=table)) > 0
+
+    def select_rows(
+        self,
+        table: Type[GenericTableModel],
+        columns: list[str] = list(),
+        cond_null: list[str] = list(),
+        cond_not_null: list[str] = list(),
+        cond_in: dict[str, list] = dict(),
+        cond_equal: dict[str, object] = dict(),
+        cond_non_equal: dict[str, object] = dict(),
+        cond_less_or_eq: dict[str, object] = dict(),
+        cond_greater_or_eq: dict[str, object] = dict(),
+        cond_less: dict[str, object] = dict(),
+        cond_greater: dict[str, object] = dict(),
+        order_by: str = "",
+        ascending_order: bool = True,
+        limit: int = 0,
+        offset: int = 0,
+    ) -> list[sqlite3.Row]:
+        """
+        Execute a SELECT query with various conditions, without building models.
+
+        Rows are returned as sqlite3.Row, accessible by index or by column name,
+        which skips the model validation of SQLiteClient.select.
+
+        Parameters
+        ----------
+        table : Type[T]
+            Table to query from
+        columns : list[str], optional
+            Columns to select, by default all columns
+        cond_null : list[str], optional
+            Columns that must be NULL
+        cond_not_null : list[str], optional
+            Columns that must not be NULL
+        cond_in : dict[str, list], optional
+            Column values that must be in given list
+        cond_eq : dict[str, object], optional
+            Column values that must equal given value
+        cond_neq : dict[str, object], optional
+            Column values that must not equal given value
+        cond_leq : dict[str, object], optional
+            Column values that must be less than or equal to given value
+        cond_geq : dict[str, object], optional
+            Column values that must be greater than or equal to given value
+        cond_l : dict[str, object], optional
+            Column values that must be less than given value
+        cond_g : dict[str, object], optional
+            Column values that must be greater than given value
+        order_by : str, optional
+            Column to order by, by default no ordering
+        ascending_order : bool, optional
+            Ordering direction, by default True
+        limit : int, optional
+            Maximum number of rows to return, 0 means all, by default 0
+        offset : int, optional
+            Number of rows to skip before returning results, 0 means no offset, by default 0
+
+        Returns
+        -------
+        list[sqlite3.Row]
+            Query results
+        """
+        shape, args = self._cond_shape(
+            cond_equal=cond_equal,
+            cond_greater=cond_greater,
+            cond_greater_or_eq=cond_greater_or_eq,
+            cond_in=cond_in,
+            cond_less=cond_less,
+            cond_less_or_eq=cond_less_or_eq,
+            cond_non_equal=cond_non_equal,
+            cond_not_null=cond_not_null,
+            cond_null=cond_null,
+        )
+
+        def compile() -> str:
+            query_parts = [
+                f"SELECT {', '.join(columns) if columns else '*'} FROM {self._from(table)}"
+            ]
+            query_parts.append(self._generate_cond(shape))
+            if order_by:
+                query_parts.append(
+                    f"ORDER BY {order_by} {'ASC' if ascending_order else 'DESC'}"
+                )
+            if limit > 0:
+                query_parts.append("LIMIT ? OFFSET ?")
+            query_parts.append(";")
+            return " ".join(query_parts)
+
+        query = _query_cache.get_or_compile(
+            (
+                "select",
+                self._table_ref(table),
+                tuple(columns),
+                shape,
+                order_by,
+                ascending_order,
+                limit > 0,
+            ),
+            compile,
+        )
+        if limit > 0:
+            args += (limit, offset)
+        return self._execute_read(query=query, args=args, table=table)
+
     def select(
         self,
         table: Type[GenericTableModel],
@@ -246,6 +748,8 @@ class SQLiteClient(ABC):
         """
         Execute a SELECT query with various conditions.
 
+        Models are built with BaseTableModel.from_row, without validation.
+
         Parameters
         ----------
         table : str | Type[T]
@@ -278,8 +782,8 @@ class SQLiteClient(ABC):
         tuple
             Query results as a tuple of dictionaries or actual class if given
         """
-        query_parts = [f"SELECT * FROM {table.__tablename__}"]
-        cond, args = self._generate_cond(
+        res_Sql = self.select_rows(
+            table=table,
             cond_equal=cond_equal,
             cond_greater=cond_greater,
             cond_greater_or_eq=cond_greater_or_eq,
@@ -289,18 +793,221 @@ class SQLiteClient(ABC):
             cond_non_equal=cond_non_equal,
             cond_not_null=cond_not_null,
             cond_null=cond_null,
+            order_by=order_by,
+            ascending_order=ascending_order,
+            limit=limit,
+            offset=offset,
         )
-        query_parts.append(cond)
-        if order_by:
+        return list(table.from_row(r) for r in res_Sql)
+
+    def select_rows_iter(
+        self,
+        table: Type[GenericTableModel],
+        columns: list[str] = list(),
+        cond_null: list[str] = list(),
+        cond_not_null: list[str] = list(),
+        cond_in: dict[str, list] = dict(),
+        cond_equal: dict[str, object] = dict(),
+        cond_non_equal: dict[str, object] = dict(),
+        cond_less_or_eq: dict[str, object] = dict(),
+        cond_greater_or_eq: dict[str, object] = dict(),
+        cond_less: dict[str, object] = dict(),
+        cond_greater: dict[str, object] = dict(),
+        batch_size: int = 1000,
+        keyset_column: str | None = None,
+    ) -> Iterator[sqlite3.Row]:
+        """
+        Stream the rows matching the conditions, batch_size rows in memory at a time.
+
+        Without keyset_column, rows are fetched by batches from a single cursor, which keeps
+        its connection (and its read snapshot) until the iterator is exhausted or closed.
+        With keyset_column, each batch is its own query resuming after the last row seen,
+        ordered by (keyset_column, id), so no connection is held between batches and deep
+        pages cost as much as the first one as long as keyset_column is indexed.
+
+        Parameters
+        ----------
+        table : Type[T]
+            Table to query from
+        columns : list[str], optional
+            Columns to select, by default all columns. Must include keyset_column and id
+            when paginating
+        cond_null : list[str], optional
+            Columns that must be NULL
+        cond_not_null : list[str], optional
+            Columns that must not be NULL
+        cond_in : dict[str, list], optional
+            Column values that must be in given list
+        cond_eq : dict[str, object], optional
+            Column values that must equal given value
+        cond_neq : dict[str, object], optional
+            Column values that must not equal given value
+        cond_leq : dict[str, object], optional
+            Column values that must be less than or equal to given value
+        cond_geq : dict[str, object], optional
+            Column values that must be greater than or equal to given value
+        cond_l : dict[str, object], optional
+            Column values that must be less than given value
+        cond_g : dict[str, object], optional
+            Column values that must be greater than given value
+        batch_size : int, optional
+            Number of rows fetched at once, by default 1000
+        keyset_column : str | None, optional
+            Column to paginate on, e.g. "id", by default None (single cursor)
+
+        Yields
+        ------
+        sqlite3.Row
+            Query results
+        """
+        assert batch_size > 0
+        if columns and keyset_column is not None:
+            for col in (keyset_column, "id"):
+                if col not in columns:
+                    raise SqliteWrongQueryError(
+                        f"{col=} must be selected to paginate on {keyset_column=}"
+                    )
+
+        shape, args = self._cond_shape(
+            cond_equal=cond_equal,
+            cond_greater=cond_greater,
+            cond_greater_or_eq=cond_greater_or_eq,
+            cond_in=cond_in,
+            cond_less=cond_less,
+            cond_less_or_eq=cond_less_or_eq,
+            cond_non_equal=cond_non_equal,
+            cond_not_null=cond_not_null,
+            cond_null=cond_null,
+        )
+
+        def compile(after: bool) -> str:
+            query_parts = [
+                f"SELECT {', '.join(columns) if columns else '*'} FROM {self._from(table)}"
+            ]
+            query_parts.append(self._generate_cond(shape))
+            if keyset_column is None:
+                query_parts.append(";")
+                return " ".join(query_parts)
+
+            if after and keyset_column == "id":
+                query_parts.append("AND id > ?")
+            elif after:
+                query_parts.append(f"AND ({keyset_column}, id) > (?, ?)")
             query_parts.append(
-                f"ORDER BY {order_by} {'ASC' if ascending_order else 'DESC'}"
+                "ORDER BY id"
+                if keyset_column == "id"
+                else f"ORDER BY {keyset_column}, id"
             )
-        if limit > 0:
-            query_parts.append(f"LIMIT {limit}")
-            query_parts.append(f"OFFSET {offset}")
-        query_parts.append(";")
-        res_Sql = self.execute(query=" ".join(query_parts), args=args)
-        return list(table(**r) for r in res_Sql)
+            query_parts.append("LIMIT ?")
+            query_parts.append(";")
+            return " ".join(query_parts)
+
+        def get_query(after: bool) -> str:
+            return _query_cache.get_or_compile(
+                (
+                    "select_iter",
+                    self._table_ref(table),
+                    tuple(columns),
+                    shape,
+                    keyset_column,
+                    after,
+                ),
+                lambda: compile(after),
+            )
+
+        if keyset_column is None:
+            with self._connection() as conn:
+                cursor = conn.execute(get_query(after=False), args)
+                try:
+                    while batch := cursor.fetchmany(batch_size):
+                        yield from batch
+                finally:
+                    cursor.close()
+            return
+
+        last_row: sqlite3.Row | None = None
+        while True:
+            if last_row is None:
+                batch = self.execute(get_query(after=False), args + (batch_size,))
+            elif keyset_column == "id":
+                batch = self.execute(
+                    get_query(after=True), args + (last_row["id"], batch_size)
+                )
+            else:
+                batch = self.execute(
+                    get_query(after=True),
+                    args + (last_row[keyset_column], last_row["id"], batch_size),
+                )
+            yield from batch
+            if len(batch) < batch_size:
+                return
+            last_row = batch[-1]
+
+    def select_iter(
+        self,
+        table: Type[GenericTableModel],
+        cond_null: list[str] = list(),
+        cond_not_null: list[str] = list(),
+        cond_in: dict[str, list] = dict(),
+        cond_equal: dict[str, object] = dict(),
+        cond_non_equal: dict[str, object] = dict(),
+        cond_less_or_eq: dict[str, object] = dict(),
+        cond_greater_or_eq: dict[str, object] = dict(),
+        cond_less: dict[str, object] = dict(),
+        cond_greater: dict[str, object] = dict(),
+        batch_size: int = 1000,
+        keyset_column: str | None = None,
+    ) -> Iterator[GenericTableModel]:
+        """
+        Stream the rows matching the conditions as models, see SQLiteClient.select_rows_iter.
+
+        Parameters
+        ----------
+        table : Type[T]
+            Table to query from
+        cond_null : list[str], optional
+            Columns that must be NULL
+        cond_not_null : list[str], optional
+            Columns that must not be NULL
+        cond_in : dict[str, list], optional
+            Column values that must be in given list
+        cond_eq : dict[str, object], optional
+            Column values that must equal given value
+        cond_neq : dict[str, object], optional
+            Column values that must not equal given value
+        cond_leq : dict[str, object], optional
+            Column values that must be less than or equal to given value
+        cond_geq : dict[str, object], optional
+            Column values that must be greater than or equal to given value
+        cond_l : dict[str, object], optional
+            Column values that must be less than given value
+        cond_g : dict[str, object], optional
+            Column values that must be greater than given value
+        batch_size : int, optional
+            Number of rows fetched at once, by default 1000
+        keyset_column : str | None, optional
+            Column to paginate on, e.g. "id", by default None (single cursor)
+
+        Yields
+        ------
+        T
+            Query results
+        """
+        for r in self.select_rows_iter(
+            table=table,
+            cond_equal=cond_equal,
+            cond_greater=cond_greater,
+            cond_greater_or_eq=cond_greater_or_eq,
+            cond_in=cond_in,
+            cond_less=cond_less,
+            cond_less_or_eq=cond_less_or_eq,
+            cond_non_equal=cond_non_equal,
+            cond_not_null=cond_not_null,
+            cond_null=cond_null,
+            batch_size=batch_size,
+            keyset_column=keyset_column,
+        ):
+            yield table.from_row(r)
 
     def select_by_id(
         self,
@@ -337,14 +1044,33 @@ class SQLiteClient(ABC):
         table: Type[GenericTableModel],
         id: str,
     ) -> bool:
-        try:
-            self.select_by_id(table=table, id=id)
-            return True
-        except SqliteIdNotFoundError:
-            return False
+        return self.exists(table=table, cond_equal={"id": id})
 
-    def start_transaction(self) -> None:
-        self._connect()
+    def start_transaction(self, commit_every: int = 0) -> None:
+        """
+        Pins a connection of the pool and opens a transaction on it until commit or rollback.
+        See SQLiteClient.transaction for commit_every.
+        """
+        if self._tx_depth > 0:
+            raise SqliteWrongQueryError("A transaction is already started.")
+        self._tx_release = self.connection is None
+        if self.connection is None:
+            self.connection = self._pool.acquire()
+        self.connection.execute(self._begin_statement())
+        self._tx_depth = 1
+        self._tx_commit_every = commit_every
+        self._tx_units = 0
+        self._tx_written = set()
+
+    def _end_transaction(self) -> None:
+        release = self._tx_release or self._tx_depth == 0
+        self._tx_depth = 0
+        self._tx_release = False
+        self._tx_commit_every = 0
+        self._tx_units = 0
+        self._tx_written = set()
+        if release:
+            self.close()
 
     def commit(self) -> None:
         """
@@ -352,7 +1078,14 @@ class SQLiteClient(ABC):
         """
         if not self.connection:
             raise SqliteNoConnectionError("Cannot commit if transaction is closed.")
-        self.connection.commit()
+        try:
+            self.connection.commit()
+        except BaseException:
+            self.rollback()
+            raise
+        # Only once committed, a read before would cache the rows of before the write
+        _result_cache.bump(self._tx_written)
+        self._end_transaction()
 
     def rollback(self) -> None:
         """
@@ -360,7 +1093,10 @@ class SQLiteClient(ABC):
         """
         if not self.connection:
             raise SqliteNoConnectionError("Cannot commit if transaction is closed.")
-        self.connection.rollback()
+        try:
+            self.connection.rollback()
+        finally:
+            self._end_transaction()
 
     def insert_one(
         self,
@@ -404,13 +1140,8 @@ class SQLiteClient(ABC):
         or_ignore : bool, optional
             If True, use INSERT IGNORE, default False
         """
-        to_insert_dict = [e.model_dump() for e in to_insert]
-
-        for row in to_insert_dict:
-            if "createdAt" in row:
-                del row["createdAt"]
-            if "updatedAt" in row:
-                del row["updatedAt"]
+        self._check_writable(table)
+        to_insert_dict = [self._insertable_row(e) for e in to_insert]
 
         to_insert_dict = [row for row in to_insert_dict if row]
         if not to_insert_dict:
@@ -430,25 +1161,93 @@ class SQLiteClient(ABC):
                     )
         cols = list(cols)
 
-        query_parts = [
-            f"INSERT {"OR IGNORE" if or_ignore else ""} INTO {table.__tablename__}"
-        ]
-        query_parts.append(f"({",".join(cols)})")
-        query_parts.append("VALUES")
+        # One row per statement execution, so the number of rows is not bound by
+        # SQLITE_LIMIT_VARIABLE_NUMBER, all in a single transaction
+        query = self._insert_query(table=table, cols=cols, or_ignore=or_ignore)
+        with self._write_transaction(table) as conn:
+            self.cursor = conn.executemany(
+                query, [tuple(row[col] for col in cols) for row in to_insert_dict]
+            )
+            self._logging(self.cursor, query, None)
+            self.cursor.close()
+            self.cursor = None
 
-        insert_part = list()
-        args = list()
-        for row in to_insert_dict:
-            insert_part.append(f"({",".join(["?"] * len(cols))})")
-            args.extend([row[col] for col in cols])
-        query_parts.append(",".join(insert_part))
+    def insert_many(
+        self,
+        table: Type[GenericTableModel],
+        to_insert: Iterable[GenericTableModel],
+        or_ignore=False,
+        chunk_size: int = sqlite_config.bulk_insert_chunk_size,
+        defer_foreign_keys: bool = False,
+    ) -> BulkInsertReport:
+        """
+        Stream rows into a database table, chunk by chunk, in a single transaction.
+
+        Only one chunk of rows is materialized at a time, so any iterator of models
+        (e.g. a generator reading a file) is inserted in constant memory.
 
-        query_parts.append(";")
+        Parameters
+        ----------
+        table: GenericTableModel
+            Table to insert into
+        to_insert : Iterable[GenericTableModel]
+            Rows to insert, all with the same columns
+        or_ignore : bool, optional
+            If True, use INSERT IGNORE, default False
+        chunk_size : int, optional
+            Number of rows given to each executemany
+        defer_foreign_keys : bool, optional
+            If True, foreign keys are only checked at commit, so tables referencing
+            each other can be loaded in any order, default False
 
-        self.execute(
-            query=" ".join(query_parts),
-            args=tuple(args),
+        Returns
+        -------
+        BulkInsertReport
+            Number of rows inserted and throughput
+        """
+        assert chunk_size > 0
+        self._check_writable(table)
+        rows = iter(to_insert)
+        first = next(rows, None)
+        if first is None:
+            raise SqliteNoValueInsertionError()
+        cols = list(self._insertable_row(first).keys())
+        query = self._insert_query(table=table, cols=cols, or_ignore=or_ignore)
+
+        nb_rows = 0
+        nb_inserted = 0
+        nb_chunks = 0
+        start = time.perf_counter()
+        with self._write_transaction(table) as conn:
+            if defer_foreign_keys:
+                # Reset automatically at the end of the transaction
+                conn.execute("PRAGMA defer_foreign_keys = ON;")
+            for chunk in batched(chain([first], rows), chunk_size):
+                args = list()
+                for e in chunk:
+                    row = self._insertable_row(e)
+                    if len(row) != len(cols) or any(col not in row for col in cols):
+                        raise SqliteColumnInconsistencyError(
+                            f"{row=} does not have the columns of the first row to insert: col_of_first_row={cols}"
+                        )
+                    args.append(tuple(row[col] for col in cols))
+                cursor = conn.executemany(query, args)
+                nb_rows += len(args)
+                nb_inserted += max(cursor.rowcount, 0)
+                nb_chunks += 1
+                cursor.close()
+        elapsed_s = time.perf_counter() - start
+
+        report = BulkInsertReport(
+            table=table.__tablename__,
+            rows=nb_rows,
+            inserted=nb_inserted,
+            chunks=nb_chunks,
+            elapsed_s=elapsed_s,
+            rows_per_s=nb_rows / elapsed_s if elapsed_s > 0 else 0.0,
         )
+        self.logger.info(f"SQLiteClient bulk inserted: {report=}")
+        return report
 
     def update_by_id(
         self,
@@ -471,44 +1270,84 @@ class SQLiteClient(ABC):
         update_col_value : dict[str, object], optional
             Dictionary mapping columns to update with specific values
         """
-        if not self.id_exists(table=table, id=id):
-            raise SqliteIdNotFoundError(
-                f"{id=} not found during update in table {table if isinstance(table, str) else table.__tablename__}"
-            )
+        self._check_writable(table)
         for col in update_col_value:
             if col in update_col_col:
-                raise SqliteDuplicateColumnUpdateError(
-                    f"Duplicates column in update statement. {col=} is in both update_col_value and update_col_col."
-                )
-        for col in update_col_col:
-            if col in update_col_value:
-                raise SqliteDuplicateColumnUpdateError(
-                    f"Duplicates column in update statement. {col=} is in both update_col_value and update_col_col."
-                )
+                raise SqliteDuplicateColumnUpdateError(col)
 
         if not update_col_col and not update_col_value:
             raise SqliteNoUpdateValuesError()
 
-        query_parts = [f"UPDATE {table.__tablename__}"]
-        query_parts.append("SET")
-
-        col_col_parts: list[str] = list()
-        for col_dst, col_src in update_col_col.items():
-            col_col_parts.append(f"{col_dst}={col_src}")
-        query_parts.append(",".join(col_col_parts))
+        def compile() -> str:
+            query_parts = [f"UPDATE {self._table_ref(table)}"]
+            query_parts.append("SET")
+
+            set_parts: list[str] = list()
+            for col_dst, col_src in update_col_col.items():
+                set_parts.append(f"{col_dst}={col_src}")
+            for col_dst in update_col_value:
+                set_parts.append(f"{col_dst}=?")
+            query_parts.append(",".join(set_parts))
+
+            query_parts.append(f"WHERE id=?")
+            query_parts.append(";")
+            return " ".join(query_parts)
+
+        query = _query_cache.get_or_compile(
+            (
+                "update",
+                self._table_ref(table),
+                tuple(update_col_col.items()),
+                tuple(update_col_value),
+            ),
+            compile,
+        )
 
-        col_val_parts: list[str] = list()
-        values = list()
-        for col_dst, value in update_col_value.items():
-            col_val_parts.append(f"{col_dst}=?")
-            values.append(value)
-        query_parts.append(",".join(col_val_parts))
+        # The row count replaces a select beforehand to know if the id exists
+        with self._write_transaction(table):
+            _, rowcount = self._execute(
+                query=query, args=(*update_col_value.values(), id)
+            )
+        if rowcount == 0:
+            raise SqliteIdNotFoundError(
+                f"{id=} not found during update in table {table.__tablename__}"
+            )
 
-        query_parts.append(f"WHERE id=?")
-        values.append(id)
-        query_parts.append(";")
+    def _delete(
+        self,
+        table: Type[GenericTableModel],
+        returning: bool,
+        **conds,
+    ) -> tuple[list[sqlite3.Row], int]:
+        """
+        Runs a single DELETE statement, with RETURNING * if the deleted rows are needed.
 
-        self.execute(query=" ".join(query_parts), args=tuple(values))
+        Returns
+        -------
+        list[sqlite3.Row]
+            Deleted rows, empty if not returning
+        int
+            Number of deleted rows
+        """
+        self._check_writable(table)
+        shape, args = self._cond_shape(**conds)
+
+        def compile() -> str:
+            query_parts = [f"DELETE FROM {self._table_ref(table)}"]
+            query_parts.append(self._generate_cond(shape))
+            if returning:
+                query_parts.append("RETURNING *")
+            query_parts.append(";")
+            return " ".join(query_parts)
+
+        query = _query_cache.get_or_compile(
+            ("delete", self._table_ref(table), shape, returning), compile
+        )
+        with self._write_transaction(table):
+            res_Sql, rowcount = self._execute(query=query, args=args)
+        if rowcount == 0:
+            self.logger.info("nothing to delete")
+        return res_Sql, rowcount
 
     def delete(
         self,
@@ -522,6 +1361,7 @@ class SQLiteClient(ABC):
         cond_greater_or_eq: dict[str, object] = dict(),
         cond_less: dict[str, object] = dict(),
         cond_greater: dict[str, object] = dict(),
+        returning: bool = True,
     ) -> list[GenericTableModel]:
         """
         Delete rows from a database table based on conditions and returns them.
@@ -548,14 +1388,18 @@ class SQLiteClient(ABC):
             Column values that must be less than given value
         cond_g : dict[str, object], optional
             Column values that must be greater than given value
+        returning : bool, optional
+            If False, deleted rows are neither sent back nor hydrated and an empty list
+            is returned, by default True
 
         Returns
         -------
         tuple
             Deleted rows as a tuple of dictionaries or actual class if given
         """
-        res_Sql = self.select(
+        res_Sql, _ = self._delete(
             table=table,
+            returning=returning,
             cond_equal=cond_equal,
             cond_greater=cond_greater,
             cond_greater_or_eq=cond_greater_or_eq,
@@ -566,22 +1410,11 @@ class SQLiteClient(ABC):
             cond_not_null=cond_not_null,
             cond_null=cond_null,
         )
-        ids_to_delete_ls: list[str] = [r.id for r in res_Sql]
-
-        if not ids_to_delete_ls:
-            self.logger.info("nothing to update")
-            return list()
-
-        query_parts = [f"DELETE FROM {table.__tablename__}"]
-        query_parts.append(f"WHERE id IN ({", ".join(["?"]*len(ids_to_delete_ls))})")
-        query_parts.append(";")
-
-        self.execute(query=" ".join(query_parts), args=tuple(ids_to_delete_ls))
-        return res_Sql
+        return list(table.from_row(r) for r in res_Sql)
 
     def delete_by_id(
-        self, table: Type[GenericTableModel], id: str
-    ) -> GenericTableModel:
+        self, table: Type[GenericTableModel], id: str, returning: bool = True
+    ) -> GenericTableModel | None:
         """
         Delete a row from a database table by its ID.
 
@@ -591,16 +1424,20 @@ class SQLiteClient(ABC):
             Table name or actual table class to query from
         id : str
             ID of the row to delete
+        returning : bool, optional
+            If False, the deleted row is not sent back and None is returned, by default True
 
         Returns
         -------
         dict[str, object] | T
             Deleted row as a dictionnary or actual class if given
         """
-        res_Sql = self.delete(table=table, cond_equal={"id": id})
+        res_Sql, rowcount = self._delete(
+            table=table, returning=returning, cond_equal={"id": id}
+        )
 
-        if not res_Sql:
+        if rowcount == 0:
             raise SqliteIdNotFoundError(
                 f"{id=} not found during delete in table {table.__tablename__}"
             )
-        return res_Sql[0]
+        return table.from_row(res_Sql[0]) if returning else None
@@ -31,3 +31,13 @@ class SqliteWrongQueryError(Exception):
 class SqliteIdNotFoundError(Exception):
     def __init__(self, detail: str | None = None) -> None:
         super().__init__(detail)
+
+
+class SqlitePoolTimeoutError(Exception):
+    def __init__(self, detail: str | None = None) -> None:
+        super().__init__(detail)
+
+
+class SqliteQueryTimeoutError(Exception):
+    def __init__(self, detail: str | None = None) -> None:
+        super().__init__(detail)
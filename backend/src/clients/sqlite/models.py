@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class BulkInsertReport(BaseModel):
+    table: str
+    rows: int
+    inserted: int
+    chunks: int
+    elapsed_s: float
+    rows_per_s: float
@@ -0,0 +1,52 @@
+import sqlite3
+import threading
+from pathlib import Path
+
+
+class DatabaseChangeMonitor:
+    """
+    Tells whether the database was committed to since the last mark.
+
+    PRAGMA data_version changes whenever another connection commits, so the monitor keeps
+    its own connection open, outside of any transaction. The inode is part of the state
+    since a swapped database file needs a new connection.
+    """
+
+    def __init__(self, db_file: Path) -> None:
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._inode: int | None = None
+        self._marked: tuple[int, int] | None = None
+
+    def state(self) -> tuple[int, int]:
+        with self._lock:
+            inode = self.db_file.stat().st_ino
+            if self._conn is None or inode != self._inode:
+                if self._conn is not None:
+                    self._conn.close()
+                self._conn = sqlite3.connect(
+                    f"{self.db_file.resolve().as_uri()}?mode=ro",
+                    uri=True,
+                    check_same_thread=False,
+                    isolation_level=None,
+                )
+                self._inode = inode
+            return inode, self._conn.execute("PRAGMA data_version;").fetchone()[0]
+
+    def is_marked(self, state: tuple[int, int]) -> bool:
+        return state == self._marked
+
+    def mark(self, state: tuple[int, int] | None = None) -> None:
+        """
+        Marks the given state, taken before the backup started, as backed up.
+        """
+        self._marked = state or self.state()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+            self._inode = None
+            self._marked = None
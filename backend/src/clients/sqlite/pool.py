@@ -0,0 +1,372 @@
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from logging import Logger
+from pathlib import Path
+from typing import Iterator, Literal
+
+from src.config.sqlite import PragmaProfile, sqlite_config
+from src.logger import get_logger
+
+from .exceptions import SqlitePoolTimeoutError
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    db_file: str
+    read_only: bool
+    content_db_file: str | None
+    max_size: int
+    open: int
+    in_use: int
+    idle: int
+    created: int
+    acquired: int
+    waited: int
+    evicted: int
+
+
+@dataclass(frozen=True)
+class PoolHealth:
+    db_file: str
+    read_only: bool
+    healthy: bool
+    journal_mode: str | None
+    latency_ms: float
+    error: str | None = None
+
+
+class SQLiteConnectionPool:
+    """
+    Bounded pool of sqlite connections to a single database file.
+
+    Connections are opened lazily up to max_size, handed to one thread at a time and closed
+    once they stayed idle longer than idle_timeout_s. Read-write pools switch the database
+    to WAL journaling so that readers are never blocked by writers (nor by backups).
+    The content database, if any, is attached to every connection as the "content" schema.
+    A drained pool holds back new leases until resumed, e.g. while its file is swapped.
+    """
+
+    def __init__(
+        self,
+        db_file: Path,
+        read_only: bool = False,
+        isolation_level: Literal["DEFERRED"] | None = None,
+        content_db_file: Path | None = None,
+        write_content: bool = False,
+        profile: PragmaProfile | None = None,
+        max_size: int = sqlite_config.pool_max_size,
+        idle_timeout_s: float = sqlite_config.pool_idle_timeout_s,
+        acquire_timeout_s: float = sqlite_config.pool_acquire_timeout_s,
+        logger: Logger | None = None,
+    ) -> None:
+        assert max_size > 0
+        self.db_file = db_file
+        self.read_only = read_only
+        self.isolation_level = isolation_level
+        self.content_db_file = content_db_file
+        self.write_content = write_content
+        self.profile = profile or sqlite_config.get_pragma_profile()
+        self.max_size = max_size
+        self.idle_timeout_s = idle_timeout_s
+        self.acquire_timeout_s = acquire_timeout_s
+        self.logger = logger or get_logger("SQLiteConnectionPool-logger")
+
+        self._condition = threading.Condition()
+        # (connection, last release timestamp), most recently released on the right
+        self._idle: deque[tuple[sqlite3.Connection, float]] = deque()
+        # Leased connections and the generation they were opened in
+        self._in_use: dict[sqlite3.Connection, int] = dict()
+        self._opening = 0
+        self._generation = 0
+        self._draining = False
+        self._created = 0
+        self._acquired = 0
+        self._waited = 0
+        self._evicted = 0
+
+    def _open(self) -> sqlite3.Connection:
+        if self.read_only:
+            conn = sqlite3.connect(
+                f"{self.db_file.resolve().as_uri()}?mode=ro",
+                uri=True,
+                check_same_thread=False,
+                isolation_level=self.isolation_level,  # type: ignore
+                cached_statements=sqlite_config.cached_statements,
+            )
+        else:
+            conn = sqlite3.connect(
+                self.db_file.resolve().as_uri(),
+                # For the URI of the attached content database
+                uri=True,
+                check_same_thread=False,
+                isolation_level=self.isolation_level,  # type: ignore
+                cached_statements=sqlite_config.cached_statements,
+            )
+            conn.execute("PRAGMA journal_mode = WAL;")
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {sqlite_config.busy_timeout_ms};")
+        conn.execute(f"PRAGMA cache_size = {self.profile.cache_size};")
+        conn.execute(f"PRAGMA mmap_size = {self.profile.mmap_size};")
+        conn.execute(f"PRAGMA synchronous = {self.profile.synchronous};")
+        conn.execute("PRAGMA foreign_keys = ON;")
+        if self.content_db_file is not None:
+            self._attach_content(conn)
+        if self.read_only:
+            conn.execute("PRAGMA query_only = ON;")
+        return conn
+
+    def _attach_content(self, conn: sqlite3.Connection) -> None:
+        assert self.content_db_file is not None
+        if self.write_content:
+            mode = "ro" if self.read_only else "rw"
+        else:
+            # No locking nor change detection, the file must not change while opened
+            mode = "ro&immutable=1"
+        conn.execute(
+            "ATTACH DATABASE ? AS content;",
+            (f"{self.content_db_file.resolve().as_uri()}?mode={mode}",),
+        )
+        conn.execute(f"PRAGMA content.mmap_size = {sqlite_config.content_mmap_size};")
+
+    def _evict_idle(self, now: float) -> list[sqlite3.Connection]:
+        """
+        Pops the connections idle for too long, to be closed outside of the lock.
+        """
+        evicted = list()
+        while self._idle and now - self._idle[0][1] > self.idle_timeout_s:
+            evicted.append(self._idle.popleft()[0])
+        self._evicted += len(evicted)
+        return evicted
+
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Leases a connection, waiting at most acquire_timeout_s for one to be released.
+        """
+        deadline = time.monotonic() + self.acquire_timeout_s
+        with self._condition:
+            to_close = self._evict_idle(time.monotonic())
+            waited = False
+            while self._draining or (
+                not self._idle and len(self._in_use) + self._opening >= self.max_size
+            ):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise SqlitePoolTimeoutError(
+                        f"No sqlite connection available after {self.acquire_timeout_s}s, {self.max_size=}, {self._draining=}"
+                    )
+                waited = True
+                self._condition.wait(remaining)
+            self._waited += waited
+            self._acquired += 1
+
+            generation = self._generation
+            if self._idle:
+                conn = self._idle.pop()[0]
+                self._in_use[conn] = generation
+            else:
+                conn = None
+                # Reserving the slot while opening outside of the lock
+                self._opening += 1
+
+        for c in to_close:
+            c.close()
+
+        if conn is None:
+            try:
+                conn = self._open()
+            except Exception:
+                with self._condition:
+                    self._opening -= 1
+                    self._condition.notify_all()
+                raise
+            with self._condition:
+                self._opening -= 1
+                self._created += 1
+                self._in_use[conn] = generation
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """
+        Gives back a leased connection, rolling back any transaction left open.
+        """
+        if conn.in_transaction:
+            self.logger.warning(
+                "Connection released with an open transaction, rollback"
+            )
+            conn.rollback()
+        with self._condition:
+            stale = self._in_use.get(conn) != self._generation
+            to_close = self._evict_idle(time.monotonic())
+            if not stale:
+                self._in_use.pop(conn)
+                self._idle.append((conn, time.monotonic()))
+                self._condition.notify_all()
+        for c in to_close:
+            c.close()
+
+        if stale:
+            # Opened before a close_all, must not be reused. Counted as leased until
+            # closed, a drain must not see its file swapped before.
+            conn.close()
+            with self._condition:
+                self._in_use.pop(conn, None)
+                self._evicted += 1
+                self._condition.notify_all()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self) -> None:
+        """
+        Closes the idle connections, leased ones are closed when released.
+        """
+        with self._condition:
+            self._generation += 1
+            to_close = [c for c, _ in self._idle]
+            self._idle.clear()
+            self._evicted += len(to_close)
+        for c in to_close:
+            c.close()
+
+    def drain(self, timeout_s: float = sqlite_config.pool_drain_timeout_s) -> None:
+        """
+        Holds back new leases and closes every connection, waiting for the leased ones to
+        be released. On timeout the pool is resumed and SqlitePoolTimeoutError raised.
+        """
+        deadline = time.monotonic() + timeout_s
+        with self._condition:
+            self._draining = True
+        self.close_all()
+        with self._condition:
+            while self._in_use or self._opening:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._draining = False
+                    self._condition.notify_all()
+                    raise SqlitePoolTimeoutError(
+                        f"Sqlite connections still leased after {timeout_s}s, {len(self._in_use)=}"
+                    )
+                self._condition.wait(remaining)
+
+    def resume(self) -> None:
+        with self._condition:
+            self._draining = False
+            self._condition.notify_all()
+
+    def stats(self) -> PoolStats:
+        with self._condition:
+            return PoolStats(
+                db_file=str(self.db_file),
+                read_only=self.read_only,
+                content_db_file=(
+                    str(self.content_db_file) if self.content_db_file else None
+                ),
+                max_size=self.max_size,
+                open=len(self._idle) + len(self._in_use),
+                in_use=len(self._in_use),
+                idle=len(self._idle),
+                created=self._created,
+                acquired=self._acquired,
+                waited=self._waited,
+                evicted=self._evicted,
+            )
+
+    def health(self) -> PoolHealth:
+        start = time.perf_counter()
+        try:
+            with self.connection() as conn:
+                conn.execute("SELECT 1;").fetchone()
+                journal_mode = conn.execute("PRAGMA journal_mode;").fetchone()[0]
+        except Exception as e:
+            return PoolHealth(
+                db_file=str(self.db_file),
+                read_only=self.read_only,
+                healthy=False,
+                journal_mode=None,
+                latency_ms=(time.perf_counter() - start) * 1000,
+                error=repr(e),
+            )
+        return PoolHealth(
+            db_file=str(self.db_file),
+            read_only=self.read_only,
+            healthy=True,
+            journal_mode=journal_mode,
+            latency_ms=(time.perf_counter() - start) * 1000,
+        )
+
+
+_pools: dict[tuple[str, bool, str | None, str | None, bool], SQLiteConnectionPool] = (
+    dict()
+)
+_pools_lock = threading.Lock()
+
+
+def get_pool(
+    db_file: Path,
+    read_only: bool = False,
+    isolation_level: Literal["DEFERRED"] | None = None,
+    content_db_file: Path | None = None,
+    write_content: bool = False,
+) -> SQLiteConnectionPool:
+    """
+    Returns the process wide pool of the given database files and connection mode.
+    """
+    key = (
+        str(db_file.resolve()),
+        read_only,
+        isolation_level,
+        str(content_db_file.resolve()) if content_db_file else None,
+        write_content,
+    )
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = SQLiteConnectionPool(
+                db_file=db_file,
+                read_only=read_only,
+                isolation_level=isolation_level,
+                content_db_file=content_db_file,
+                write_content=write_content,
+            )
+        return _pools[key]
+
+
+def list_pools() -> list[SQLiteConnectionPool]:
+    with _pools_lock:
+        return list(_pools.values())
+
+
+def close_all_pools() -> None:
+    for pool in list_pools():
+        pool.close_all()
+
+
+@contextmanager
+def drained_pools(
+    *db_files: Path, timeout_s: float = sqlite_config.pool_drain_timeout_s
+) -> Iterator[None]:
+    """
+    Runs the block with no connection open (or attached) on db_files by the pools, new
+    leases waiting for its end. The requests in flight are let finish on their connection
+    first.
+    """
+    keys = {str(db_file.resolve()) for db_file in db_files}
+    drained: list[SQLiteConnectionPool] = list()
+    try:
+        for pool in list_pools():
+            opened = [pool.db_file, pool.content_db_file]
+            if any(f is not None and str(f.resolve()) in keys for f in opened):
+                pool.drain(timeout_s)
+                drained.append(pool)
+        yield
+    finally:
+        for pool in drained:
+            pool.resume()
@@ -0,0 +1,88 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Hashable
+
+
+@dataclass(frozen=True)
+class QueryCacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class QueryCache:
+    """
+    Thread safe LRU cache of compiled SQL statements.
+
+    Keys are query shapes (table, condition columns and operators, arity buckets, ...),
+    values are the SQL strings. Since sqlite3 caches prepared statements per connection
+    keyed on the SQL text, a stable SQL string also means the statement is only prepared once.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        assert maxsize > 0
+        self.maxsize = maxsize
+        self._statements: OrderedDict[Hashable, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get_or_compile(self, key: Hashable, compile: Callable[[], str]) -> str:
+        """
+        Returns the statement cached for key, compiling and caching it if missing.
+        """
+        with self._lock:
+            statement = self._statements.get(key)
+            if statement is not None:
+                self._statements.move_to_end(key)
+                self._hits += 1
+                return statement
+            self._misses += 1
+
+        statement = compile()
+
+        with self._lock:
+            self._statements[key] = statement
+            self._statements.move_to_end(key)
+            while len(self._statements) > self.maxsize:
+                self._statements.popitem(last=False)
+                self._evictions += 1
+        return statement
+
+    def stats(self) -> QueryCacheStats:
+        with self._lock:
+            return QueryCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._statements),
+                maxsize=self.maxsize,
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._statements.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+
+def in_arity_bucket(arity: int) -> int:
+    """
+    Rounds the number of values of a IN condition up to its bucket, so that lists of close
+    sizes share the same statement. Powers of two up to 64, then multiples of 64.
+    """
+    if arity <= 0:
+        return 0
+    if arity <= 64:
+        return 1 << (arity - 1).bit_length()
+    return -(-arity // 64) * 64
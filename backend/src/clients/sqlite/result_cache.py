@@ -0,0 +1,150 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, Iterable, Sequence
+
+
+@dataclass(frozen=True)
+class ResultCacheStats:
+    hits: int
+    misses: int
+    # Entries found but invalidated by a write on one of their tables
+    stale: int
+    evictions: int
+    entries: int
+    size_bytes: int
+    max_bytes: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def estimate_size(rows: Sequence[Sequence[object]]) -> int:
+    """
+    Approximate memory held by the rows, the row objects and their values.
+    """
+    return sys.getsizeof(rows) + sum(
+        sys.getsizeof(r) + sum(sys.getsizeof(v) for v in r) for r in rows
+    )
+
+
+class ResultCache:
+    """
+    Thread safe LRU cache of query results, bounded by the estimated size of the rows.
+
+    Every table has a version counter, bumped once a write on it is committed. An entry
+    remembers the versions of its tables when its query started, and is stale as soon as
+    one of them moved. Writes the cache does not see (another process, a raw execute, a
+    database file swap) must bump the versions themselves.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        assert max_bytes > 0
+        self.max_bytes = max_bytes
+        # key -> (table versions, rows, size)
+        self._entries: OrderedDict[Hashable, tuple[tuple[int, ...], list, int]] = (
+            OrderedDict()
+        )
+        self._versions: dict[str, int] = dict()
+        # Bumped with all the tables, for the tables never written to yet
+        self._global_version = 0
+        # Wall time of the last bump, the tables may have changed before the process started
+        self._modified_at: dict[str, float] = dict()
+        self._global_modified_at = time.time()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._stale = 0
+        self._evictions = 0
+
+    def versions(self, tables: Iterable[str]) -> tuple[int, ...]:
+        with self._lock:
+            return (self._global_version,) + tuple(
+                self._versions.get(t, 0) for t in tables
+            )
+
+    def modified_at(self, tables: Iterable[str]) -> float:
+        """
+        Wall time of the last version bump of the tables.
+        """
+        with self._lock:
+            return max(
+                [self._global_modified_at]
+                + [self._modified_at[t] for t in tables if t in self._modified_at]
+            )
+
+    def get(self, key: Hashable, tables: Sequence[str]) -> list | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            versions, rows, size = entry
+            current = (self._global_version,) + tuple(
+                self._versions.get(t, 0) for t in tables
+            )
+            if versions != current:
+                del self._entries[key]
+                self._size_bytes -= size
+                self._stale += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return rows
+
+    def put(self, key: Hashable, versions: tuple[int, ...], rows: list) -> None:
+        """
+        Caches rows read while the tables were at versions, see ResultCache.versions.
+        """
+        size = estimate_size(rows)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size_bytes -= previous[2]
+            self._entries[key] = (versions, rows, size)
+            self._size_bytes += size
+            while self._size_bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._size_bytes -= evicted_size
+                self._evictions += 1
+
+    def bump(self, tables: Iterable[str]) -> None:
+        now = time.time()
+        with self._lock:
+            for t in tables:
+                self._versions[t] = self._versions.get(t, 0) + 1
+                self._modified_at[t] = now
+
+    def bump_all(self) -> None:
+        with self._lock:
+            self._global_version += 1
+            self._global_modified_at = time.time()
+
+    def stats(self) -> ResultCacheStats:
+        with self._lock:
+            return ResultCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                stale=self._stale,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                size_bytes=self._size_bytes,
+                max_bytes=self.max_bytes,
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+            self._hits = 0
+            self._misses = 0
+            self._stale = 0
+            self._evictions = 0
@@ -0,0 +1,68 @@
+import os
+from dataclasses import dataclass
+
+
+def parse_levels(levels: str) -> tuple[int, ...]:
+    """
+    WaniKani levels from a list of levels and ranges, e.g. "1-5,8".
+    """
+    parsed: set[int] = set()
+    for part in filter(None, (p.strip() for p in levels.split(","))):
+        first, _, last = part.partition("-")
+        parsed.update(range(int(first), int(last or first) + 1))
+    return tuple(sorted(parsed))
+
+
+@dataclass(frozen=True)
+class AudioFormat:
+    name: str
+    extension: str
+    # The first one is sent as the Content-Type, all of them are matched against Accept
+    media_types: tuple[str, ...]
+    # ffmpeg output options producing the format from the WAV
+    ffmpeg_args: tuple[str, ...] = ()
+
+
+# From the most to the least compact, ties in Accept go to the first one
+audio_formats: dict[str, AudioFormat] = {
+    f.name: f
+    for f in (
+        # Speech only, 32 kbps opus is transparent for a single voice
+        AudioFormat(
+            name="OPUS",
+            extension=".ogg",
+            media_types=("audio/ogg", "audio/opus"),
+            ffmpeg_args=("-c:a", "libopus", "-b:a", "32k", "-application", "voip"),
+        ),
+        # For the browsers without opus, Safari before 17 mostly
+        AudioFormat(
+            name="AAC",
+            extension=".m4a",
+            media_types=("audio/mp4", "audio/aac", "audio/x-m4a"),
+            ffmpeg_args=("-c:a", "aac", "-b:a", "64k", "-movflags", "+faststart"),
+        ),
+        AudioFormat(
+            name="WAV",
+            extension=".wav",
+            media_types=("audio/wav", "audio/x-wav", "audio/wave"),
+        ),
+    )
+}
+source_audio_format = audio_formats["WAV"]
+
+
+@dataclass(frozen=True)
+class AudioConfig:
+    # Memory budget of the local audio files served from memory, 0 disables the cache
+    cache_max_bytes: int = int(os.getenv("AUDIO_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+    # Larger files are streamed from disk, they would evict too many smaller ones
+    cache_max_file_bytes: int = int(
+        os.getenv("AUDIO_CACHE_MAX_FILE_BYTES", 16 * 1024 * 1024)
+    )
+    # Levels whose story audios are loaded at startup, e.g. "1-5"
+    cache_prewarm_levels: tuple[int, ...] = parse_levels(
+        os.getenv("AUDIO_CACHE_PREWARM_LEVELS", "")
+    )
+
+
+audio_config = AudioConfig()
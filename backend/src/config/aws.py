@@ -12,6 +12,23 @@ class AWSConfig:
     s3_buckets: S3Buckets = field(default_factory=lambda: S3Buckets())
     access_key: str = os.getenv("AWS_ACCESS_KEY", "")
     secret_access_key: str = os.getenv("AWS_SECRET_ACCESS_KEY", "")
+    region: str = os.getenv("AWS_DEFAULT_REGION", "ap-northeast-1")
+    # An S3 compatible server instead of AWS, e.g. a local stand-in for tests
+    endpoint_url: str | None = os.getenv("AWS_ENDPOINT_URL") or None
+    # At least the concurrent transfers, the extra ones wait for a connection
+    s3_max_pool_connections: int = int(os.getenv("AWS_S3_MAX_POOL_CONNECTIONS", 32))
+    s3_max_attempts: int = int(os.getenv("AWS_S3_MAX_ATTEMPTS", 5))
+    presigned_url_expires_in_s: int = int(
+        os.getenv("AWS_PRESIGNED_URL_EXPIRES_IN_S", 1800)
+    )
+    # A cached url is handed out while it stays valid this long, the clients get at least that
+    presigned_url_min_remaining_s: int = int(
+        os.getenv("AWS_PRESIGNED_URL_MIN_REMAINING_S", 900)
+    )
+    # Urls are signed as of the start of the window, identical within it so browsers and
+    # CDNs cache the audio files, 0 signs as of now. At most expires_in_s - min_remaining_s
+    presigned_url_window_s: int = int(os.getenv("AWS_PRESIGNED_URL_WINDOW_S", 900))
+    presigned_url_cache_size: int = int(os.getenv("AWS_PRESIGNED_URL_CACHE_SIZE", 4096))
 
 
 aws_config = AWSConfig()
@@ -0,0 +1,21 @@
+import os
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class GoogleAuthConfig:
+    # JSON Web Key Set of the keys signing the Google ID tokens
+    jwks_url: str = os.getenv(
+        "GOOGLE_JWKS_URL", "https://www.googleapis.com/oauth2/v3/certs"
+    )
+    # When the response has no max-age
+    jwks_default_max_age_s: int = int(os.getenv("GOOGLE_JWKS_DEFAULT_MAX_AGE_S", 300))
+    # An unknown kid refreshes the keys at most this often, forged ones can not flood Google
+    jwks_min_refresh_interval_s: float = float(
+        os.getenv("GOOGLE_JWKS_MIN_REFRESH_INTERVAL_S", 30)
+    )
+    jwks_timeout_s: float = float(os.getenv("GOOGLE_JWKS_TIMEOUT_S", 5))
+    clock_skew_s: int = int(os.getenv("GOOGLE_ID_TOKEN_CLOCK_SKEW_S", 10))
+
+
+google_auth_config = GoogleAuthConfig()
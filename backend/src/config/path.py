@@ -9,7 +9,15 @@ class PathConfig:
     seed_db: Path = _src_static / "seed_db"
     local_data_scripts: Path = _src_static / "local_data"
     front_dist: Path = _src_static.parents[2] / "frontend" / "dist"
+    # User database, the only one backed up and reloaded
     sqlite_db_file: Path = _src_static / "localdb.sqlite"
+    # Content database, shipped with the image, only replaced by its S3 snapshot on load
+    content_db_file: Path = _src_static / "japanese_dictation.sqlite"
+    # Shipped with the image, served read-only until sqlite_db_file is loaded
+    bundled_db_file: Path = _src_static / "japanese_dictation_user.sqlite"
+    migrations: Path = _src_static.parents[1] / "migrations"
+    content_migrations: Path = migrations / "content"
+    user_migrations: Path = migrations / "user"
 
     def __post_init__(self):
         self._src_static.mkdir(parents=True, exist_ok=True)
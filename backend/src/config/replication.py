@@ -0,0 +1,24 @@
+import os
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ReplicationConfig:
+    # Ships the commits continuously instead of the periodic full backup
+    enabled: bool = os.getenv("DB_REPLICATION") == "True"
+    interval_s: float = float(os.getenv("DB_REPLICATION_INTERVAL_S", 1))
+    # A new base snapshot (generation) is started after this many deltas or seconds
+    compact_every_deltas: int = int(
+        os.getenv("DB_REPLICATION_COMPACT_EVERY_DELTAS", 600)
+    )
+    compact_every_s: float = float(os.getenv("DB_REPLICATION_COMPACT_EVERY_S", 3600))
+    # Oldest point in time that can be restored
+    retained_generations: int = int(
+        os.getenv("DB_REPLICATION_RETAINED_GENERATIONS", 24)
+    )
+    key_prefix: str = "replication"
+    # Replicates into a local directory instead of S3, e.g. for tests
+    local_dir: str | None = os.getenv("DB_REPLICATION_LOCAL_DIR")
+
+
+replication_config = ReplicationConfig()
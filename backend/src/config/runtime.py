@@ -3,6 +3,7 @@ from dataclasses import dataclass
 
 USES_LOCAL_AUDIO_FILES = os.environ.get("USES_LOCAL_AUDIO_FILES") == "True"
 SYNC_DB_S3 = os.environ.get("SYNC_DB_S3") == "True"
+HYDRATE_DB_IN_BACKGROUND = os.environ.get("HYDRATE_DB_IN_BACKGROUND") == "True"
 GOOGLE_CLIENT_ID = os.environ.get("GOOGLE_CLIENT_ID")
 
 
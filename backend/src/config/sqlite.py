@@ -0,0 +1,57 @@
+import os
+from dataclasses import dataclass, field
+from typing import Literal
+
+
+@dataclass(frozen=True)
+class PragmaProfile:
+    # Negative values are in KiB, positive ones in pages
+    cache_size: int
+    mmap_size: int
+    synchronous: Literal["OFF", "NORMAL", "FULL"]
+
+
+@dataclass(frozen=True)
+class PragmaProfiles:
+    # WAL + NORMAL is durable against application crashes, only a power loss can lose the last commits
+    default: PragmaProfile = PragmaProfile(
+        cache_size=-16_000, mmap_size=64 * 1024 * 1024, synchronous="NORMAL"
+    )
+    durable: PragmaProfile = PragmaProfile(
+        cache_size=-16_000, mmap_size=64 * 1024 * 1024, synchronous="FULL"
+    )
+    bulk_load: PragmaProfile = PragmaProfile(
+        cache_size=-128_000, mmap_size=256 * 1024 * 1024, synchronous="OFF"
+    )
+
+
+@dataclass(frozen=True)
+class SQLiteConfig:
+    query_cache_size: int = int(os.getenv("SQLITE_QUERY_CACHE_SIZE", 256))
+    result_cache_max_bytes: int = int(
+        os.getenv("SQLITE_RESULT_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+    )
+    cached_statements: int = int(os.getenv("SQLITE_CACHED_STATEMENTS", 256))
+    pool_max_size: int = int(os.getenv("SQLITE_POOL_MAX_SIZE", 8))
+    pool_idle_timeout_s: float = float(os.getenv("SQLITE_POOL_IDLE_TIMEOUT_S", 60))
+    pool_acquire_timeout_s: float = float(
+        os.getenv("SQLITE_POOL_ACQUIRE_TIMEOUT_S", 10)
+    )
+    # Below the acquire timeout, a reload gives up before the requests it holds back do
+    pool_drain_timeout_s: float = float(os.getenv("SQLITE_POOL_DRAIN_TIMEOUT_S", 5))
+    bulk_insert_chunk_size: int = int(os.getenv("SQLITE_BULK_INSERT_CHUNK_SIZE", 1000))
+    async_max_workers: int = int(os.getenv("SQLITE_ASYNC_MAX_WORKERS", 8))
+    async_query_timeout_s: float = float(os.getenv("SQLITE_ASYNC_QUERY_TIMEOUT_S", 30))
+    # The content database is immutable, mapping it whole saves the page cache copies
+    content_mmap_size: int = int(
+        os.getenv("SQLITE_CONTENT_MMAP_SIZE", 256 * 1024 * 1024)
+    )
+    busy_timeout_ms: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    pragma_profile: str = os.getenv("SQLITE_PRAGMA_PROFILE", "default")
+    pragma_profiles: PragmaProfiles = field(default_factory=lambda: PragmaProfiles())
+
+    def get_pragma_profile(self, name: str | None = None) -> PragmaProfile:
+        return getattr(self.pragma_profiles, name or self.pragma_profile)
+
+
+sqlite_config = SQLiteConfig()
@@ -1,12 +1,16 @@
+import asyncio
 from functools import lru_cache
 from typing import Annotated
 
 from cachetools import TTLCache
 from fastapi import Header
-from google.auth.transport import requests
-from google.oauth2 import id_token
-from src.clients.sqlite import SQLiteClient
+from src.clients.google import GoogleIdTokenVerifier, InvalidTokenError
+from src.clients.sqlite import AsyncSQLiteClient
 from src.config.runtime import GOOGLE_CLIENT_ID
+from src.exceptions.http import (
+    HTTPServiceUnavailableException,
+    HTTPUnAuthorizedException,
+)
 from src.logger import get_logger
 from src.models.database import Users
 
@@ -14,6 +18,8 @@ base_logger = get_logger()
 
 
 verified_tokens_cache = TTLCache(maxsize=1000, ttl=300)
+# Verifies locally, Google is only called when its signing keys expire or rotate
+id_token_verifier = GoogleIdTokenVerifier(audience=GOOGLE_CLIENT_ID)
 
 
 async def get_current_user(
@@ -24,26 +30,32 @@ async def get_current_user(
     if authorization in verified_tokens_cache:
         return verified_tokens_cache[authorization]
 
-    sqlite = SQLiteClient()
+    sqlite = AsyncSQLiteClient()
 
     if authorization is None:
         # Default user
-        user_id = sqlite.select(table=Users, cond_null=["google_sub"])[0].id
+        default_user = await sqlite.select(table=Users, cond_null=["google_sub"])
+        if not default_user:
+            raise HTTPServiceUnavailableException("No default user in the database")
+        user_id = default_user[0].id
     else:
-        # Get google info
-        id_info = id_token.verify_oauth2_token(
-            authorization, requests.Request(), GOOGLE_CLIENT_ID
-        )
+        # Get google info, off the loop as it may refresh the keys
+        try:
+            id_info = await asyncio.to_thread(id_token_verifier.verify, authorization)
+        except InvalidTokenError as e:
+            raise HTTPUnAuthorizedException(str(e))
         google_sub = id_info["sub"]
         email = id_info.get("email")
 
-        user = sqlite.select(table=Users, cond_equal=dict(google_sub=google_sub))
+        user = await sqlite.select(table=Users, cond_equal=dict(google_sub=google_sub))
         if not user:
-            sqlite.insert_one(
+            await sqlite.insert_one(
                 table=Users,
                 to_insert=Users(email=email, google_sub=google_sub),
             )
-            user = sqlite.select(table=Users, cond_equal=dict(google_sub=google_sub))
+            user = await sqlite.select(
+                table=Users, cond_equal=dict(google_sub=google_sub)
+            )
 
         user_id = user[0].id
 
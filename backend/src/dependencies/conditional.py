@@ -0,0 +1,99 @@
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from hashlib import blake2b
+from typing import Awaitable, Callable, Mapping, Type
+from uuid import uuid4
+
+from fastapi import HTTPException, Request, Response, status
+from src.clients.sqlite import table_versions, tables_modified_at
+from src.models.database import BaseTableModel, BaseViewModel
+from src.modules.boot import boot_status
+
+# Table versions restart from 0 with the process, the ETags must not be reused across them
+_epoch = uuid4().hex[:8]
+
+
+def is_not_modified(
+    request_headers: Mapping[str, str], etag: str, last_modified: float
+) -> bool:
+    """
+    Whether the client copy is current, If-None-Match taking precedence over
+    If-Modified-Since as in RFC 9110.
+    """
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        return "*" in tags or etag.removeprefix("W/") in tags
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have a one second resolution
+        return int(last_modified) <= since
+    return False
+
+
+def conditional_get(
+    *tables: Type[BaseTableModel],
+    cache_control: str = "no-cache",
+    vary: tuple[str, ...] = (),
+    valid_for_s: int | None = None,
+) -> Callable[[Request, Response], Awaitable[None]]:
+    """
+    Dependency answering 304 before the endpoint runs, so without any query, when the
+    client copy is current. The ETag is derived from the versions of the tables the
+    endpoint reads, the request URL and the vary headers. With valid_for_s, it also
+    changes every valid_for_s seconds, for the responses embedding expiring content.
+    Until the boot is ready, the responses come from the bundled database and must not be
+    kept: no 304 and no-store.
+    """
+    table_names = tuple(
+        sorted(
+            {
+                name
+                for t in tables
+                for name in (
+                    t.__view_tables__
+                    if issubclass(t, BaseViewModel)
+                    else (t.__tablename__,)
+                )
+            }
+        )
+    )
+
+    async def dependency(request: Request, response: Response) -> None:
+        if not boot_status.ready:
+            response.headers["Cache-Control"] = "no-store"
+            return
+
+        key = (
+            request.url.path,
+            request.url.query,
+            tuple(request.headers.get(h, "") for h in vary),
+            table_versions(table_names),
+            int(time.time() // valid_for_s) if valid_for_s else None,
+        )
+        digest = blake2b(repr(key).encode(), digest_size=12).hexdigest()
+        # Weak, the same versions may be rendered differently by another release
+        etag = f'W/"{_epoch}-{digest}"'
+        last_modified = tables_modified_at(table_names)
+        if valid_for_s:
+            last_modified = max(last_modified, time.time() // valid_for_s * valid_for_s)
+        headers = {
+            "ETag": etag,
+            "Last-Modified": formatdate(last_modified, usegmt=True),
+            "Cache-Control": cache_control,
+        }
+        if vary:
+            headers["Vary"] = ", ".join(vary)
+
+        if is_not_modified(request.headers, etag, last_modified):
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
+            )
+        response.headers.update(headers)
+
+    return dependency
@@ -0,0 +1,12 @@
+from src.exceptions.http import HTTPServiceUnavailableException
+from src.modules.boot import boot_status
+
+
+async def require_ready() -> None:
+    """
+    Rejects the writes while the database served is not the configured one yet.
+    """
+    if not boot_status.ready:
+        raise HTTPServiceUnavailableException(
+            f"Database still loading, {boot_status.report().phase=}"
+        )
@@ -14,6 +14,11 @@ class UnAuthorizedException(Exception):
         super().__init__(*args)
 
 
+class NotFoundException(Exception):
+    def __init__(self, *args: object) -> None:
+        super().__init__(*args)
+
+
 class HTTPSNotFoundException(HTTPException):
     def __init__(self, detail: str | None = None):
         super().__init__(status_code=404, detail=detail)
@@ -46,3 +51,12 @@ class HTTPServerException(HTTPException):
         super().__init__(
             status_code=500, detail=detail if ENV != service_env.production else None
         )
+
+
+class HTTPServiceUnavailableException(HTTPException):
+    def __init__(self, detail: str | None = None, retry_after_s: int = 5):
+        super().__init__(
+            status_code=503,
+            detail=detail,
+            headers={"Retry-After": str(retry_after_s)},
+        )
@@ -8,10 +8,27 @@ from fastapi.staticfiles import StaticFiles
 
 # from fastapi.middleware.cors import CORSMiddleware
 from .api import api_router
+from .api.audio.service import prewarm_audio_cache
+from .clients.sqlite import serve_read_only_from
+from .config.audio import audio_config
 from .config.env_var import ENV
 from .config.path import path_config
-from .config.runtime import SYNC_DB_S3, service_env
-from .scripts.manage_dbfile_s3 import load_sqlite_file, save_sqlite_file
+from .config.replication import replication_config
+from .config.runtime import (
+    HYDRATE_DB_IN_BACKGROUND,
+    SYNC_DB_S3,
+    USES_LOCAL_AUDIO_FILES,
+    service_env,
+)
+from .logger import get_logger
+from .modules.boot import boot_status
+from .scripts.manage_dbfile_s3 import (
+    load_sqlite_file,
+    replicate_sqlite_file,
+    save_sqlite_file,
+)
+
+logger = get_logger()
 
 
 async def periodic_backup():
@@ -24,20 +41,112 @@ async def periodic_backup():
         await asyncio.to_thread(save_sqlite_file)
 
 
+async def continuous_replication():
+    while True:
+        try:
+            await asyncio.sleep(replication_config.interval_s)
+        except asyncio.CancelledError:
+            break
+        try:
+            await asyncio.to_thread(replicate_sqlite_file)
+        except Exception:
+            # Retried on the next interval, the changes are still in the database
+            logger.exception("Replication failed")
+
+
+async def hydrate_database(attempts: int = 1) -> bool:
+    """
+    Loads the database from S3, serving it (writes included) once done.
+    """
+    error: str | None = None
+    for attempt in range(attempts):
+        if attempt:
+            await asyncio.sleep(2**attempt)
+        try:
+            report = await asyncio.to_thread(load_sqlite_file)
+        except Exception as e:
+            logger.exception(f"Database hydration failed, {attempt=}")
+            error = repr(e)
+            continue
+        serve_read_only_from(None)
+        boot_status.record("hydration_fetch_s", report.fetch_s)
+        boot_status.record("hydration_check_s", report.check_s)
+        boot_status.record("hydration_swap_s", report.swap_s)
+        boot_status.set_phase("ready")
+        return True
+    boot_status.set_phase("hydration_failed", error)
+    return False
+
+
+async def sync_database():
+    if replication_config.enabled:
+        await continuous_replication()
+    else:
+        await periodic_backup()
+
+
+async def hydrate_then_sync_database():
+    # Still served from the bundled database on failure, the readiness probe tells
+    if await hydrate_database(attempts=3):
+        await sync_database()
+
+
+async def prewarm_audio_files():
+    try:
+        loaded = await prewarm_audio_cache(audio_config.cache_prewarm_levels)
+    except Exception:
+        # Loaded on their first request instead
+        logger.exception("Audio cache prewarm failed")
+        return
+    logger.info(f"Audio cache prewarmed with {loaded} files")
+
+
+@contextlib.asynccontextmanager
+async def database_lifespan():
+    if not SYNC_DB_S3:
+        boot_status.set_phase("ready")
+        yield
+        return
+
+    if HYDRATE_DB_IN_BACKGROUND and path_config.bundled_db_file.exists():
+        # Reads served right away, writes wait for the hydration
+        serve_read_only_from(path_config.bundled_db_file)
+        boot_status.set_phase("serving_bundled")
+        task = asyncio.create_task(hydrate_then_sync_database())
+    else:
+        if not await hydrate_database():
+            raise RuntimeError("Database could not be loaded from S3")
+        task = asyncio.create_task(sync_database())
+    try:
+        yield
+    finally:
+        task.cancel()
+        with contextlib.suppress(Exception, asyncio.CancelledError):
+            await task
+        # Nothing to ship if the database served was never the configured one
+        if boot_status.ready:
+            # Only the last interval is left to ship when replicating
+            sync = (
+                replicate_sqlite_file
+                if replication_config.enabled
+                else save_sqlite_file
+            )
+            await asyncio.to_thread(sync)
+
+
 @contextlib.asynccontextmanager
 async def lifespan(app: FastAPI):
-    if SYNC_DB_S3:
-        await asyncio.to_thread(load_sqlite_file)
-        task = asyncio.create_task(periodic_backup())
+    async with database_lifespan():
+        if not (USES_LOCAL_AUDIO_FILES and audio_config.cache_prewarm_levels):
+            yield
+            return
+        task = asyncio.create_task(prewarm_audio_files())
         try:
             yield
         finally:
             task.cancel()
-            with contextlib.suppress(Exception):
+            with contextlib.suppress(asyncio.CancelledError):
                 await task
-            await asyncio.to_thread(save_sqlite_file)
-    else:
-        yield
 
 
 app = FastAPI(lifespan=lifespan)
@@ -1,8 +1,11 @@
+from .audio_variants import AudioVariants
 from .audios import Audios
-from .base import BaseTableModel
+from .base import BaseTableModel, BaseViewModel
 from .configs import Configs
 from .stories import Stories
+from .story_audio_metadata import StoryAudioMetadata
 from .story_audios import StoryAudios
+from .story_chunk_audio_metadata import StoryChunkAudioMetadata
 from .story_chunk_audios import StoryChunkAudios
 from .story_chunks import StoryChunks
 from .users import Users
@@ -10,10 +13,14 @@ from .wanikani_stories import WanikaniStories
 
 __all__ = [
     "Audios",
+    "AudioVariants",
     "BaseTableModel",
+    "BaseViewModel",
     "Configs",
+    "StoryAudioMetadata",
     "StoryAudios",
     "StoryChunks",
+    "StoryChunkAudioMetadata",
     "StoryChunkAudios",
     "Stories",
     "Users",
@@ -0,0 +1,17 @@
+from pydantic import Field
+from src.models.uuid4str import UUID4Str
+
+from .base import BaseTableModel
+
+
+class AudioVariants(BaseTableModel):
+    """
+    An audio transcoded to another format, next to the original file.
+    """
+
+    __tablename__ = "audio_variants"
+
+    audio_id: UUID4Str
+    format: str
+    url: str
+    size_bytes: int = Field(ge=0)
@@ -1,3 +1,4 @@
+from typing import Any, Literal, Mapping, Self
 from uuid import uuid4
 
 from pydantic import BaseModel, Field
@@ -6,5 +7,31 @@ from src.models.uuid4str import UUID4Str
 
 class BaseTableModel(BaseModel):
     __tablename__: str
+    # Content, read-only and shared, or user data, the only one backed up
+    __database__: Literal["content", "user"] = "content"
 
     id: UUID4Str = Field(default_factory=lambda: UUID4Str(uuid4()))
+
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any]) -> Self:
+        """
+        Builds the model from a row read from our own database, without validation.
+
+        Rows of the migrated schema are already type-correct, validation (and the UUID4Str
+        parsing) only runs on the write path, when models are built from user input.
+        """
+        return cls.model_construct(_fields_set=set(row.keys()), **row)
+
+
+class BaseViewModel(BaseTableModel):
+    """
+    Read-only model over a SELECT joining tables, queried like a table.
+
+    __view_sql__ is inlined as a subquery named __tablename__, sqlite flattens it into the
+    outer query so the conditions still use the indexes of the joined tables. Its id column
+    is the one of the row it is built around. __view_tables__ lists the joined tables, a write
+    on any of them invalidates the cached results of the view.
+    """
+
+    __view_sql__: str
+    __view_tables__: tuple[str, ...]
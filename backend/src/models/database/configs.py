@@ -3,6 +3,7 @@ from .base import BaseTableModel
 
 class Configs(BaseTableModel):
     __tablename__: str = "configs"
+    __database__ = "user"
 
     name: str
     sequence: str
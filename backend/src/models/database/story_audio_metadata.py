@@ -0,0 +1,30 @@
+from src.models.uuid4str import UUID4Str
+
+from .base import BaseViewModel
+
+
+class StoryAudioMetadata(BaseViewModel):
+    """
+    A story audio with its story text and audio url.
+    """
+
+    __tablename__ = "story_audio_metadata"
+    __view_sql__ = """
+        SELECT
+            sa.id AS id,
+            sa.story_id AS story_id,
+            sa.speed_percentage AS speed_percentage,
+            s.text AS story_text,
+            sa.audio_id AS audio_id,
+            a.url AS audio_url
+        FROM story_audios sa
+        JOIN stories s ON s.id = sa.story_id
+        JOIN audios a ON a.id = sa.audio_id
+    """
+    __view_tables__ = ("story_audios", "stories", "audios")
+
+    story_id: UUID4Str
+    speed_percentage: int
+    story_text: str
+    audio_id: UUID4Str
+    audio_url: str
@@ -0,0 +1,39 @@
+from src.models.uuid4str import UUID4Str
+
+from .base import BaseViewModel
+
+
+class StoryChunkAudioMetadata(BaseViewModel):
+    """
+    A story chunk audio with its chunk text and position, and its audio url.
+    story_chunk_count is the number of chunks of the story, with or without audio.
+    """
+
+    __tablename__ = "story_chunk_audio_metadata"
+    __view_sql__ = """
+        SELECT
+            sca.id AS id,
+            sc.story_id AS story_id,
+            sc.id AS story_chunk_id,
+            sc.position AS position,
+            sc.text AS text,
+            sca.speed_percentage AS speed_percentage,
+            sca.audio_id AS audio_id,
+            a.url AS audio_url,
+            (
+                SELECT COUNT(*) FROM story_chunks c WHERE c.story_id = sc.story_id
+            ) AS story_chunk_count
+        FROM story_chunks sc
+        JOIN story_chunk_audios sca ON sca.story_chunk_id = sc.id
+        JOIN audios a ON a.id = sca.audio_id
+    """
+    __view_tables__ = ("story_chunks", "story_chunk_audios", "audios")
+
+    story_id: UUID4Str
+    story_chunk_id: UUID4Str
+    position: int
+    text: str
+    speed_percentage: int
+    audio_id: UUID4Str
+    audio_url: str
+    story_chunk_count: int
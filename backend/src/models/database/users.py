@@ -3,6 +3,7 @@ from .base import BaseTableModel
 
 class Users(BaseTableModel):
     __tablename__: str = "users"
+    __database__ = "user"
 
     email: str | None = None
     google_sub: str | None = None
@@ -0,0 +1,11 @@
+from .cache import AudioCache, AudioCacheStats, CachedAudio, audio_cache
+from .response import cached_audio_response, parse_single_range
+
+__all__ = [
+    "audio_cache",
+    "AudioCache",
+    "AudioCacheStats",
+    "CachedAudio",
+    "cached_audio_response",
+    "parse_single_range",
+]
@@ -0,0 +1,134 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import formatdate
+from pathlib import Path
+
+from src.config.audio import audio_config
+
+
+@dataclass(frozen=True)
+class AudioCacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size_bytes: int
+    max_bytes: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+@dataclass(frozen=True)
+class CachedAudio:
+    data: bytes
+    mtime: float
+    # Same validators as a FileResponse of the file, whichever one served the client copy
+    etag: str
+    last_modified: str
+
+    @classmethod
+    def from_file(cls, data: bytes, stat_result: os.stat_result) -> "CachedAudio":
+        etag_base = f"{stat_result.st_mtime}-{stat_result.st_size}"
+        return cls(
+            data=data,
+            mtime=stat_result.st_mtime,
+            etag=f'"{hashlib.md5(etag_base.encode(), usedforsecurity=False).hexdigest()}"',
+            last_modified=formatdate(stat_result.st_mtime, usegmt=True),
+        )
+
+
+class AudioCache:
+    """
+    Thread safe LRU cache of audio files content, bounded by their total size.
+
+    The audio files are named by a uuid and never rewritten, an entry never goes stale.
+    """
+
+    def __init__(self, max_bytes: int, max_file_bytes: int) -> None:
+        assert max_bytes >= 0
+        self.max_bytes = max_bytes
+        self.max_file_bytes = min(max_file_bytes, max_bytes)
+        self._entries: OrderedDict[str, CachedAudio] = OrderedDict()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key: str) -> CachedAudio | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry
+
+    def put(self, key: str, entry: CachedAudio, evict: bool = True) -> bool:
+        """
+        Caches the entry, unless it is too large or, without evict, would not fit.
+        """
+        size = len(entry.data)
+        if size > self.max_file_bytes:
+            return False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size_bytes -= len(previous.data)
+            if not evict and self._size_bytes + size > self.max_bytes:
+                return False
+            self._entries[key] = entry
+            self._size_bytes += size
+            while self._size_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size_bytes -= len(evicted.data)
+                self._evictions += 1
+        return True
+
+    def load(self, key: str, path: Path, evict: bool = True) -> CachedAudio | None:
+        """
+        Reads the file into the cache, None if it is not cached and has to be served from disk.
+        """
+        stat_result = os.stat(path)
+        if stat_result.st_size > self.max_file_bytes:
+            return None
+        with self._lock:
+            if not evict and self._size_bytes + stat_result.st_size > self.max_bytes:
+                return None
+        entry = CachedAudio.from_file(path.read_bytes(), stat_result)
+        return entry if self.put(key, entry, evict=evict) else None
+
+    def stats(self) -> AudioCacheStats:
+        with self._lock:
+            return AudioCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                size_bytes=self._size_bytes,
+                max_bytes=self.max_bytes,
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+
+audio_cache = AudioCache(
+    audio_config.cache_max_bytes, audio_config.cache_max_file_bytes
+)
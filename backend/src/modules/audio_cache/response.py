@@ -0,0 +1,79 @@
+from typing import Mapping
+
+from fastapi import Response, status
+from fastapi.responses import PlainTextResponse
+
+from .cache import CachedAudio
+
+
+def parse_single_range(http_range: str, size: int) -> tuple[int, int] | None:
+    """
+    Inclusive bounds of a single bytes range, None for a multiple ranges header.
+    Raises ValueError on a malformed header, IndexError on an unsatisfiable range.
+    """
+    units, _, range_ = http_range.partition("=")
+    if units.strip().lower() != "bytes" or not range_.strip():
+        raise ValueError(f"invalid range header {http_range=}")
+    if "," in range_:
+        return None
+
+    first, sep, last = (p.strip() for p in range_.partition("-"))
+    if not sep or not (first or last):
+        raise ValueError(f"invalid range header {http_range=}")
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if not 0 <= start < size:
+        raise IndexError(f"range not satisfiable {http_range=}, {size=}")
+    if start > end:
+        raise ValueError(f"invalid range header {http_range=}")
+    return start, end
+
+
+def cached_audio_response(
+    request_headers: Mapping[str, str],
+    audio: CachedAudio,
+    media_type: str,
+    headers: Mapping[str, str] = dict(),
+) -> Response | None:
+    """
+    Response served from the cached content, honoring a single Range as a FileResponse
+    does. None for a multiple ranges request, left to a FileResponse.
+    """
+    size = len(audio.data)
+    headers = {
+        **headers,
+        "etag": audio.etag,
+        "last-modified": audio.last_modified,
+        "accept-ranges": "bytes",
+    }
+
+    http_range = request_headers.get("range")
+    http_if_range = request_headers.get("if-range")
+    if http_range is None or (
+        http_if_range is not None
+        and http_if_range not in (audio.etag, audio.last_modified)
+    ):
+        return Response(audio.data, media_type=media_type, headers=headers)
+
+    try:
+        range_ = parse_single_range(http_range, size)
+    except ValueError as e:
+        return PlainTextResponse(str(e), status_code=status.HTTP_400_BAD_REQUEST)
+    except IndexError:
+        return PlainTextResponse(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={"content-range": f"*/{size}"},
+        )
+    if range_ is None:
+        return None
+
+    start, end = range_
+    headers["content-range"] = f"bytes {start}-{end}/{size}"
+    return Response(
+        audio.data[start : end + 1],
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers=headers,
+    )
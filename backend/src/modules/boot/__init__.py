@@ -0,0 +1,9 @@
+from .models import BootPhase, BootReport
+from .status import BootStatus, boot_status
+
+__all__ = [
+    "boot_status",
+    "BootPhase",
+    "BootReport",
+    "BootStatus",
+]
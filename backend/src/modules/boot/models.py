@@ -0,0 +1,16 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel
+
+BootPhase = Literal["starting", "serving_bundled", "ready", "hydration_failed"]
+
+
+class BootReport(BaseModel):
+    phase: BootPhase
+    # Serving the configured database, writes included
+    ready: bool
+    started_at: datetime
+    # Seconds spent in each startup step, and since start for the phase changes
+    timings_s: dict[str, float]
+    error: str | None = None
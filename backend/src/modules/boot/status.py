@@ -0,0 +1,47 @@
+import threading
+import time
+from datetime import datetime
+
+from .models import BootPhase, BootReport
+
+
+class BootStatus:
+    """
+    Startup progress of the service: live as soon as it serves requests, ready once the
+    database it serves is the configured one.
+    """
+
+    def __init__(self) -> None:
+        self.started_at = datetime.now()
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+        self._phase: BootPhase = "starting"
+        self._timings_s: dict[str, float] = dict()
+        self._error: str | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self._phase == "ready"
+
+    def record(self, step: str, elapsed_s: float) -> None:
+        with self._lock:
+            self._timings_s[step] = elapsed_s
+
+    def set_phase(self, phase: BootPhase, error: str | None = None) -> None:
+        with self._lock:
+            self._phase = phase
+            self._error = error
+            self._timings_s[f"{phase}_after_s"] = time.monotonic() - self._start
+
+    def report(self) -> BootReport:
+        with self._lock:
+            return BootReport(
+                phase=self._phase,
+                ready=self.ready,
+                started_at=self.started_at,
+                timings_s=dict(self._timings_s),
+                error=self._error,
+            )
+
+
+boot_status = BootStatus()
@@ -0,0 +1,17 @@
+from .exceptions import ReplicaNotFoundError
+from .models import ReplicationReport, RestoreReport
+from .replicator import Replicator
+from .restore import restore
+from .storage import LocalDirStorage, ReplicaStorage, S3Storage, get_replica_storage
+
+__all__ = [
+    "get_replica_storage",
+    "LocalDirStorage",
+    "ReplicaNotFoundError",
+    "ReplicaStorage",
+    "ReplicationReport",
+    "Replicator",
+    "restore",
+    "RestoreReport",
+    "S3Storage",
+]
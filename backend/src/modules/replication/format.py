@@ -0,0 +1,86 @@
+import gzip
+import struct
+from dataclasses import dataclass
+from uuid import uuid4
+
+_DELTA_MAGIC = b"JWPD"
+_DELTA_HEADER = struct.Struct(">4sIII")
+_PAGE_NUMBER = struct.Struct(">I")
+
+
+@dataclass(frozen=True)
+class ReplicaKey:
+    generation: str
+    sequence: int
+    timestamp_ms: int
+
+    @property
+    def is_snapshot(self) -> bool:
+        return self.sequence == 0
+
+    def __str__(self) -> str:
+        kind = "snapshot" if self.is_snapshot else "delta"
+        return f"generations/{self.generation}/{self.sequence:011d}-{self.timestamp_ms}.{kind}.gz"
+
+    @classmethod
+    def parse(cls, key: str) -> "ReplicaKey":
+        _, generation, name = key.split("/")
+        sequence, rest = name.split("-", 1)
+        return cls(
+            generation=generation,
+            sequence=int(sequence),
+            timestamp_ms=int(rest.split(".", 1)[0]),
+        )
+
+
+def new_generation(timestamp_ms: int) -> str:
+    # Sortable by creation time
+    return f"{timestamp_ms:013d}-{uuid4().hex[:8]}"
+
+
+def page_size_of(db: bytes) -> int:
+    """
+    Page size stored in the database header, 1 meaning 65536.
+    """
+    page_size = int.from_bytes(db[16:18], "big")
+    return 65536 if page_size == 1 else page_size
+
+
+def encode_snapshot(db: bytes) -> bytes:
+    return gzip.compress(db, compresslevel=6)
+
+
+def decode_snapshot(data: bytes) -> bytearray:
+    return bytearray(gzip.decompress(data))
+
+
+def encode_delta(
+    page_size: int, page_count: int, pages: list[tuple[int, bytes]]
+) -> bytes:
+    """
+    The changed pages, numbered from 1, and the page count of the database after the change.
+    """
+    parts = [_DELTA_HEADER.pack(_DELTA_MAGIC, page_size, page_count, len(pages))]
+    for page_number, page in pages:
+        parts.append(_PAGE_NUMBER.pack(page_number))
+        parts.append(page)
+    return gzip.compress(b"".join(parts), compresslevel=6)
+
+
+def apply_delta(db: bytearray, data: bytes) -> None:
+    delta = gzip.decompress(data)
+    magic, page_size, page_count, nb_pages = _DELTA_HEADER.unpack_from(delta)
+    if magic != _DELTA_MAGIC:
+        raise ValueError(f"Not a replication delta, {magic=}")
+
+    del db[page_count * page_size :]
+    if len(db) < page_count * page_size:
+        db.extend(bytes(page_count * page_size - len(db)))
+
+    offset = _DELTA_HEADER.size
+    for _ in range(nb_pages):
+        (page_number,) = _PAGE_NUMBER.unpack_from(delta, offset)
+        offset += _PAGE_NUMBER.size
+        start = (page_number - 1) * page_size
+        db[start : start + page_size] = delta[offset : offset + page_size]
+        offset += page_size
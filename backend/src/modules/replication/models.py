@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class ReplicationReport(BaseModel):
+    generation: str
+    # 0 for the base snapshot of a generation
+    sequence: int
+    pages: int
+    changed_pages: int
+    uploaded_bytes: int
+    elapsed_s: float
+
+
+class RestoreReport(BaseModel):
+    generation: str
+    deltas: int
+    # Time of the last change restored
+    restored_at: datetime
+    db_bytes: int
@@ -0,0 +1,152 @@
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from hashlib import blake2b
+from logging import Logger
+from pathlib import Path
+
+from src.clients.sqlite import DatabaseChangeMonitor
+from src.config.replication import replication_config
+from src.logger import get_logger
+
+from .format import (
+    ReplicaKey,
+    encode_delta,
+    encode_snapshot,
+    new_generation,
+    page_size_of,
+)
+from .models import ReplicationReport
+from .storage import ReplicaStorage
+
+
+class Replicator:
+    """
+    Ships the committed changes of a database to a replica storage.
+
+    Each sync reads a consistent copy of the database with the backup API and uploads the
+    pages that changed since the previous sync, as a numbered delta of the current
+    generation. A generation starts with a full snapshot. A new one is started every
+    compact_every_deltas deltas or compact_every_s seconds, so that a restore only replays
+    a bounded number of deltas, and the generations beyond retained_generations are deleted.
+    """
+
+    def __init__(
+        self,
+        db_file: Path,
+        storage: ReplicaStorage,
+        logger: Logger | None = None,
+        compact_every_deltas: int = replication_config.compact_every_deltas,
+        compact_every_s: float = replication_config.compact_every_s,
+        retained_generations: int = replication_config.retained_generations,
+    ) -> None:
+        assert retained_generations > 0
+        self.db_file = db_file
+        self.storage = storage
+        self.logger = logger or get_logger("Replicator-logger")
+        self.compact_every_deltas = compact_every_deltas
+        self.compact_every_s = compact_every_s
+        self.retained_generations = retained_generations
+
+        self._monitor = DatabaseChangeMonitor(db_file)
+        self._lock = threading.Lock()
+        self._generation: str | None = None
+        self._generation_started = 0.0
+        self._sequence = 0
+        self._inode: int | None = None
+        self._page_size = 0
+        # Hash of each page as last shipped
+        self._hashes: list[bytes] = list()
+
+    def _read_database(self) -> bytes:
+        src = sqlite3.connect(f"{self.db_file.resolve().as_uri()}?mode=ro", uri=True)
+        dst = sqlite3.connect(":memory:")
+        try:
+            src.backup(dst)
+            return dst.serialize()
+        finally:
+            dst.close()
+            src.close()
+
+    def _compaction_due(self, inode: int, page_size: int) -> bool:
+        return (
+            self._generation is None
+            # Database file swapped, or vacuumed into another page size
+            or inode != self._inode
+            or page_size != self._page_size
+            or self._sequence >= self.compact_every_deltas
+            or time.monotonic() - self._generation_started >= self.compact_every_s
+        )
+
+    def sync(self, force_snapshot: bool = False) -> ReplicationReport | None:
+        """
+        Ships the changes committed since the last sync, None if there was none.
+        """
+        with self._lock:
+            state = self._monitor.state()
+            if (
+                not force_snapshot
+                and self._generation is not None
+                and self._monitor.is_marked(state)
+            ):
+                return None
+
+            start = time.perf_counter()
+            db = self._read_database()
+            page_size = page_size_of(db)
+            pages = [db[i : i + page_size] for i in range(0, len(db), page_size)]
+            hashes = [blake2b(p, digest_size=16).digest() for p in pages]
+            timestamp_ms = int(time.time() * 1000)
+
+            if force_snapshot or self._compaction_due(state[0], page_size):
+                self._generation = new_generation(timestamp_ms)
+                self._generation_started = time.monotonic()
+                self._sequence = 0
+                key = ReplicaKey(self._generation, 0, timestamp_ms)
+                data = encode_snapshot(db)
+                changed_pages = len(pages)
+            else:
+                changed = [
+                    (i + 1, page)
+                    for i, (page, h) in enumerate(zip(pages, hashes))
+                    if i >= len(self._hashes) or h != self._hashes[i]
+                ]
+                if not changed and len(pages) == len(self._hashes):
+                    self._monitor.mark(state)
+                    return None
+                self._sequence += 1
+                key = ReplicaKey(self._generation, self._sequence, timestamp_ms)
+                data = encode_delta(page_size, len(pages), changed)
+                changed_pages = len(changed)
+
+            self.storage.put(str(key), data)
+            self._hashes = hashes
+            self._page_size = page_size
+            self._inode = state[0]
+            self._monitor.mark(state)
+            if key.is_snapshot:
+                self._prune()
+
+            report = ReplicationReport(
+                generation=key.generation,
+                sequence=key.sequence,
+                pages=len(pages),
+                changed_pages=changed_pages,
+                uploaded_bytes=len(data),
+                elapsed_s=time.perf_counter() - start,
+            )
+        self.logger.info(f"Replicated {key}, {report=}")
+        return report
+
+    def _prune(self) -> None:
+        keys_per_generation: dict[str, list[str]] = defaultdict(list)
+        for key in self.storage.list_keys("generations/"):
+            keys_per_generation[ReplicaKey.parse(key).generation].append(key)
+        expired = sorted(keys_per_generation)[: -self.retained_generations]
+        if expired:
+            self.storage.delete([k for g in expired for k in keys_per_generation[g]])
+            self.logger.info(f"Deleted expired replication generations, {expired=}")
+
+    def close(self) -> None:
+        self._monitor.close()
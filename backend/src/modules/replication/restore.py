@@ -0,0 +1,75 @@
+import os
+from collections import defaultdict
+from datetime import datetime
+from logging import Logger
+from pathlib import Path
+
+from src.logger import get_logger
+
+from .exceptions import ReplicaNotFoundError
+from .format import ReplicaKey, apply_delta, decode_snapshot
+from .models import RestoreReport
+from .storage import ReplicaStorage
+
+
+def restore(
+    storage: ReplicaStorage,
+    dst_file: Path,
+    at: datetime | None = None,
+    logger: Logger | None = None,
+) -> RestoreReport:
+    """
+    Rebuilds the database as it was at the given time, the latest replicated state if None:
+    the last snapshot taken before it, then the deltas of its generation up to it.
+    The file is written aside and renamed over dst_file.
+    """
+    logger = logger or get_logger("Replication-restore-logger")
+    at_ms = int(at.timestamp() * 1000) if at is not None else None
+
+    keys_per_generation: dict[str, list[ReplicaKey]] = defaultdict(list)
+    for key in storage.list_keys("generations/"):
+        parsed = ReplicaKey.parse(key)
+        keys_per_generation[parsed.generation].append(parsed)
+
+    candidates = [
+        g
+        for g in sorted(keys_per_generation)
+        if any(
+            k.is_snapshot and (at_ms is None or k.timestamp_ms <= at_ms)
+            for k in keys_per_generation[g]
+        )
+    ]
+    if not candidates:
+        raise ReplicaNotFoundError(f"No replicated snapshot before {at=}")
+
+    generation = candidates[-1]
+    snapshot, *deltas = sorted(
+        keys_per_generation[generation], key=lambda k: k.sequence
+    )
+    db = decode_snapshot(storage.get(str(snapshot)))
+    restored_ms = snapshot.timestamp_ms
+    nb_deltas = 0
+    for expected_sequence, delta in enumerate(deltas, start=1):
+        if at_ms is not None and delta.timestamp_ms > at_ms:
+            break
+        if delta.sequence != expected_sequence:
+            logger.warning(
+                f"Missing delta {expected_sequence} of {generation=}, restoring up to the previous one"
+            )
+            break
+        apply_delta(db, storage.get(str(delta)))
+        restored_ms = delta.timestamp_ms
+        nb_deltas += 1
+
+    tmp_file = dst_file.with_name(dst_file.name + ".restore")
+    tmp_file.write_bytes(db)
+    os.replace(tmp_file, dst_file)
+
+    report = RestoreReport(
+        generation=generation,
+        deltas=nb_deltas,
+        restored_at=datetime.fromtimestamp(restored_ms / 1000),
+        db_bytes=len(db),
+    )
+    logger.info(f"Restored the database from its replica, {report=}")
+    return report
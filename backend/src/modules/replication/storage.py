@@ -0,0 +1,84 @@
+from pathlib import Path
+from typing import Protocol
+
+from src.clients.aws import S3Client
+from src.config.aws import aws_config
+from src.config.replication import replication_config
+
+
+class ReplicaStorage(Protocol):
+    """
+    Flat key value storage of the replicated generations, keys use "/" as separator.
+    """
+
+    def put(self, key: str, data: bytes) -> None: ...
+
+    def get(self, key: str) -> bytes: ...
+
+    def list_keys(self, prefix: str) -> list[str]: ...
+
+    def delete(self, keys: list[str]) -> None: ...
+
+
+class LocalDirStorage:
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written aside then renamed, a reader never sees a partial object
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+
+    def get(self, key: str) -> bytes:
+        return (self.root / key).read_bytes()
+
+    def list_keys(self, prefix: str) -> list[str]:
+        return sorted(
+            p.relative_to(self.root).as_posix()
+            for p in self.root.rglob("*")
+            if p.is_file()
+            and not p.name.endswith(".tmp")
+            and p.relative_to(self.root).as_posix().startswith(prefix)
+        )
+
+    def delete(self, keys: list[str]) -> None:
+        for key in keys:
+            (self.root / key).unlink(missing_ok=True)
+
+
+class S3Storage:
+    def __init__(self, s3: S3Client, bucket: str, key_prefix: str) -> None:
+        self.s3 = s3
+        self.bucket = bucket
+        self.key_prefix = key_prefix
+
+    def put(self, key: str, data: bytes) -> None:
+        self.s3.put_bytes(bucket=self.bucket, key=f"{self.key_prefix}/{key}", data=data)
+
+    def get(self, key: str) -> bytes:
+        return self.s3.get_bytes(bucket=self.bucket, key=f"{self.key_prefix}/{key}")
+
+    def list_keys(self, prefix: str) -> list[str]:
+        keys = self.s3.list_keys(
+            bucket=self.bucket, prefix=f"{self.key_prefix}/{prefix}"
+        )
+        return sorted(k.removeprefix(f"{self.key_prefix}/") for k in keys)
+
+    def delete(self, keys: list[str]) -> None:
+        self.s3.delete_keys(
+            bucket=self.bucket, keys=[f"{self.key_prefix}/{k}" for k in keys]
+        )
+
+
+def get_replica_storage() -> ReplicaStorage:
+    if replication_config.local_dir:
+        return LocalDirStorage(Path(replication_config.local_dir))
+    return S3Storage(
+        s3=S3Client(),
+        bucket=aws_config.s3_buckets.japanese_dictation,
+        key_prefix=replication_config.key_prefix,
+    )
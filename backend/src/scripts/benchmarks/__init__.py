@@ -0,0 +1,17 @@
+from .async_concurrency import main as async_concurrency_benchmark_main
+from .hydration import main as hydration_benchmark_main
+from .presigned_url_windows import main as presigned_url_windows_benchmark_main
+from .presigned_urls import main as presigned_urls_benchmark_main
+from .select_projection import main as select_projection_benchmark_main
+from .sigv4_presigner import main as sigv4_presigner_benchmark_main
+from .write_batching import main as write_batching_benchmark_main
+
+__all__ = [
+    "async_concurrency_benchmark_main",
+    "hydration_benchmark_main",
+    "presigned_url_windows_benchmark_main",
+    "presigned_urls_benchmark_main",
+    "select_projection_benchmark_main",
+    "sigv4_presigner_benchmark_main",
+    "write_batching_benchmark_main",
+]
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Awaitable, Callable
+
+from src.clients.sqlite import AsyncSQLiteClient, SQLiteClient
+from src.logger import get_logger
+from src.models.database import StoryChunks
+from tabulate import tabulate
+
+from .core import create_scratch_db, fill_story_chunks, percentile
+
+NB_CHUNKS = 2_000
+NB_REQUESTS = 500
+ARRIVAL_INTERVAL_S = 0.002
+# One request out of SLOW_EVERY runs a full scan join instead of an indexed lookup
+SLOW_EVERY = 100
+SLOW_QUERY = "SELECT COUNT(*) FROM story_chunks a JOIN story_chunks b ON a.position < b.position;"
+
+
+async def simulate(
+    fast: Callable[[], Awaitable[object]], slow: Callable[[], Awaitable[object]]
+) -> tuple[list[float], float]:
+    """
+    Sends NB_REQUESTS requests at a fixed arrival rate, returns the latencies of the fast ones,
+    measured from their scheduled arrival so that a blocked event loop is accounted for.
+    """
+    start = time.perf_counter()
+    latencies: list[float] = list()
+
+    async def request(i: int) -> None:
+        arrival = start + i * ARRIVAL_INTERVAL_S
+        await asyncio.sleep(max(0, arrival - time.perf_counter()))
+        if i % SLOW_EVERY == 0:
+            await slow()
+            return
+        await fast()
+        latencies.append(time.perf_counter() - arrival)
+
+    await asyncio.gather(*(request(i) for i in range(NB_REQUESTS)))
+    return latencies, time.perf_counter() - start
+
+
+def main() -> None:
+    logger = get_logger("async-concurrency-benchmark")
+    logger.setLevel(logging.WARNING)
+
+    with TemporaryDirectory() as tmp_dir:
+        db_file = Path(tmp_dir) / "benchmark.sqlite"
+        create_scratch_db(db_file)
+        sqlite = SQLiteClient(logger, db_file=db_file, content_db_file=db_file)
+        story = fill_story_chunks(sqlite, NB_CHUNKS)
+        sqlite.close()
+
+        sync_client = SQLiteClient(
+            logger, read_only=True, db_file=db_file, content_db_file=db_file
+        )
+        async_client = AsyncSQLiteClient(
+            logger, read_only=True, db_file=db_file, content_db_file=db_file
+        )
+
+        async def sync_fast() -> object:
+            # What the services did before, the query blocks the event loop
+            return sync_client.select_rows(
+                table=StoryChunks,
+                columns=["id", "text"],
+                cond_equal=dict(story_id=story.id),
+                order_by="position",
+                limit=20,
+            )
+
+        async def sync_slow() -> object:
+            return sync_client.execute(SLOW_QUERY)
+
+        async def async_fast() -> object:
+            return await async_client.select_rows(
+                table=StoryChunks,
+                columns=["id", "text"],
+                cond_equal=dict(story_id=story.id),
+                order_by="position",
+                limit=20,
+            )
+
+        async def async_slow() -> object:
+            return await async_client.execute(SLOW_QUERY)
+
+        results = list()
+        for name, fast, slow in [
+            ("SQLiteClient", sync_fast, sync_slow),
+            ("AsyncSQLiteClient", async_fast, async_slow),
+        ]:
+            latencies, elapsed = asyncio.run(simulate(fast, slow))
+            results.append(
+                (
+                    name,
+                    len(latencies),
+                    f"{percentile(latencies, 50) * 1000:.1f}",
+                    f"{percentile(latencies, 99) * 1000:.1f}",
+                    f"{max(latencies) * 1000:.1f}",
+                    f"{elapsed:.2f}",
+                )
+            )
+
+    print(
+        f"{NB_REQUESTS} requests every {ARRIVAL_INTERVAL_S * 1000:.0f}ms, 1 in {SLOW_EVERY} is a slow full scan"
+    )
+    print(
+        tabulate(
+            results,
+            headers=[
+                "client",
+                "fast requests",
+                "p50 ms",
+                "p99 ms",
+                "max ms",
+                "total s",
+            ],
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import sqlite3
+import time
+from pathlib import Path
+from typing import Callable
+
+from src.clients.sqlite import SQLiteClient
+from src.config.path import path_config
+from src.models.database import Audios, Stories, StoryChunkAudios, StoryChunks
+
+
+def create_scratch_db(db_file: Path) -> None:
+    """
+    Creates an empty database with the schema of the migrations of both databases, to be
+    used as both by the clients.
+    """
+    conn = sqlite3.connect(db_file)
+    for migration in sorted(path_config.migrations.glob("*/*.sql")):
+        conn.executescript(migration.read_text())
+    conn.close()
+
+
+def fill_story_chunks(sqlite: SQLiteClient, nb_chunks: int) -> Stories:
+    """
+    Inserts a story of nb_chunks chunks, each with an audio at 100% speed.
+    """
+    story = Stories(title="benchmark", text="benchmark", source="benchmark")
+    sqlite.insert_one(table=Stories, to_insert=story)
+
+    story_chunks = [
+        StoryChunks(story_id=story.id, text=f"チャンク{i}", position=i + 1)
+        for i in range(nb_chunks)
+    ]
+    audios = [Audios(url=f"benchmark/{i}.wav") for i in range(nb_chunks)]
+    sqlite.insert_many(table=StoryChunks, to_insert=story_chunks)
+    sqlite.insert_many(table=Audios, to_insert=audios)
+    sqlite.insert_many(
+        table=StoryChunkAudios,
+        to_insert=(
+            StoryChunkAudios(
+                story_chunk_id=sc.id,
+                audio_id=a.id,
+                speed_percentage=100,
+                speaker_id=27,
+            )
+            for sc, a in zip(story_chunks, audios)
+        ),
+    )
+    return story
+
+
+def best_of(fn: Callable[[], object], repeat: int = 5) -> float:
+    """
+    Best wall time of fn over repeat runs, in seconds.
+    """
+    timings = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    Nearest-rank percentile of values, q in [0, 100].
+    """
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))]
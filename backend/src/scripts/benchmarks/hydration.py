@@ -0,0 +1,59 @@
+import logging
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Type
+
+from src.clients.sqlite import SQLiteClient
+from src.logger import get_logger
+from src.models.database import BaseTableModel, Stories, StoryChunkAudios, StoryChunks
+from tabulate import tabulate
+
+from .core import best_of, create_scratch_db, fill_story_chunks
+
+NB_ROWS = 10_000
+
+
+def main() -> None:
+    logger = get_logger("hydration-benchmark")
+    logger.setLevel(logging.WARNING)
+
+    with TemporaryDirectory() as tmp_dir:
+        db_file = Path(tmp_dir) / "benchmark.sqlite"
+        create_scratch_db(db_file)
+        sqlite = SQLiteClient(logger, db_file=db_file, content_db_file=db_file)
+        fill_story_chunks(sqlite, NB_ROWS)
+        sqlite.insert_many(
+            table=Stories,
+            to_insert=(
+                Stories(title=f"title {i}", text="本文" * 50, source="benchmark")
+                for i in range(NB_ROWS - 1)
+            ),
+        )
+
+        tables: list[Type[BaseTableModel]] = [Stories, StoryChunks, StoryChunkAudios]
+        results = list()
+        for table in tables:
+            rows = sqlite.select_rows(table=table)
+            validated = best_of(lambda: [table(**r) for r in rows])
+            trusted = best_of(lambda: [table.from_row(r) for r in rows])
+            results.append(
+                (
+                    table.__tablename__,
+                    len(rows),
+                    f"{len(rows) / validated:,.0f}",
+                    f"{len(rows) / trusted:,.0f}",
+                    f"{validated / trusted:.1f}x",
+                )
+            )
+        sqlite.close()
+
+    print(
+        tabulate(
+            results,
+            headers=["table", "rows", "validated rows/s", "from_row rows/s", "speedup"],
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
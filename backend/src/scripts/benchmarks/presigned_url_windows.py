@@ -0,0 +1,138 @@
+import random
+from datetime import datetime, timezone
+from typing import Callable
+
+from src.clients.aws import PresignedUrlCache, S3Client
+from src.config.aws import aws_config
+from tabulate import tabulate
+
+NB_AUDIOS = 300
+# Zipf exponent of the audio popularity, a few stories get most of the plays
+POPULARITY_SKEW = 1.1
+ARRIVAL_INTERVAL_S = 2
+SIMULATED_S = 6 * 3600
+# Backend processes (workers, instances, restarts) the plays are spread over, each one
+# with its own url cache
+NB_PROCESSES = (1, 4)
+EXPIRES_IN_S = aws_config.presigned_url_expires_in_s
+
+
+class HttpCacheStandIn:
+    """
+    Shared HTTP cache (a CDN, or a browser cache across plays) keyed by the full url, an
+    entry is fresh until the url expires.
+    """
+
+    def __init__(self) -> None:
+        self._expires_at: dict[str, float] = dict()
+        self.hits = 0
+        self.misses = 0
+
+    def fetch(self, url: str, expires_at: float, now: float) -> None:
+        if self._expires_at.get(url, 0) > now:
+            self.hits += 1
+            return
+        self.misses += 1
+        self._expires_at[url] = expires_at
+
+
+def simulate(
+    presigns: list[Callable[[str, float], tuple[str, float]]],
+) -> tuple[HttpCacheStandIn, int]:
+    """
+    Plays SIMULATED_S seconds of audio requests, each through one of the presigns picked at
+    random, returns the HTTP cache and the number of distinct urls handed out.
+    """
+    rng = random.Random(0)
+    weights = [1 / (rank + 1) ** POPULARITY_SKEW for rank in range(NB_AUDIOS)]
+    http_cache = HttpCacheStandIn()
+    urls: set[str] = set()
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp()
+    for t in range(0, SIMULATED_S, ARRIVAL_INTERVAL_S):
+        (audio,) = rng.choices(range(NB_AUDIOS), weights=weights)
+        presign = rng.choice(presigns)
+        url, expires_at = presign(f"{audio}.wav", start + t)
+        urls.add(url)
+        http_cache.fetch(url, expires_at, start + t)
+    return http_cache, len(urls)
+
+
+def main() -> None:
+    s3 = S3Client()
+    bucket = aws_config.s3_buckets.japanese_dictation
+
+    def per_request(filename: str, now: float) -> tuple[str, float]:
+        url = s3.presigned_url(
+            bucket=bucket,
+            prefix="audio",
+            filename=filename,
+            expires_in_s=EXPIRES_IN_S,
+            signed_at=datetime.fromtimestamp(now, tz=timezone.utc),
+        )
+        return url, now + EXPIRES_IN_S
+
+    def cached(window_s: int | None) -> Callable[[str, float], tuple[str, float]]:
+        cache = PresignedUrlCache(
+            maxsize=NB_AUDIOS,
+            min_remaining_s=aws_config.presigned_url_min_remaining_s,
+            window_s=window_s,
+        )
+        urls_expires_at: dict[str, float] = dict()
+
+        def presign(filename: str, now: float) -> tuple[str, float]:
+            url = cache.presigned_url(
+                s3=s3,
+                bucket=bucket,
+                prefix="audio",
+                filename=filename,
+                expires_in_s=EXPIRES_IN_S,
+                now=now,
+            )
+            # The expiry of the url, from when it was signed
+            return url, urls_expires_at.setdefault(url, now + EXPIRES_IN_S)
+
+        return presign
+
+    window_s = aws_config.presigned_url_window_s or 900
+    results = list()
+    for nb_processes in NB_PROCESSES:
+        for name, make_presign in (
+            ("signed per request", lambda: per_request),
+            ("url cache, no window", lambda: cached(None)),
+            (f"url cache, {window_s} s windows", lambda: cached(window_s)),
+        ):
+            http_cache, nb_urls = simulate(
+                [make_presign() for _ in range(nb_processes)]
+            )
+            total = http_cache.hits + http_cache.misses
+            results.append(
+                (
+                    nb_processes,
+                    name,
+                    nb_urls,
+                    f"{http_cache.hits / total:.1%}",
+                    http_cache.misses,
+                )
+            )
+    s3.close()
+
+    print(
+        f"{SIMULATED_S // ARRIVAL_INTERVAL_S} plays of {NB_AUDIOS} audios over"
+        f" {SIMULATED_S // 3600} h, urls valid {EXPIRES_IN_S} s"
+    )
+    print(
+        tabulate(
+            results,
+            headers=[
+                "processes",
+                "signing",
+                "distinct urls",
+                "HTTP cache hit rate",
+                "S3 fetches",
+            ],
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import time
+from pathlib import Path
+from statistics import mean
+from tempfile import TemporaryDirectory
+from typing import Callable
+
+from src.clients.aws import PresignedUrlCache, S3Client, get_s3_client
+from src.clients.sqlite import AsyncSQLiteClient, SQLiteClient
+from src.config.aws import aws_config
+from src.logger import get_logger
+from src.models.database import StoryChunkAudioMetadata
+from tabulate import tabulate
+
+from .core import create_scratch_db, fill_story_chunks, percentile
+
+NB_CHUNKS = 10
+NB_REQUESTS = 100
+
+
+def client_per_url(audio_url: str) -> str:
+    # The metadata path before the shared client
+    s3 = S3Client()
+    try:
+        return s3.presigned_url(
+            bucket=aws_config.s3_buckets.japanese_dictation,
+            prefix="audio",
+            filename=audio_url,
+        )
+    finally:
+        s3.close()
+
+
+def shared_client(audio_url: str) -> str:
+    return get_s3_client().presigned_url(
+        bucket=aws_config.s3_buckets.japanese_dictation,
+        prefix="audio",
+        filename=audio_url,
+    )
+
+
+def shared_client_cached(cache: PresignedUrlCache) -> Callable[[str], str]:
+    def get_audio_url(audio_url: str) -> str:
+        return cache.presigned_url(
+            s3=get_s3_client(),
+            bucket=aws_config.s3_buckets.japanese_dictation,
+            prefix="audio",
+            filename=audio_url,
+            expires_in_s=aws_config.presigned_url_expires_in_s,
+        )
+
+    return get_audio_url
+
+
+async def sentence_metadata_latencies(
+    sqlite: AsyncSQLiteClient, story_id: str, get_audio_url: Callable[[str], str]
+) -> list[float]:
+    """
+    Latencies of the sentence metadata endpoint work, its query and its urls.
+    """
+    latencies: list[float] = list()
+    for _ in range(NB_REQUESTS):
+        start = time.perf_counter()
+        chunk_audios = await sqlite.select_rows(
+            table=StoryChunkAudioMetadata,
+            columns=["text", "audio_id", "audio_url", "story_chunk_count"],
+            cond_equal=dict(story_id=story_id, speed_percentage=100),
+            order_by="position",
+        )
+        [get_audio_url(sca["audio_url"]) for sca in chunk_audios]
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main() -> None:
+    logger = get_logger("presigned-urls-benchmark")
+    logger.setLevel(logging.WARNING)
+
+    with TemporaryDirectory() as tmp_dir:
+        db_file = Path(tmp_dir) / "benchmark.sqlite"
+        create_scratch_db(db_file)
+        sqlite = SQLiteClient(logger, db_file=db_file, content_db_file=db_file)
+        story = fill_story_chunks(sqlite, NB_CHUNKS)
+        sqlite.close()
+
+        async_sqlite = AsyncSQLiteClient(
+            logger,
+            read_only=True,
+            cache_results=True,
+            db_file=db_file,
+            content_db_file=db_file,
+        )
+        # Out of the measures, the first client construction loads the botocore models
+        get_s3_client()
+        cache = PresignedUrlCache(
+            maxsize=aws_config.presigned_url_cache_size,
+            min_remaining_s=aws_config.presigned_url_min_remaining_s,
+            window_s=aws_config.presigned_url_window_s,
+        )
+        results = list()
+        for name, get_audio_url in (
+            ("client per url", client_per_url),
+            ("shared client", shared_client),
+            ("shared client + url cache", shared_client_cached(cache)),
+        ):
+            latencies = asyncio.run(
+                sentence_metadata_latencies(async_sqlite, story.id, get_audio_url)
+            )
+            results.append(
+                (
+                    name,
+                    f"{mean(latencies) * 1000:.2f}",
+                    f"{percentile(latencies, 50) * 1000:.2f}",
+                    f"{percentile(latencies, 99) * 1000:.2f}",
+                )
+            )
+
+    print(f"{NB_REQUESTS} sentence metadata requests of a {NB_CHUNKS} chunks story")
+    print(tabulate(results, headers=["url signing", "mean ms", "p50 ms", "p99 ms"]))
+
+
+if __name__ == "__main__":
+    main()
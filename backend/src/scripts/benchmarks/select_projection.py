@@ -0,0 +1,74 @@
+import logging
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from src.clients.sqlite import SQLiteClient
+from src.logger import get_logger
+from src.models.database import StoryChunkAudios
+from tabulate import tabulate
+
+from .core import best_of, create_scratch_db, fill_story_chunks
+
+NB_ROWS = 10_000
+
+
+def main() -> None:
+    logger = get_logger("select-projection-benchmark")
+    logger.setLevel(logging.WARNING)
+
+    with TemporaryDirectory() as tmp_dir:
+        db_file = Path(tmp_dir) / "benchmark.sqlite"
+        create_scratch_db(db_file)
+        sqlite = SQLiteClient(logger, db_file=db_file, content_db_file=db_file)
+        fill_story_chunks(sqlite, NB_ROWS)
+        some_id = sqlite.select_rows(table=StoryChunkAudios, columns=["id"], limit=1)[
+            0
+        ]["id"]
+
+        select_timings = {
+            "select (models)": best_of(lambda: sqlite.select(table=StoryChunkAudios)),
+            "select_rows (all columns)": best_of(
+                lambda: sqlite.select_rows(table=StoryChunkAudios)
+            ),
+            "select_rows (id, audio_id)": best_of(
+                lambda: sqlite.select_rows(
+                    table=StoryChunkAudios, columns=["id", "audio_id"]
+                )
+            ),
+        }
+        probe_timings = {
+            "select_by_id": best_of(
+                lambda: sqlite.select_by_id(table=StoryChunkAudios, id=some_id)
+            ),
+            "id_exists": best_of(
+                lambda: sqlite.id_exists(table=StoryChunkAudios, id=some_id)
+            ),
+            "count": best_of(lambda: sqlite.count(table=StoryChunkAudios)),
+            "count (limit=1)": best_of(
+                lambda: sqlite.count(table=StoryChunkAudios, limit=1)
+            ),
+        }
+        sqlite.close()
+
+    reference = select_timings["select (models)"]
+    print(f"Full scan of {NB_ROWS} rows of {StoryChunkAudios.__tablename__}")
+    print(
+        tabulate(
+            [
+                (name, f"{t * 1000:.2f}", f"{(reference - t) * 1000:.2f}")
+                for name, t in select_timings.items()
+            ],
+            headers=["query", "ms", "saved ms per 10k rows"],
+        )
+    )
+    print()
+    print(
+        tabulate(
+            [(name, f"{t * 1_000_000:.1f}") for name, t in probe_timings.items()],
+            headers=["probe", "µs"],
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import dataclasses
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import botocore.auth
+from src.clients.aws import S3Client, S3Presigner
+from src.config.aws import aws_config
+from tabulate import tabulate
+
+from .core import best_of
+
+NB_URLS = 2_000
+EXPIRES_IN_S = aws_config.presigned_url_expires_in_s
+BUCKET = aws_config.s3_buckets.japanese_dictation
+# Spaces, reserved and non ascii characters, the ones the encoding can get wrong
+CHECKED_KEYS = [
+    "audio/00265ca9-1a2e-4506-a109-a633a03d8feb.wav",
+    "audio/a b+c=d&e.ogg",
+    "audio/日本語~テスト.m4a",
+    "database/japanese_dictation_2025-11-15-14-21.sqlite",
+]
+
+
+def check_against_boto3(boto3_client, presigner: S3Presigner) -> int:
+    """
+    Asserts the presigner urls are byte for byte the boto3 ones, returns the urls checked.
+    """
+    start = datetime(2026, 1, 1, 23, 59, 59, tzinfo=timezone.utc)
+    checked = 0
+    # Across a day change, the signing key changes
+    for signed_at in (start, start + timedelta(seconds=1), start + timedelta(days=40)):
+        with mock.patch.object(
+            botocore.auth, "get_current_datetime", lambda: signed_at
+        ):
+            for key in CHECKED_KEYS:
+                expected = boto3_client.generate_presigned_url(
+                    ClientMethod="get_object",
+                    Params=dict(Bucket=BUCKET, Key=key),
+                    ExpiresIn=EXPIRES_IN_S,
+                )
+                url = presigner.presign_get_object(
+                    bucket=BUCKET,
+                    key=key,
+                    expires_in_s=EXPIRES_IN_S,
+                    signed_at=signed_at,
+                )
+                assert url == expected, f"{url=} != {expected=}"
+                checked += 1
+    return checked
+
+
+def main() -> None:
+    access_key = aws_config.access_key or "AKIDEXAMPLE"
+    secret_key = (
+        aws_config.secret_access_key or "wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY"
+    )
+    # The production client, its urls are the ones served
+    with mock.patch(
+        "src.clients.aws.s3.client.aws_config",
+        dataclasses.replace(
+            aws_config, access_key=access_key, secret_access_key=secret_key
+        ),
+    ):
+        s3 = S3Client()
+    boto3_client, presigner = s3.client, s3.presigner
+    checked = check_against_boto3(boto3_client, presigner)
+    print(f"{checked} urls identical to the boto3 ones")
+
+    keys = [f"audio/{i:08d}.wav" for i in range(NB_URLS)]
+    now = datetime.now(timezone.utc)
+    boto3_s = best_of(
+        lambda: [
+            boto3_client.generate_presigned_url(
+                ClientMethod="get_object",
+                Params=dict(Bucket=BUCKET, Key=k),
+                ExpiresIn=EXPIRES_IN_S,
+            )
+            for k in keys
+        ]
+    )
+
+    # A new presigner per url derives the signing key every time
+    cold_s = best_of(
+        lambda: [
+            S3Presigner(
+                access_key, secret_key, aws_config.region, aws_config.endpoint_url
+            ).presign_get_object(BUCKET, k, EXPIRES_IN_S, now)
+            for k in keys
+        ]
+    )
+    warm_s = best_of(
+        lambda: [
+            presigner.presign_get_object(BUCKET, k, EXPIRES_IN_S, now) for k in keys
+        ]
+    )
+    s3.close()
+
+    print(
+        tabulate(
+            [
+                (name, f"{s / NB_URLS * 1e6:.1f}", f"{boto3_s / s:.1f}x")
+                for name, s in (
+                    ("boto3 generate_presigned_url", boto3_s),
+                    ("S3Presigner, key derived per url", cold_s),
+                    ("S3Presigner, key cached per day", warm_s),
+                )
+            ],
+            headers=["presigner", "us/url", "speedup"],
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import logging
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Callable
+
+from src.clients.sqlite import SQLiteClient, close_all_pools
+from src.config.sqlite import sqlite_config
+from src.logger import get_logger
+from src.models.database import Audios, Stories, StoryChunkAudios, StoryChunks
+from tabulate import tabulate
+
+from .core import create_scratch_db
+
+NB_CHUNKS = 2_000
+
+
+def write_chunk(sqlite: SQLiteClient, story: Stories, position: int) -> None:
+    """
+    The writes of the wanikani generation for one chunk: chunk, audio and chunk audio rows.
+    """
+    story_chunk = StoryChunks(story_id=story.id, text="チャンク", position=position)
+    audio = Audios(url=f"{story.id}-{position}.wav")
+    sqlite.insert_one(table=StoryChunks, to_insert=story_chunk)
+    with sqlite.transaction():
+        sqlite.insert_one(table=Audios, to_insert=audio)
+        sqlite.insert_one(
+            table=StoryChunkAudios,
+            to_insert=StoryChunkAudios(
+                story_chunk_id=story_chunk.id,
+                audio_id=audio.id,
+                speed_percentage=100,
+                speaker_id=27,
+            ),
+        )
+
+
+def run(sqlite: SQLiteClient, write_all: Callable[[Stories], None]) -> float:
+    story = Stories(title="benchmark", text="benchmark", source="benchmark")
+    sqlite.insert_one(table=Stories, to_insert=story)
+    start = time.perf_counter()
+    write_all(story)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    logger = get_logger("write-batching-benchmark")
+    logger.setLevel(logging.WARNING)
+
+    def commit_per_write(sqlite: SQLiteClient, story: Stories) -> None:
+        for position in range(1, NB_CHUNKS + 1):
+            write_chunk(sqlite, story, position)
+
+    def batched(commit_every: int) -> Callable[[SQLiteClient, Stories], None]:
+        def write_all(sqlite: SQLiteClient, story: Stories) -> None:
+            with sqlite.transaction(commit_every=commit_every):
+                for position in range(1, NB_CHUNKS + 1):
+                    with sqlite.transaction():
+                        write_chunk(sqlite, story, position)
+
+        return write_all
+
+    scenarios: list[tuple[str, Callable[[SQLiteClient, Stories], None]]] = [
+        ("commit per write", commit_per_write),
+        ("transaction(commit_every=10)", batched(10)),
+        ("transaction(commit_every=100)", batched(100)),
+        ("single transaction", batched(0)),
+    ]
+
+    results = list()
+    for name, write_all in scenarios:
+        with TemporaryDirectory() as tmp_dir:
+            db_file = Path(tmp_dir) / "benchmark.sqlite"
+            create_scratch_db(db_file)
+            sqlite = SQLiteClient(logger, db_file=db_file, content_db_file=db_file)
+            elapsed = run(sqlite, lambda story: write_all(sqlite, story))
+            sqlite.close()
+            close_all_pools()
+        nb_rows = NB_CHUNKS * 3
+        results.append((name, nb_rows, f"{elapsed:.2f}", f"{nb_rows / elapsed:,.0f}"))
+
+    # SQLITE_PRAGMA_PROFILE=durable to measure with a fsync per commit
+    print(f"pragma profile: {sqlite_config.pragma_profile}")
+    print(tabulate(results, headers=["mode", "rows", "s", "rows/s"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,20 @@
-from .core import load_sqlite_file, save_sqlite_file
+from .core import (
+    backup_reports,
+    load_sqlite_file,
+    replicate_sqlite_file,
+    save_content_file,
+    save_sqlite_file,
+)
+from .exceptions import DatabaseIntegrityError
+from .models import BackupReport, LoadReport
 
 __all__ = [
+    "backup_reports",
+    "BackupReport",
+    "DatabaseIntegrityError",
     "load_sqlite_file",
+    "LoadReport",
+    "replicate_sqlite_file",
+    "save_content_file",
     "save_sqlite_file",
 ]
@@ -1,35 +1,322 @@
+import gzip
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from collections import deque
 from datetime import datetime
+from pathlib import Path
+from tempfile import TemporaryDirectory
 
+from botocore.exceptions import ClientError
 from src.clients.aws import S3Client
+from src.clients.sqlite import (
+    DatabaseChangeMonitor,
+    bump_table_versions,
+    drained_pools,
+)
 from src.config.aws import aws_config
 from src.config.path import path_config
+from src.config.replication import replication_config
 from src.logger import get_logger
+from src.models.database import Stories
+from src.modules.replication import (
+    ReplicaNotFoundError,
+    ReplicationReport,
+    Replicator,
+    get_replica_storage,
+    restore,
+)
+from src.scripts.split_sqlite_db import database_tables, split_db
+
+from .exceptions import DatabaseIntegrityError
+from .models import BackupReport, LoadReport
 
 japanese_dictation_filename = "japanese_dictation_latest.sqlite"
+japanese_dictation_gz_filename = japanese_dictation_filename + ".gz"
+# Content database, published apart since the user backups no longer hold it
+japanese_dictation_content_gz_filename = "japanese_dictation_content.sqlite.gz"
 japanese_dictation_key_prefix = "database"
 logger = get_logger()
 
+backup_reports: deque[BackupReport] = deque(maxlen=288)
+
+
+change_monitor = DatabaseChangeMonitor(path_config.sqlite_db_file)
+replicator = (
+    Replicator(path_config.sqlite_db_file, get_replica_storage())
+    if replication_config.enabled
+    else None
+)
+_reload_lock = threading.Lock()
+
 
-def load_sqlite_file(custom_file_name: str | None = None) -> None:
+def _download_backup(custom_file_name: str | None, dst_file: Path) -> None:
     s3 = S3Client()
-    s3.download_file(
-        dst_folder=path_config.sqlite_db_file.parents[0],
-        bucket=aws_config.s3_buckets.japanese_dictation,
-        s3_filename=custom_file_name or japanese_dictation_filename,
-        key_prefix=japanese_dictation_key_prefix,
-        dst_filename=path_config.sqlite_db_file.name,
-    )
+    with TemporaryDirectory(dir=dst_file.parents[0]) as tmp_dir:
+        s3_filename = custom_file_name or japanese_dictation_gz_filename
+        try:
+            s3.download_file(
+                dst_folder=Path(tmp_dir),
+                bucket=aws_config.s3_buckets.japanese_dictation,
+                s3_filename=s3_filename,
+                key_prefix=japanese_dictation_key_prefix,
+            )
+        except ClientError as e:
+            if custom_file_name or e.response["Error"]["Code"] != "404":
+                raise
+            # Bucket without compressed backup yet
+            s3_filename = japanese_dictation_filename
+            s3.download_file(
+                dst_folder=Path(tmp_dir),
+                bucket=aws_config.s3_buckets.japanese_dictation,
+                s3_filename=s3_filename,
+                key_prefix=japanese_dictation_key_prefix,
+            )
+        downloaded = Path(tmp_dir) / s3_filename
+        if s3_filename.endswith(".gz"):
+            with gzip.open(downloaded, "rb") as src, open(dst_file, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+        else:
+            shutil.copyfile(downloaded, dst_file)
     s3.close()
-    logger.info(f"Sqlite file downloaded from s3. {datetime.now()=}")
 
 
-def save_sqlite_file() -> None:
+def _download_content(dst_file: Path) -> bool:
+    """
+    Downloads the content snapshot, False if none was published yet.
+    """
     s3 = S3Client()
-    s3.upload_file(
-        src_filepath=path_config.sqlite_db_file,
-        bucket=aws_config.s3_buckets.japanese_dictation,
-        key_prefix=japanese_dictation_key_prefix,
-        dst_filename=japanese_dictation_filename,
-    )
-    s3.close()
-    logger.info(f"Sqlite file uploaded to s3. {datetime.now()=}")
+    with TemporaryDirectory(dir=dst_file.parents[0]) as tmp_dir:
+        try:
+            s3.download_file(
+                dst_folder=Path(tmp_dir),
+                bucket=aws_config.s3_buckets.japanese_dictation,
+                s3_filename=japanese_dictation_content_gz_filename,
+                key_prefix=japanese_dictation_key_prefix,
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "404":
+                raise
+            return False
+        finally:
+            s3.close()
+        downloaded = Path(tmp_dir) / japanese_dictation_content_gz_filename
+        with gzip.open(downloaded, "rb") as src, open(dst_file, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+    return True
+
+
+def _upload_content(content_file: Path) -> None:
+    with TemporaryDirectory() as tmp_dir:
+        gz_file = Path(tmp_dir) / japanese_dictation_content_gz_filename
+        with open(content_file, "rb") as f_in, gzip.open(
+            gz_file, "wb", compresslevel=6
+        ) as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        s3 = S3Client()
+        s3.upload_file(
+            src_filepath=gz_file,
+            bucket=aws_config.s3_buckets.japanese_dictation,
+            key_prefix=japanese_dictation_key_prefix,
+        )
+        s3.close()
+    logger.info(f"Content snapshot uploaded to s3. {content_file=}")
+
+
+def _check_content(content_file: Path) -> None:
+    """
+    Raises if content_file holds no story, the content endpoints would serve nothing.
+    """
+    conn = sqlite3.connect(f"{content_file.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        count = conn.execute(
+            f"SELECT COUNT(*) FROM {Stories.__tablename__};"
+        ).fetchone()[0]
+    except sqlite3.OperationalError as e:
+        raise DatabaseIntegrityError(f"{content_file=} has no content, {e=}") from e
+    finally:
+        conn.close()
+    if not count:
+        raise DatabaseIntegrityError(f"{content_file=} has no story")
+
+
+def _check_integrity(db_file: Path) -> None:
+    conn = sqlite3.connect(f"{db_file.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        errors = [row[0] for row in conn.execute("PRAGMA integrity_check;")]
+    except sqlite3.DatabaseError as e:
+        raise DatabaseIntegrityError(f"{db_file=} is not a database, {e=}") from e
+    finally:
+        conn.close()
+    if errors != ["ok"]:
+        raise DatabaseIntegrityError(
+            f"{db_file=} failed the integrity check, {errors[:10]=}"
+        )
+
+
+def load_sqlite_file(
+    custom_file_name: str | None = None, at: datetime | None = None
+) -> LoadReport:
+    """
+    Replaces the database with its backup, or with replication enabled, restores it as it
+    was at the given time (latest if None), falling back to the backup when nothing was
+    replicated yet.
+
+    The content database is replaced by its S3 snapshot when one was published. A backup
+    taken before the split still holds the content: it is split, its content half becoming
+    the snapshot.
+
+    The new files are staged next to the databases and checked before being renamed over
+    them. Only the rename holds back the queries: the ones in flight finish on the previous
+    files and the pooled connections are reopened on the new ones.
+    """
+    if at is not None and (replicator is None or custom_file_name):
+        raise ValueError("Point in time restore needs replication and no custom file")
+
+    db_file = path_config.sqlite_db_file
+    content_db_file = path_config.content_db_file
+    report = LoadReport(started_at=datetime.now(), restored=False)
+    with _reload_lock, TemporaryDirectory(dir=db_file.parents[0]) as tmp_dir:
+        staged_file = Path(tmp_dir) / db_file.name
+        staged_content = Path(tmp_dir) / content_db_file.name
+        start = time.perf_counter()
+        if replicator is not None and not custom_file_name:
+            try:
+                restore(replicator.storage, staged_file, at=at)
+                report.restored = True
+            except ReplicaNotFoundError:
+                if at is not None:
+                    raise
+                logger.info("Nothing replicated yet, loading the backup")
+        if not report.restored:
+            _download_backup(custom_file_name, staged_file)
+        # Backups taken before the split of the content database hold every table
+        split = bool(database_tables(staged_file, "content"))
+        new_content = True
+        if split:
+            split_db(
+                src_file=staged_file, content_file=staged_content, user_file=staged_file
+            )
+        elif not _download_content(staged_content):
+            logger.info("No content snapshot published, keeping the content database")
+            new_content = False
+        report.fetch_s = time.perf_counter() - start
+        report.db_bytes = staged_file.stat().st_size
+        if new_content:
+            report.content_bytes = staged_content.stat().st_size
+
+        start = time.perf_counter()
+        _check_integrity(staged_file)
+        if new_content:
+            _check_integrity(staged_content)
+        _check_content(staged_content if new_content else content_db_file)
+        report.check_s = time.perf_counter() - start
+
+        if split:
+            # Published before the next backup overwrites the last one holding it
+            _upload_content(staged_content)
+
+        start = time.perf_counter()
+        with drained_pools(db_file, content_db_file):
+            # The WAL files belong to the database being replaced
+            change_monitor.close()
+            os.replace(staged_file, db_file)
+            for suffix in ("-wal", "-shm"):
+                db_file.with_name(db_file.name + suffix).unlink(missing_ok=True)
+            if new_content:
+                # Attached immutable, only opened again by the reopened connections
+                os.replace(staged_content, content_db_file)
+            # Results cached from the previous file
+            bump_table_versions()
+        report.swap_s = time.perf_counter() - start
+
+    # Same content as the backup, nothing to upload until the next commit
+    change_monitor.mark()
+    logger.info(f"Sqlite file swapped in. {report=}")
+    return report
+
+
+def save_sqlite_file(force: bool = False) -> BackupReport:
+    """
+    Uploads a gzipped, consistent snapshot of the database, unless nothing was committed
+    since the last backup (or load) and not force.
+    """
+    report = BackupReport(started_at=datetime.now(), skipped=False)
+    state = change_monitor.state()
+    if not force and change_monitor.is_marked(state):
+        report.skipped = True
+        backup_reports.append(report)
+        logger.info(f"Sqlite file unchanged, backup skipped. {report=}")
+        return report
+
+    with TemporaryDirectory() as tmp_dir:
+        snapshot_file = Path(tmp_dir) / japanese_dictation_filename
+        gz_file = Path(tmp_dir) / japanese_dictation_gz_filename
+
+        # The backup API copies the pages of a single read transaction, writers are not
+        # blocked and the copy cannot be torn by a concurrent commit
+        start = time.perf_counter()
+        src = sqlite3.connect(
+            f"{path_config.sqlite_db_file.resolve().as_uri()}?mode=ro", uri=True
+        )
+        dst = sqlite3.connect(snapshot_file)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
+        report.snapshot_s = time.perf_counter() - start
+        report.db_bytes = snapshot_file.stat().st_size
+
+        start = time.perf_counter()
+        with open(snapshot_file, "rb") as f_in, gzip.open(
+            gz_file, "wb", compresslevel=6
+        ) as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        report.compress_s = time.perf_counter() - start
+        report.compressed_bytes = gz_file.stat().st_size
+
+        start = time.perf_counter()
+        s3 = S3Client()
+        s3.upload_file(
+            src_filepath=gz_file,
+            bucket=aws_config.s3_buckets.japanese_dictation,
+            key_prefix=japanese_dictation_key_prefix,
+        )
+        s3.close()
+        report.upload_s = time.perf_counter() - start
+
+    change_monitor.mark(state)
+    backup_reports.append(report)
+    logger.info(f"Sqlite file uploaded to s3. {report=}")
+    return report
+
+
+def save_content_file() -> None:
+    """
+    Publishes a consistent snapshot of the content database, the one swapped in by the
+    next loads. To run once the content is generated, the backups never hold it.
+    """
+    content_db_file = path_config.content_db_file
+    with TemporaryDirectory() as tmp_dir:
+        snapshot_file = Path(tmp_dir) / content_db_file.name
+        src = sqlite3.connect(f"{content_db_file.resolve().as_uri()}?mode=ro", uri=True)
+        dst = sqlite3.connect(snapshot_file)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
+        _check_integrity(snapshot_file)
+        _check_content(snapshot_file)
+        _upload_content(snapshot_file)
+
+
+def replicate_sqlite_file() -> ReplicationReport | None:
+    """
+    Ships the changes committed since the last call to the replica, see Replicator.
+    """
+    assert replicator is not None, "Replication is not enabled"
+    return replicator.sync()
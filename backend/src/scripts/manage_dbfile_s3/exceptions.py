@@ -0,0 +1,3 @@
+class DatabaseIntegrityError(Exception):
+    def __init__(self, detail: str | None = None) -> None:
+        super().__init__(detail)
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class BackupReport(BaseModel):
+    started_at: datetime
+    # Nothing committed since the last backup, nothing uploaded
+    skipped: bool
+    db_bytes: int = 0
+    compressed_bytes: int = 0
+    snapshot_s: float = 0.0
+    compress_s: float = 0.0
+    upload_s: float = 0.0
+
+
+class LoadReport(BaseModel):
+    started_at: datetime
+    # Restored from the replica, downloaded from the backup otherwise
+    restored: bool
+    db_bytes: int = 0
+    # Content snapshot swapped in along, the content database was kept otherwise
+    content_bytes: int | None = None
+    fetch_s: float = 0.0
+    check_s: float = 0.0
+    swap_s: float = 0.0
@@ -0,0 +1,4 @@
+from .core import save_content_file
+
+if __name__ == "__main__":
+    save_content_file()
@@ -3,6 +3,7 @@ from typing import Type
 
 from src.clients.sqlite import SQLiteClient
 from src.config.path import path_config
+from src.logger import get_logger
 from src.models.database import (
     Audios,
     BaseTableModel,
@@ -15,6 +16,8 @@ from src.models.database import (
     WanikaniStories,
 )
 
+logger = get_logger()
+
 
 def save_db() -> None:
     sqlite = SQLiteClient()
@@ -31,13 +34,18 @@ def save_db() -> None:
     ]
 
     for table in tables:
-        full_data = sqlite.select(table=table)
+        # Streamed row by row, the tables never have to fit in memory
         with open(path_config.seed_db / f"{table.__tablename__}.json", "w") as f:
-            json.dump([d.model_dump() for d in full_data], f)
+            f.write("[")
+            for i, d in enumerate(sqlite.select_iter(table=table, keyset_column="id")):
+                if i:
+                    f.write(", ")
+                json.dump(d.model_dump(), f)
+            f.write("]")
 
 
 def load_db() -> None:
-    sqlite = SQLiteClient()
+    sqlite = SQLiteClient(write_content=True)
 
     tables: list[Type[BaseTableModel]] = [
         Stories,
@@ -52,5 +60,12 @@ def load_db() -> None:
 
     for table in tables:
         with open(path_config.seed_db / f"{table.__tablename__}.json", "r") as f:
-            full_data = [table(**d) for d in json.load(f)]
-        sqlite.insert(table=table, to_insert=full_data)
+            rows = json.load(f)
+        report = sqlite.insert_many(
+            table=table,
+            to_insert=(table(**d) for d in rows),
+            defer_foreign_keys=True,
+        )
+        logger.info(
+            f"Loaded {report.inserted} rows in {table.__tablename__} ({report.rows_per_s:.0f} rows/s)"
+        )
@@ -1,3 +1,8 @@
+from .core import UploadManifest, upload_files
 from .main import main as s3_upload_audios_main
 
-__all__ = ["s3_upload_audios_main"]
+__all__ = [
+    "s3_upload_audios_main",
+    "upload_files",
+    "UploadManifest",
+]
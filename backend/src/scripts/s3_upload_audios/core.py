@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from boto3.s3.transfer import TransferConfig
+from src.clients.aws import S3Client
+from src.config.aws import aws_config
+from src.config.path import path_config
+from src.logger import get_logger
+from tqdm import tqdm
+
+from .models import UploadReport
+
+logger = get_logger()
+
+MB = 1024 * 1024
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(MB):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class UploadManifest:
+    """
+    Content hashes of the files already uploaded, per key, persisted as json. A file is
+    only hashed again when its size or modification time changed.
+    """
+
+    def __init__(self, manifest_file: Path) -> None:
+        self.manifest_file = manifest_file
+        # key -> dict(sha256, size, mtime_ns)
+        self._entries: dict[str, dict] = (
+            json.loads(manifest_file.read_text()) if manifest_file.exists() else dict()
+        )
+        self._lock = threading.Lock()
+
+    def content_hash(self, key: str, path: Path) -> tuple[str, bool]:
+        """
+        Hash of the file, and whether that content is the one uploaded under key.
+        """
+        stat_result = path.stat()
+        with self._lock:
+            entry = self._entries.get(key)
+        if (
+            entry is not None
+            and entry["size"] == stat_result.st_size
+            and entry["mtime_ns"] == stat_result.st_mtime_ns
+        ):
+            return entry["sha256"], True
+        sha256 = file_sha256(path)
+        return sha256, entry is not None and entry["sha256"] == sha256
+
+    def record(self, key: str, path: Path, sha256: str) -> None:
+        stat_result = path.stat()
+        with self._lock:
+            self._entries[key] = dict(
+                sha256=sha256,
+                size=stat_result.st_size,
+                mtime_ns=stat_result.st_mtime_ns,
+            )
+
+    def save(self) -> None:
+        """
+        Checkpoints the manifest, atomically so a crash keeps the previous one.
+        """
+        with self._lock:
+            content = json.dumps(self._entries)
+        self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.manifest_file.with_suffix(".tmp")
+        tmp_file.write_text(content)
+        os.replace(tmp_file, self.manifest_file)
+
+
+def default_manifest_file(bucket: str) -> Path:
+    # One per S3 endpoint, a local stand-in does not mark the files uploaded to AWS
+    endpoint = (
+        urlsplit(aws_config.endpoint_url).netloc if aws_config.endpoint_url else "aws"
+    )
+    return (
+        path_config.local_data_scripts
+        / "s3_upload_audios"
+        / f"{endpoint.replace(':', '_')}_{bucket}.json"
+    )
+
+
+def upload_files(
+    files: list[Path],
+    bucket: str,
+    key_prefix: str,
+    manifest_file: Path | None = None,
+    max_workers: int = 8,
+    multipart_threshold: int = 16 * MB,
+    multipart_chunksize: int = 8 * MB,
+    checkpoint_every: int = 100,
+) -> UploadReport:
+    """
+    Uploads the files max_workers at a time, skipping the ones whose content the manifest
+    says is already uploaded. Files above multipart_threshold are sent as multipart uploads
+    of multipart_chunksize parts. The manifest is checkpointed every checkpoint_every
+    uploads and when stopping, a run after a failure only sends what is left.
+    """
+    manifest = UploadManifest(manifest_file or default_manifest_file(bucket))
+    transfer_config = TransferConfig(
+        multipart_threshold=multipart_threshold,
+        multipart_chunksize=multipart_chunksize,
+        # The files are already uploaded in parallel, a few parts at a time for the large ones
+        max_concurrency=4,
+    )
+    s3 = S3Client()
+    report = UploadReport(files=len(files))
+
+    def upload(path: Path) -> int:
+        """
+        Uploaded bytes, 0 if skipped.
+        """
+        key = f"{key_prefix}/{path.name}"
+        sha256, uploaded = manifest.content_hash(key, path)
+        if uploaded:
+            return 0
+        s3.upload_file(
+            src_filepath=path,
+            bucket=bucket,
+            key_prefix=key_prefix,
+            transfer_config=transfer_config,
+        )
+        manifest.record(key, path, sha256)
+        return path.stat().st_size
+
+    start = time.perf_counter()
+    try:
+        with (
+            ThreadPoolExecutor(max_workers=max_workers) as executor,
+            tqdm(total=len(files), unit="file") as progress,
+        ):
+            futures = {executor.submit(upload, path): path for path in files}
+            for future in as_completed(futures):
+                progress.update()
+                try:
+                    size = future.result()
+                except Exception:
+                    # Retried by botocore already, left for the next run
+                    logger.exception(f"Upload failed, {futures[future]=}")
+                    report.failed += 1
+                    continue
+                if size:
+                    report.uploaded += 1
+                    report.uploaded_bytes += size
+                    if report.uploaded % checkpoint_every == 0:
+                        manifest.save()
+                else:
+                    report.skipped += 1
+    finally:
+        manifest.save()
+        s3.close()
+        report.elapsed_s = time.perf_counter() - start
+    return report
@@ -1,28 +1,52 @@
 import os
 
-from src.clients.aws import S3Client
-from src.clients.mysql.sync_client import MysqlClientReader
-from src.config.env_var import S3Buckets
+from src.clients.sqlite import SQLiteClient
+from src.config.aws import aws_config
 from src.config.path import path_config
-from src.models.database import AudioTable
-from tqdm import tqdm
+from src.logger import get_logger
+from src.models.database import Audios, AudioVariants
+
+from .core import upload_files
+
+logger = get_logger()
 
 
 def main() -> None:
-    reader = MysqlClientReader()
-    s3 = S3Client()
-
-    res = reader.select(table=AudioTable)
-
-    all_audios = set(os.listdir(path_config.audio / "default"))
-    assert len(res) == len(all_audios)
-    for r in res:
-        if r.url.replace("default/", "") not in all_audios:
-            print(r.url)
-
-    for a in tqdm(res):
-        s3.upload_file(
-            src_filepath=path_config.audio / a.url,
-            bucket=S3Buckets.japanese_dictation,
-            key_prefix="audio",
+    sqlite = SQLiteClient(read_only=True)
+
+    all_audios = set(os.listdir(path_config.audio))
+    # The transcoded variants sit next to their WAV
+    tables = [Audios, AudioVariants]
+    urls = [
+        r["url"]
+        for table in tables
+        for r in sqlite.select_rows_iter(
+            table=table, columns=["id", "url"], keyset_column="id"
+        )
+    ]
+    # Files without a row include the leftovers of an interrupted transcoding
+    missing = set(urls) - all_audios
+    extra = all_audios - set(urls)
+    if missing:
+        logger.warning(
+            f"{len(missing)} audios without a file, not uploaded {sorted(missing)=}"
         )
+    if extra:
+        logger.warning(
+            f"{len(extra)} files without an audio, not uploaded {sorted(extra)=}"
+        )
+
+    report = upload_files(
+        files=[path_config.audio / url for url in urls if url in all_audios],
+        bucket=aws_config.s3_buckets.japanese_dictation,
+        key_prefix="audio",
+    )
+    logger.info(
+        f"{report.uploaded}/{report.files} files uploaded, {report.skipped} skipped,"
+        f" {report.failed} failed, {report.uploaded_bytes / 1e6:.1f} MB in"
+        f" {report.elapsed_s:.1f} s ({report.mb_per_s:.1f} MB/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+
+
+class UploadReport(BaseModel):
+    files: int = 0
+    uploaded: int = 0
+    # Same content already uploaded, per the manifest
+    skipped: int = 0
+    failed: int = 0
+    uploaded_bytes: int = 0
+    elapsed_s: float = 0.0
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.uploaded_bytes / 1e6 / self.elapsed_s if self.elapsed_s else 0.0
@@ -0,0 +1,7 @@
+from .core import database_tables, keep_database, split_db
+
+__all__ = [
+    "database_tables",
+    "keep_database",
+    "split_db",
+]
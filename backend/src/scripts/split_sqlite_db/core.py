@@ -0,0 +1,109 @@
+import shutil
+import sqlite3
+from pathlib import Path
+from typing import Literal, Type
+
+from src.config.path import path_config
+from src.logger import get_logger
+from src.models.database import (
+    Audios,
+    AudioVariants,
+    BaseTableModel,
+    Configs,
+    Stories,
+    StoryAudios,
+    StoryChunkAudios,
+    StoryChunks,
+    Users,
+    WanikaniStories,
+)
+
+logger = get_logger()
+
+tables: list[Type[BaseTableModel]] = [
+    Audios,
+    AudioVariants,
+    Stories,
+    WanikaniStories,
+    StoryAudios,
+    StoryChunks,
+    StoryChunkAudios,
+    Users,
+    Configs,
+]
+
+
+def database_tables(db_file: Path, database: Literal["content", "user"]) -> list[str]:
+    """
+    Returns the tables of db_file routed to the given database.
+    """
+    conn = sqlite3.connect(f"{db_file.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        existing = {
+            row[0]
+            for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table';"
+            )
+        }
+    finally:
+        conn.close()
+    return [
+        t.__tablename__
+        for t in tables
+        if t.__database__ == database and t.__tablename__ in existing
+    ]
+
+
+def keep_database(db_file: Path, database: Literal["content", "user"]) -> list[str]:
+    """
+    Drops from db_file the tables routed to the other database, and the records of their
+    migrations. Returns the dropped tables, none if db_file was already split.
+    """
+    other_migrations = (
+        path_config.user_migrations
+        if database == "content"
+        else path_config.content_migrations
+    )
+    conn = sqlite3.connect(db_file, isolation_level=None)
+    try:
+        existing = {
+            row[0]
+            for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table';"
+            )
+        }
+        dropped = [
+            t.__tablename__
+            for t in tables
+            if t.__database__ != database and t.__tablename__ in existing
+        ]
+        if not dropped:
+            return dropped
+
+        conn.execute("PRAGMA foreign_keys = OFF;")
+        conn.execute("BEGIN;")
+        for table in dropped:
+            conn.execute(f"DROP TABLE {table};")
+        if "_yoyo_migration" in existing:
+            conn.executemany(
+                "DELETE FROM _yoyo_migration WHERE migration_id = ?;",
+                [(m.stem,) for m in other_migrations.glob("*.sql")],
+            )
+        conn.execute("COMMIT;")
+        conn.execute("VACUUM;")
+    finally:
+        conn.close()
+    logger.info(f"Kept the {database} tables of {db_file=}, {dropped=}")
+    return dropped
+
+
+def split_db(src_file: Path, content_file: Path, user_file: Path) -> None:
+    """
+    Splits a database holding every table into its content and user databases, src_file
+    can be one of them.
+    """
+    for dst_file in (content_file, user_file):
+        if dst_file != src_file:
+            shutil.copyfile(src_file, dst_file)
+    keep_database(content_file, "content")
+    keep_database(user_file, "user")
@@ -0,0 +1,51 @@
+import sqlite3
+from pathlib import Path
+
+from src.config.path import path_config
+
+from .core import database_tables, split_db
+
+
+def content_rows(db_file: Path) -> int:
+    """
+    Rows of the content tables of db_file, 0 if there is no such file.
+    """
+    if not db_file.exists():
+        return 0
+    conn = sqlite3.connect(f"{db_file.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        return sum(
+            conn.execute(f"SELECT COUNT(*) FROM {table};").fetchone()[0]
+            for table in database_tables(db_file, "content")
+        )
+    finally:
+        conn.close()
+
+
+def main() -> None:
+    # Bundled database of the single file layout
+    if not path_config.bundled_db_file.exists():
+        split_db(
+            src_file=path_config.content_db_file,
+            content_file=path_config.content_db_file,
+            user_file=path_config.bundled_db_file,
+        )
+    if path_config.sqlite_db_file.exists() and database_tables(
+        path_config.sqlite_db_file, "content"
+    ):
+        # The content of the single file layout is moved, never dropped
+        rows = content_rows(path_config.content_db_file)
+        if rows:
+            raise RuntimeError(
+                f"{path_config.content_db_file=} already holds {rows} content rows,"
+                f" not overwritten by the ones of {path_config.sqlite_db_file=}"
+            )
+        split_db(
+            src_file=path_config.sqlite_db_file,
+            content_file=path_config.content_db_file,
+            user_file=path_config.sqlite_db_file,
+        )
+
+
+if __name__ == "__main__":
+    main()
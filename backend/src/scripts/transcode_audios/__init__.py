@@ -0,0 +1,8 @@
+from .core import transcode_audio, transcode_audios
+from .main import main as transcode_audios_main
+
+__all__ = [
+    "transcode_audio",
+    "transcode_audios",
+    "transcode_audios_main",
+]
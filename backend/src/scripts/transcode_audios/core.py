@@ -0,0 +1,124 @@
+import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable
+
+from src.clients.sqlite import SQLiteClient
+from src.config.audio import AudioFormat, audio_formats, source_audio_format
+from src.config.path import path_config
+from src.logger import get_logger
+from src.models.database import Audios, AudioVariants
+
+from .models import FormatReport, TranscodeReport
+
+logger = get_logger()
+
+
+def transcode_audio(src_file: Path, audio_format: AudioFormat) -> Path:
+    """
+    Writes the audio_format variant next to src_file, same name with the format extension.
+    """
+    dst_file = src_file.with_suffix(audio_format.extension)
+    # ffmpeg picks the container from the extension, a crash never leaves a partial variant
+    part_file = dst_file.with_name(f"{dst_file.stem}.part{dst_file.suffix}")
+    try:
+        subprocess.run(
+            [
+                "ffmpeg",
+                "-nostdin",
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-y",
+                "-i",
+                str(src_file),
+                "-vn",
+                *audio_format.ffmpeg_args,
+                str(part_file),
+            ],
+            check=True,
+            capture_output=True,
+        )
+        os.replace(part_file, dst_file)
+    finally:
+        part_file.unlink(missing_ok=True)
+    return dst_file
+
+
+def transcode_audios(
+    formats: Iterable[str] = ("OPUS", "AAC"),
+    max_workers: int = os.cpu_count() or 1,
+) -> TranscodeReport:
+    """
+    Transcodes every audio missing one of the formats and records the variants, so it
+    can be stopped and run again. The ffmpeg processes run max_workers at a time.
+    """
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg is required to transcode the audios")
+    targets = [audio_formats[f] for f in formats]
+    assert source_audio_format not in targets
+
+    sqlite = SQLiteClient(logger, write_content=True)
+    report = TranscodeReport(formats={f.name: FormatReport() for f in targets})
+    done = {
+        (v["audio_id"], v["format"])
+        for v in sqlite.select_rows_iter(
+            table=AudioVariants, columns=["audio_id", "format"], keyset_column="id"
+        )
+    }
+
+    def transcode(
+        audio: dict, audio_format: AudioFormat
+    ) -> tuple[dict, AudioFormat, Path | None]:
+        try:
+            return (
+                audio,
+                audio_format,
+                transcode_audio(path_config.audio / audio["url"], audio_format),
+            )
+        except (OSError, subprocess.CalledProcessError) as e:
+            stderr = getattr(e, "stderr", b"") or b""
+            logger.error(
+                f"Transcoding failed, {audio['url']=}, {e=}, {stderr.decode()}"
+            )
+            return audio, audio_format, None
+
+    jobs: list[tuple[dict, AudioFormat]] = list()
+    for audio in sqlite.select_rows_iter(
+        table=Audios, columns=["id", "url"], keyset_column="id"
+    ):
+        report.audios += 1
+        for audio_format in targets:
+            if (audio["id"], audio_format.name) in done:
+                report.skipped += 1
+            else:
+                jobs.append((audio, audio_format))
+    logger.info(f"Transcoding {len(jobs)} variants of {report.audios} audios")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for audio, audio_format, dst_file in executor.map(
+            lambda job: transcode(*job), jobs
+        ):
+            format_report = report.formats[audio_format.name]
+            if dst_file is None:
+                format_report.failed += 1
+                continue
+            size_bytes = dst_file.stat().st_size
+            # One row at a time, what is transcoded stays recorded if the run stops
+            sqlite.insert_one(
+                table=AudioVariants,
+                to_insert=AudioVariants(
+                    audio_id=audio["id"],
+                    format=audio_format.name,
+                    url=dst_file.name,
+                    size_bytes=size_bytes,
+                ),
+            )
+            format_report.files += 1
+            format_report.source_bytes += (
+                (path_config.audio / audio["url"]).stat().st_size
+            )
+            format_report.variant_bytes += size_bytes
+    return report
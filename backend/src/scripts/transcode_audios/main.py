@@ -0,0 +1,20 @@
+from src.logger import get_logger
+
+from .core import transcode_audios
+
+logger = get_logger()
+
+
+def main() -> None:
+    report = transcode_audios()
+    for name, f in report.formats.items():
+        ratio = f.variant_bytes / f.source_bytes if f.source_bytes else 0.0
+        logger.info(
+            f"{name}: {f.files} files, {f.source_bytes} -> {f.variant_bytes} bytes"
+            f" ({ratio:.1%}), {f.saved_bytes} bytes saved, {f.failed} failed"
+        )
+    logger.info(f"{report.audios} audios, {report.skipped} variants already there")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+
+
+class FormatReport(BaseModel):
+    files: int = 0
+    # Of the WAV files transcoded, to compare with variant_bytes
+    source_bytes: int = 0
+    variant_bytes: int = 0
+    failed: int = 0
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.source_bytes - self.variant_bytes
+
+
+class TranscodeReport(BaseModel):
+    audios: int = 0
+    # Variants already recorded, not transcoded again
+    skipped: int = 0
+    formats: dict[str, FormatReport] = dict()
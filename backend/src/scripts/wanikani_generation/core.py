@@ -3,16 +3,16 @@ import re
 from pathlib import Path
 from uuid import uuid4
 
-from src.clients.mysql.sync_client import MysqlClientWriter
-from src.config.runtime import path_config
+from src.clients.sqlite import SQLiteClient
+from src.config.path import path_config
 from src.logger import get_logger
 from src.models.database import (
-    AudioTable,
-    StoryAudioTable,
-    StoryChunkAudioTable,
-    StoryChunkTable,
-    StoryTable,
-    WanikaniStoryTable,
+    Audios,
+    Stories,
+    StoryAudios,
+    StoryChunkAudios,
+    StoryChunks,
+    WanikaniStories,
 )
 from src.modules.audio_generator import AudioGenerator, Element, StoryGeneration
 
@@ -40,64 +40,53 @@ def gen_and_store_text_audio(
         speaker_id=speaker_id,
     )
     audio_file_dest = str(uuid4()) + ".wav"
-    ## NOTE: Here we use default just because I want them in the base application
-    with open(path_config.audio / "default" / audio_file_dest, "wb") as f:
+    with open(path_config.audio / audio_file_dest, "wb") as f:
         f.write(audio_bytes)
 
     return audio_file_dest
 
 
-def insert_story(generated_story: StoryGeneration, level: int) -> StoryTable:
-    mysql_writer = MysqlClientWriter(logger)
-    mysql_writer.start_transaction()
-    try:
-        story = StoryTable(
+def insert_story(
+    sqlite: SQLiteClient, generated_story: StoryGeneration, level: int
+) -> Stories:
+    with sqlite.transaction():
+        story = Stories(
             title=generated_story.title,
             text=generated_story.text,
             source="wanikani",
         )
-        mysql_writer.insert_one(table=StoryTable, to_insert=story)
+        sqlite.insert_one(table=Stories, to_insert=story)
         logger.info(f"Inserted {story=}")
 
-        wanikani_story = WanikaniStoryTable(storyId=story.id, level=level)
-        mysql_writer.insert_one(table=WanikaniStoryTable, to_insert=wanikani_story)
+        wanikani_story = WanikaniStories(story_id=story.id, level=level)
+        sqlite.insert_one(table=WanikaniStories, to_insert=wanikani_story)
         logger.info(f"Inserted {wanikani_story=}")
 
-        mysql_writer.commit()
-        return story
-    except Exception:
-        mysql_writer.rollback()
-        raise
+    return story
 
 
 def insert_audio_metadata(
-    story: StoryTable,
+    sqlite: SQLiteClient,
+    story: Stories,
     audio_file_dest: str,
     speed_percentage: int,
     speaker_id: int,
-) -> StoryTable:
-    mysql_writer = MysqlClientWriter(logger)
-    mysql_writer.start_transaction()
-    try:
-
-        audio = AudioTable(url="default/" + audio_file_dest)
-        mysql_writer.insert_one(table=AudioTable, to_insert=audio)
+) -> Stories:
+    with sqlite.transaction():
+        audio = Audios(url=audio_file_dest)
+        sqlite.insert_one(table=Audios, to_insert=audio)
         logger.info(f"Inserted {audio=}")
 
-        story_audio = StoryAudioTable(
-            storyId=story.id,
-            audioId=audio.id,
-            speedPercentage=speed_percentage,
-            speakerId=speaker_id,
+        story_audio = StoryAudios(
+            story_id=story.id,
+            audio_id=audio.id,
+            speed_percentage=speed_percentage,
+            speaker_id=speaker_id,
         )
-        mysql_writer.insert_one(table=StoryAudioTable, to_insert=story_audio)
+        sqlite.insert_one(table=StoryAudios, to_insert=story_audio)
         logger.info(f"Inserted {story_audio=}")
 
-        mysql_writer.commit()
-        return story
-    except Exception:
-        mysql_writer.rollback()
-        raise
+    return story
 
 
 def chunkify_story(generated_story: StoryGeneration) -> list[str]:
@@ -109,7 +98,7 @@ def chunkify_story(generated_story: StoryGeneration) -> list[str]:
 
 
 def gen_and_store_chunks(
-    story_chunks: list[StoryChunkTable],
+    story_chunks: list[StoryChunks],
     generator: AudioGenerator,
     speed_percentage: int,
     speaker_id: int,
@@ -127,51 +116,39 @@ def gen_and_store_chunks(
 
 
 def insert_story_chunk(
-    story: StoryTable,
+    sqlite: SQLiteClient,
+    story: Stories,
     text: str,
     position: int,
-) -> StoryChunkTable:
-    mysql_writer = MysqlClientWriter(logger)
-    mysql_writer.start_transaction()
-    try:
-        story_chunk = StoryChunkTable(
-            storyId=story.id,
-            text=text,
-            position=position,
-        )
-        mysql_writer.insert_one(table=StoryChunkTable, to_insert=story_chunk)
-        logger.info(f"Inserted {story_chunk=}")
+) -> StoryChunks:
+    story_chunk = StoryChunks(
+        story_id=story.id,
+        text=text,
+        position=position,
+    )
+    sqlite.insert_one(table=StoryChunks, to_insert=story_chunk)
+    logger.info(f"Inserted {story_chunk=}")
 
-        mysql_writer.commit()
-        return story_chunk
-    except Exception:
-        mysql_writer.rollback()
-        raise
+    return story_chunk
 
 
 def insert_audio_chunk_metadata(
-    story_chunk: StoryChunkTable,
+    sqlite: SQLiteClient,
+    story_chunk: StoryChunks,
     audio_chunk: AudioChunk,
     speed_percentage: int,
     speaker_id: int,
 ) -> None:
-    mysql_writer = MysqlClientWriter(logger)
-    mysql_writer.start_transaction()
-    try:
-        audio = AudioTable(url="default/" + audio_chunk.audio_path)
-        mysql_writer.insert_one(table=AudioTable, to_insert=audio)
+    with sqlite.transaction():
+        audio = Audios(url=audio_chunk.audio_path)
+        sqlite.insert_one(table=Audios, to_insert=audio)
         logger.info(f"Inserted {audio=}")
 
-        story_chunk_audio = StoryChunkAudioTable(
-            storyChunkId=story_chunk.id,
-            audioId=audio.id,
-            speedPercentage=speed_percentage,
-            speakerId=speaker_id,
+        story_chunk_audio = StoryChunkAudios(
+            story_chunk_id=story_chunk.id,
+            audio_id=audio.id,
+            speed_percentage=speed_percentage,
+            speaker_id=speaker_id,
         )
-        mysql_writer.insert_one(table=StoryChunkAudioTable, to_insert=story_chunk_audio)
+        sqlite.insert_one(table=StoryChunkAudios, to_insert=story_chunk_audio)
         logger.info(f"Inserted {story_chunk_audio=}")
-
-        mysql_writer.commit()
-    except Exception:
-        mysql_writer.rollback()
-        raise
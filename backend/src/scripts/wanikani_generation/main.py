@@ -2,9 +2,10 @@ import json
 import os
 import random
 
-from src.config.runtime import path_config
+from src.clients.sqlite import SQLiteClient
+from src.config.path import path_config
 from src.logger import get_logger
-from src.models.database import StoryTable, WanikaniStoryTable
+from src.models.database import Stories, WanikaniStories
 from src.modules.audio_generator import AudioGenerator, StoryGeneration
 
 from .core import (
@@ -32,6 +33,7 @@ def gen_with_gpt(
     assert 1 <= level_to <= 60
 
     generator = AudioGenerator(logger)
+    sqlite = SQLiteClient(logger, write_content=True)
 
     logger.info(f"Starting wanikani stories generations: ({level_from=}, {level_to=})")
     for level in range(level_from, level_to + 1):
@@ -46,13 +48,21 @@ def gen_with_gpt(
             generated_story = generator.generate_story(local_vocs)
             logger.info(f"Generated story of {level=}, {generated_story=}")
 
-            story = insert_story(generated_story=generated_story, level=level)
             story_chunks_str = chunkify_story(generated_story)
             logger.info(f"Chunkified in: {story_chunks_str=}")
-            story_chunks = [
-                insert_story_chunk(story=story, text=chunk_str, position=position + 1)
-                for position, chunk_str in enumerate(story_chunks_str)
-            ]
+            with sqlite.transaction():
+                story = insert_story(
+                    sqlite=sqlite, generated_story=generated_story, level=level
+                )
+                story_chunks = [
+                    insert_story_chunk(
+                        sqlite=sqlite,
+                        story=story,
+                        text=chunk_str,
+                        position=position + 1,
+                    )
+                    for position, chunk_str in enumerate(story_chunks_str)
+                ]
 
             for speed_percentage in speed_percentages:
                 audio_file_dest = gen_and_store_text_audio(
@@ -66,6 +76,7 @@ def gen_with_gpt(
                 )
 
                 insert_audio_metadata(
+                    sqlite=sqlite,
                     story=story,
                     audio_file_dest=audio_file_dest,
                     speed_percentage=speed_percentage,
@@ -78,13 +89,17 @@ def gen_with_gpt(
                     speed_percentage=speed_percentage,
                     speaker_id=speaker_id,
                 )
-                for audio_chunk, story_chunk in zip(audio_chunks, story_chunks):
-                    insert_audio_chunk_metadata(
-                        story_chunk=story_chunk,
-                        audio_chunk=audio_chunk,
-                        speed_percentage=speed_percentage,
-                        speaker_id=speaker_id,
-                    )
+                # The audios are generated beforehand, the transaction only holds the write lock
+                # for the inserts, in a single commit instead of one per chunk
+                with sqlite.transaction():
+                    for audio_chunk, story_chunk in zip(audio_chunks, story_chunks):
+                        insert_audio_chunk_metadata(
+                            sqlite=sqlite,
+                            story_chunk=story_chunk,
+                            audio_chunk=audio_chunk,
+                            speed_percentage=speed_percentage,
+                            speaker_id=speaker_id,
+                        )
 
 
 def gen_using_seed(
@@ -92,38 +107,44 @@ def gen_using_seed(
     speaker_id: int = 27,
 ) -> None:
     generator = AudioGenerator(logger)
+    sqlite = SQLiteClient(logger, write_content=True)
 
     logger.info(
         f"Starting wanikani stories generations from seed. Loading existing stories."
     )
 
-    with open(path_config.seed_db / "wanikani_story.json", "r") as f:
+    with open(path_config.seed_db / "wanikani_stories.json", "r") as f:
         wanikani_stories_json = json.load(f)
-        wanikani_stories = [WanikaniStoryTable(**s) for s in wanikani_stories_json]
+        wanikani_stories = [WanikaniStories(**s) for s in wanikani_stories_json]
 
-    with open(path_config.seed_db / "story.json", "r") as f:
+    with open(path_config.seed_db / "stories.json", "r") as f:
         stories_json = json.load(f)
-        stories = [StoryTable(**s) for s in stories_json]
+        stories = [Stories(**s) for s in stories_json]
         story_id_to_story_map = {s.id: s for s in stories}
 
     logger.info(f"Loaded {len(wanikani_stories)=}")
 
     for wanikani_story in wanikani_stories:
-        story = story_id_to_story_map[wanikani_story.storyId]
+        story = story_id_to_story_map[wanikani_story.story_id]
         generated_story = StoryGeneration(
             input_vocabulary_list=list(), text=story.text, title=story.title
         )
         logger.info(f"Got the story {generated_story=}")
 
-        story = insert_story(
-            generated_story=generated_story, level=wanikani_story.level
-        )
         story_chunks_str = chunkify_story(generated_story)
         logger.info(f"Chunkified in: {story_chunks_str=}")
-        story_chunks = [
-            insert_story_chunk(story=story, text=chunk_str, position=position + 1)
-            for position, chunk_str in enumerate(story_chunks_str)
-        ]
+        with sqlite.transaction():
+            story = insert_story(
+                sqlite=sqlite,
+                generated_story=generated_story,
+                level=wanikani_story.level,
+            )
+            story_chunks = [
+                insert_story_chunk(
+                    sqlite=sqlite, story=story, text=chunk_str, position=position + 1
+                )
+                for position, chunk_str in enumerate(story_chunks_str)
+            ]
 
         for speed_percentage in speed_percentages:
             audio_file_dest = gen_and_store_text_audio(
@@ -137,6 +158,7 @@ def gen_using_seed(
             )
 
             insert_audio_metadata(
+                sqlite=sqlite,
                 story=story,
                 audio_file_dest=audio_file_dest,
                 speed_percentage=speed_percentage,
@@ -149,10 +171,14 @@ def gen_using_seed(
                 speed_percentage=speed_percentage,
                 speaker_id=speaker_id,
             )
-            for audio_chunk, story_chunk in zip(audio_chunks, story_chunks):
-                insert_audio_chunk_metadata(
-                    story_chunk=story_chunk,
-                    audio_chunk=audio_chunk,
-                    speed_percentage=speed_percentage,
-                    speaker_id=speaker_id,
-                )
+            # The audios are generated beforehand, the transaction only holds the write lock
+            # for the inserts, in a single commit instead of one per chunk
+            with sqlite.transaction():
+                for audio_chunk, story_chunk in zip(audio_chunks, story_chunks):
+                    insert_audio_chunk_metadata(
+                        sqlite=sqlite,
+                        story_chunk=story_chunk,
+                        audio_chunk=audio_chunk,
+                        speed_percentage=speed_percentage,
+                        speaker_id=speaker_id,
+                    )
@@ -0,0 +1,55 @@
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.api import api_router
+from src.clients.sqlite import serve_read_only_from
+from src.config.path import path_config
+from src.modules.boot import boot_status
+
+app = FastAPI()
+app.include_router(api_router)
+
+WANIKANI_URL = "/api/story/wanikani?level=1"
+
+
+class TestConditionalGet(unittest.TestCase):
+    """
+    The content read routes are not cached by the clients while the bundled database is
+    served, the first responses after the hydration would be stale.
+    """
+
+    def setUp(self) -> None:
+        self.client = TestClient(app)
+
+    def tearDown(self) -> None:
+        serve_read_only_from(None)
+        boot_status.set_phase("starting")
+
+    def test_mid_hydration(self) -> None:
+        serve_read_only_from(path_config.bundled_db_file)
+        boot_status.set_phase("serving_bundled")
+
+        response = self.client.get(WANIKANI_URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["cache-control"], "no-store")
+        self.assertNotIn("etag", response.headers)
+
+        response = self.client.get(WANIKANI_URL, headers={"If-None-Match": "*"})
+        self.assertEqual(response.status_code, 200)
+
+    def test_ready(self) -> None:
+        boot_status.set_phase("ready")
+
+        response = self.client.get(WANIKANI_URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["cache-control"], "public, max-age=300")
+
+        response = self.client.get(
+            WANIKANI_URL, headers={"If-None-Match": response.headers["etag"]}
+        )
+        self.assertEqual(response.status_code, 304)
+
+
+if __name__ == "__main__":
+    unittest.main()
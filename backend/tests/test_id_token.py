@@ -0,0 +1,187 @@
+import base64
+import json
+import time
+import unittest
+from unittest import mock
+
+import rsa
+from src.clients.google import GoogleIdTokenVerifier, InvalidTokenError, JwksCache
+from src.clients.google import jwks as jwks_module
+from src.config.google import google_auth_config
+
+AUDIENCE = "client-id.apps.googleusercontent.com"
+MIN_REFRESH_INTERVAL_S = google_auth_config.jwks_min_refresh_interval_s
+
+
+def b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def jwk(kid: str, key: rsa.PublicKey) -> dict:
+    return dict(
+        kty="RSA",
+        use="sig",
+        alg="RS256",
+        kid=kid,
+        n=b64url(key.n.to_bytes((key.n.bit_length() + 7) // 8)),
+        e=b64url(key.e.to_bytes((key.e.bit_length() + 7) // 8)),
+    )
+
+
+def make_token(
+    private_key: rsa.PrivateKey, kid: str, alg: str = "RS256", **claims
+) -> str:
+    now = int(time.time())
+    claims = (
+        dict(
+            iss="https://accounts.google.com",
+            aud=AUDIENCE,
+            sub="1234567890",
+            email="user@example.com",
+            iat=now,
+            exp=now + 3600,
+        )
+        | claims
+    )
+    header_b64 = b64url(json.dumps(dict(alg=alg, kid=kid, typ="JWT")).encode())
+    payload_b64 = b64url(json.dumps(claims).encode())
+    signature = rsa.sign(f"{header_b64}.{payload_b64}".encode(), private_key, "SHA-256")
+    return f"{header_b64}.{payload_b64}.{b64url(signature)}"
+
+
+class StubJwksEndpoint:
+    """
+    Fetcher serving the keys set on it, counting the fetches.
+    """
+
+    def __init__(self, keys: list[dict], max_age_s: int | None = None) -> None:
+        self.keys = keys
+        self.max_age_s = max_age_s
+        self.failing = False
+        self.fetches = 0
+
+    def __call__(self, url: str) -> tuple[dict, dict[str, str]]:
+        self.fetches += 1
+        if self.failing:
+            raise ConnectionError("JWKS endpoint down")
+        headers = dict()
+        if self.max_age_s is not None:
+            headers["Cache-Control"] = f"public, max-age={self.max_age_s}"
+        return dict(keys=list(self.keys)), headers
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class TestGoogleIdTokenVerifier(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.public_a, cls.private_a = rsa.newkeys(1024)
+        cls.public_b, cls.private_b = rsa.newkeys(1024)
+
+    def setUp(self) -> None:
+        self.endpoint = StubJwksEndpoint([jwk("a", self.public_a)], max_age_s=100)
+        self.verifier = GoogleIdTokenVerifier(
+            audience=AUDIENCE, jwks=JwksCache(fetch=self.endpoint, logger=mock.Mock())
+        )
+        self.clock = FakeClock()
+        patcher = mock.patch.object(jwks_module, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assert_invalid(self, token: str) -> None:
+        with self.assertRaises(InvalidTokenError):
+            self.verifier.verify(token)
+
+    def test_valid(self) -> None:
+        claims = self.verifier.verify(make_token(self.private_a, "a"))
+        self.assertEqual(claims["sub"], "1234567890")
+        self.assertEqual(claims["email"], "user@example.com")
+
+    def test_expired(self) -> None:
+        now = int(time.time())
+        self.assert_invalid(
+            make_token(self.private_a, "a", iat=now - 7200, exp=now - 3600)
+        )
+
+    def test_wrong_audience(self) -> None:
+        self.assert_invalid(make_token(self.private_a, "a", aud="other-client-id"))
+
+    def test_wrong_issuer(self) -> None:
+        self.assert_invalid(make_token(self.private_a, "a", iss="https://evil.com"))
+
+    def test_wrong_alg(self) -> None:
+        self.assert_invalid(make_token(self.private_a, "a", alg="HS256"))
+
+    def test_tampered(self) -> None:
+        header_b64, _, signature_b64 = make_token(self.private_a, "a").split(".")
+        _, payload_b64, _ = make_token(self.private_a, "a", sub="someone-else").split(
+            "."
+        )
+        self.assert_invalid(f"{header_b64}.{payload_b64}.{signature_b64}")
+        # Signed by a key the endpoint does not serve under that kid
+        self.assert_invalid(make_token(self.private_b, "a"))
+
+    def test_malformed_kid(self) -> None:
+        header_b64 = b64url(json.dumps(dict(alg="RS256", kid=[1])).encode())
+        _, payload_b64, signature_b64 = make_token(self.private_a, "a").split(".")
+        self.assert_invalid(f"{header_b64}.{payload_b64}.{signature_b64}")
+
+    def test_unknown_kid_refresh(self) -> None:
+        self.verifier.verify(make_token(self.private_a, "a"))
+        self.assertEqual(self.endpoint.fetches, 1)
+
+        # Rotated after the last fetch
+        self.endpoint.keys.append(jwk("b", self.public_b))
+        token_b = make_token(self.private_b, "b")
+        self.clock.now += MIN_REFRESH_INTERVAL_S
+        self.assertEqual(self.verifier.verify(token_b)["sub"], "1234567890")
+        self.assertEqual(self.endpoint.fetches, 2)
+
+    def test_unknown_kid_rate_limited(self) -> None:
+        self.verifier.verify(make_token(self.private_a, "a"))
+        forged = make_token(self.private_b, "forged")
+
+        self.clock.now += MIN_REFRESH_INTERVAL_S
+        self.assert_invalid(forged)
+        self.assertEqual(self.endpoint.fetches, 2)
+        # Within the min interval, no fetch whatever the number of forged tokens
+        for _ in range(10):
+            self.assert_invalid(forged)
+        self.assertEqual(self.endpoint.fetches, 2)
+
+        self.clock.now += MIN_REFRESH_INTERVAL_S
+        self.assert_invalid(forged)
+        self.assertEqual(self.endpoint.fetches, 3)
+
+    def test_max_age_expiry(self) -> None:
+        token = make_token(self.private_a, "a")
+        self.verifier.verify(token)
+        self.clock.now += 99
+        self.verifier.verify(token)
+        self.assertEqual(self.endpoint.fetches, 1)
+
+        self.clock.now += 1
+        self.verifier.verify(token)
+        self.assertEqual(self.endpoint.fetches, 2)
+
+    def test_failed_refresh_keeps_keys(self) -> None:
+        token = make_token(self.private_a, "a")
+        self.verifier.verify(token)
+
+        self.endpoint.failing = True
+        self.clock.now += 100
+        self.assertEqual(self.verifier.verify(token)["sub"], "1234567890")
+        self.assertEqual(self.endpoint.fetches, 2)
+        # Not retried before the min interval
+        self.verifier.verify(token)
+        self.assertEqual(self.endpoint.fetches, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import dataclasses
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import botocore.auth
+from src.clients.aws import S3Client
+from src.config.aws import aws_config
+
+BUCKET = aws_config.s3_buckets.japanese_dictation
+# Spaces, reserved and non ascii characters, the ones the encoding can get wrong
+KEYS = [
+    "audio/00265ca9-1a2e-4506-a109-a633a03d8feb.wav",
+    "audio/a b+c=d&e.ogg",
+    "audio/日本語~テスト.m4a",
+    "database/japanese_dictation_2025-11-15-14-21.sqlite",
+]
+START = datetime(2026, 1, 1, 23, 59, 59, tzinfo=timezone.utc)
+# Across a day change, the signing key changes
+SIGNED_ATS = [START, START + timedelta(seconds=1), START + timedelta(days=40)]
+
+
+class TestS3Presigner(unittest.TestCase):
+    """
+    The urls of S3Client.presigned_url with signed_at are the ones its boto3 client
+    generates at signed_at, byte for byte.
+    """
+
+    def assert_same_urls(self, **config) -> None:
+        # Presigning needs credentials, not the network
+        config = dict(
+            access_key=aws_config.access_key or "AKIDEXAMPLE",
+            secret_access_key=aws_config.secret_access_key
+            or "wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY",
+            **config,
+        )
+        with mock.patch(
+            "src.clients.aws.s3.client.aws_config",
+            dataclasses.replace(aws_config, **config),
+        ):
+            s3 = S3Client()
+        for signed_at in SIGNED_ATS:
+            for key in KEYS:
+                prefix, filename = key.split("/", 1)
+                with mock.patch.object(
+                    botocore.auth, "get_current_datetime", lambda: signed_at
+                ):
+                    expected = s3.client.generate_presigned_url(
+                        ClientMethod="get_object",
+                        Params=dict(Bucket=BUCKET, Key=key),
+                        ExpiresIn=aws_config.presigned_url_expires_in_s,
+                    )
+                url = s3.presigned_url(
+                    bucket=BUCKET,
+                    prefix=prefix,
+                    filename=filename,
+                    expires_in_s=aws_config.presigned_url_expires_in_s,
+                    signed_at=signed_at,
+                )
+                self.assertEqual(url, expected)
+        s3.close()
+
+    def test_aws(self) -> None:
+        self.assert_same_urls(endpoint_url=None)
+
+    def test_other_region(self) -> None:
+        self.assert_same_urls(endpoint_url=None, region="eu-west-3")
+
+    def test_custom_endpoint(self) -> None:
+        self.assert_same_urls(endpoint_url="http://localhost:9000")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import gzip
+import sqlite3
+import time
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from src.modules.replication import (
+    LocalDirStorage,
+    ReplicaNotFoundError,
+    Replicator,
+    restore,
+)
+from src.modules.replication.format import ReplicaKey, apply_delta, encode_delta
+
+
+class TestDeltaFormat(unittest.TestCase):
+    def test_apply_delta(self) -> None:
+        page_size = 4
+        db = bytearray(b"aaaabbbbcccc")
+        # Page 2 changed, page 4 added
+        apply_delta(db, encode_delta(page_size, 4, [(2, b"BBBB"), (4, b"dddd")]))
+        self.assertEqual(db, bytearray(b"aaaaBBBBccccdddd"))
+        # Truncated back to 2 pages, by a vacuum
+        apply_delta(db, encode_delta(page_size, 2, [(1, b"AAAA")]))
+        self.assertEqual(db, bytearray(b"AAAABBBB"))
+
+    def test_not_a_delta(self) -> None:
+        with self.assertRaises(ValueError):
+            apply_delta(bytearray(), gzip.compress(b"NOPE" + bytes(12)))
+
+
+class TestReplication(unittest.TestCase):
+    """
+    Replicates a database to a LocalDirStorage and restores it at several points in time.
+    """
+
+    def setUp(self) -> None:
+        tmp_dir = TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.root = Path(tmp_dir.name)
+        self.db_file = self.root / "localdb.sqlite"
+        self.storage = LocalDirStorage(self.root / "replica")
+
+        self.conn = sqlite3.connect(self.db_file, isolation_level=None)
+        self.addCleanup(self.conn.close)
+        self.conn.execute("PRAGMA journal_mode = WAL;")
+        self.conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, text TEXT);")
+        # Pages left untouched by the writes, not shipped again in the deltas
+        self.conn.execute("CREATE TABLE padding (text TEXT);")
+        self.conn.executemany(
+            "INSERT INTO padding (text) VALUES (?);", [("padding " * 500,)] * 50
+        )
+
+        self.replicator = Replicator(
+            self.db_file,
+            self.storage,
+            logger=mock.Mock(),
+            compact_every_deltas=2,
+            compact_every_s=3600,
+            retained_generations=2,
+        )
+        self.addCleanup(self.replicator.close)
+
+    def write(self, *ids: int) -> None:
+        # Large enough rows to span several pages
+        self.conn.executemany(
+            "INSERT INTO notes (id, text) VALUES (?, ?);",
+            [(i, f"note {i} " * 500) for i in ids],
+        )
+
+    def sync(self):
+        report = self.replicator.sync()
+        # Replica keys have a millisecond resolution
+        time.sleep(0.01)
+        return report
+
+    def checkpoint(self) -> datetime:
+        at = datetime.now()
+        time.sleep(0.01)
+        return at
+
+    def restored_ids(self, at: datetime | None = None) -> list[int]:
+        dst_file = self.root / "restored.sqlite"
+        restore(self.storage, dst_file, at=at, logger=mock.Mock())
+        conn = sqlite3.connect(dst_file)
+        try:
+            self.assertEqual(
+                conn.execute("PRAGMA integrity_check;").fetchone()[0], "ok"
+            )
+            return [r[0] for r in conn.execute("SELECT id FROM notes ORDER BY id;")]
+        finally:
+            conn.close()
+
+    def generations(self) -> list[list[ReplicaKey]]:
+        keys = [ReplicaKey.parse(k) for k in self.storage.list_keys("generations/")]
+        return [
+            sorted((k for k in keys if k.generation == g), key=lambda k: k.sequence)
+            for g in sorted({k.generation for k in keys})
+        ]
+
+    def test_sync_compact_and_restore(self) -> None:
+        before_any = self.checkpoint()
+        self.write(1)
+        self.assertEqual(self.sync().sequence, 0)
+        self.assertIsNone(self.sync())
+
+        self.write(2)
+        delta = self.sync()
+        self.assertEqual(delta.sequence, 1)
+        self.assertLess(delta.changed_pages, delta.pages)
+        after_2 = self.checkpoint()
+
+        self.write(3, 4)
+        self.assertEqual(self.sync().sequence, 2)
+        after_4 = self.checkpoint()
+
+        # Compacted into the base snapshot of a new generation
+        self.write(5)
+        self.assertEqual(self.sync().sequence, 0)
+        self.conn.execute("DELETE FROM notes WHERE id = 1;")
+        self.assertEqual(self.sync().sequence, 1)
+
+        generations = self.generations()
+        self.assertEqual(
+            [[k.sequence for k in g] for g in generations], [[0, 1, 2], [0, 1]]
+        )
+
+        self.assertEqual(self.restored_ids(after_2), [1, 2])
+        self.assertEqual(self.restored_ids(after_4), [1, 2, 3, 4])
+        self.assertEqual(self.restored_ids(), [2, 3, 4, 5])
+        with self.assertRaises(ReplicaNotFoundError):
+            self.restored_ids(before_any)
+
+    def test_expired_generations_deleted(self) -> None:
+        for i in range(1, 8):
+            self.write(i)
+            self.sync()
+        # 7 syncs of 3 per generation, the oldest of the 3 generations is deleted
+        self.assertEqual(
+            [[k.sequence for k in g] for g in self.generations()], [[0, 1, 2], [0]]
+        )
+        self.assertEqual(self.restored_ids(), list(range(1, 8)))
+        # Older than the generations kept
+        first_kept = self.generations()[0][0].timestamp_ms / 1000
+        with self.assertRaises(ReplicaNotFoundError):
+            self.restored_ids(datetime.fromtimestamp(first_kept) - timedelta(seconds=1))
+
+
+if __name__ == "__main__":
+    unittest.main()
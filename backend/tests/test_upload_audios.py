@@ -0,0 +1,151 @@
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from src.scripts.s3_upload_audios import core
+
+BUCKET = "japanese-dictation"
+KEY_PREFIX = "audio"
+
+
+class StubS3Client:
+    """
+    Keeps the uploaded contents per key, the uploads of the names in failing raise.
+    """
+
+    objects: dict[str, bytes] = dict()
+    uploads: list[str] = list()
+    failing: set[str] = set()
+
+    def upload_file(
+        self, src_filepath: Path, bucket: str, key_prefix: str, transfer_config=None
+    ) -> None:
+        if src_filepath.name in self.failing:
+            raise ConnectionError(f"upload of {src_filepath.name} failed")
+        key = f"{bucket}/{key_prefix}/{src_filepath.name}"
+        self.objects[key] = src_filepath.read_bytes()
+        self.uploads.append(key)
+
+    def close(self) -> None:
+        pass
+
+
+class FailingProgress:
+    """
+    tqdm stand-in raising on its n-th update, as an interruption of the run would.
+    """
+
+    def __init__(self, fail_at: int) -> None:
+        self.fail_at = fail_at
+        self.updates = 0
+
+    def __call__(self, *args, **kwargs) -> "FailingProgress":
+        return self
+
+    def __enter__(self) -> "FailingProgress":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+    def update(self) -> None:
+        self.updates += 1
+        if self.updates == self.fail_at:
+            raise KeyboardInterrupt
+
+
+class TestUploadFiles(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp_dir = TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.audio_dir = Path(tmp_dir.name) / "audio_files"
+        self.audio_dir.mkdir()
+        self.manifest_file = Path(tmp_dir.name) / "manifest.json"
+        self.files = list()
+        for i in range(10):
+            path = self.audio_dir / f"{i:02d}.wav"
+            path.write_bytes(f"audio {i}".encode() * 100)
+            self.files.append(path)
+
+        StubS3Client.objects = dict()
+        StubS3Client.uploads = list()
+        StubS3Client.failing = set()
+        patcher = mock.patch.object(core, "S3Client", StubS3Client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def upload(self, files: list[Path] | None = None):
+        return core.upload_files(
+            files=self.files if files is None else files,
+            bucket=BUCKET,
+            key_prefix=KEY_PREFIX,
+            manifest_file=self.manifest_file,
+            max_workers=4,
+        )
+
+    def test_first_run_uploads_everything(self) -> None:
+        report = self.upload()
+        self.assertEqual(
+            (report.uploaded, report.skipped, report.failed), (len(self.files), 0, 0)
+        )
+        self.assertEqual(
+            report.uploaded_bytes, sum(f.stat().st_size for f in self.files)
+        )
+        for path in self.files:
+            self.assertEqual(
+                StubS3Client.objects[f"{BUCKET}/{KEY_PREFIX}/{path.name}"],
+                path.read_bytes(),
+            )
+
+    def test_second_run_skips_everything(self) -> None:
+        self.upload()
+        report = self.upload()
+        self.assertEqual(
+            (report.uploaded, report.skipped, report.failed), (0, len(self.files), 0)
+        )
+        self.assertEqual(len(StubS3Client.uploads), len(self.files))
+
+    def test_changed_content_uploaded_again(self) -> None:
+        self.upload()
+        changed = self.files[3]
+        changed.write_bytes(b"new audio")
+        report = self.upload()
+        self.assertEqual((report.uploaded, report.skipped), (1, len(self.files) - 1))
+        self.assertEqual(
+            StubS3Client.objects[f"{BUCKET}/{KEY_PREFIX}/{changed.name}"], b"new audio"
+        )
+
+    def test_failed_upload_retried_next_run(self) -> None:
+        StubS3Client.failing = {self.files[5].name}
+        report = self.upload()
+        self.assertEqual(
+            (report.uploaded, report.skipped, report.failed),
+            (len(self.files) - 1, 0, 1),
+        )
+
+        StubS3Client.failing = set()
+        report = self.upload()
+        self.assertEqual(
+            (report.uploaded, report.skipped, report.failed),
+            (1, len(self.files) - 1, 0),
+        )
+        self.assertEqual(StubS3Client.uploads[-1], f"{BUCKET}/{KEY_PREFIX}/05.wav")
+
+    def test_manifest_saved_on_exception(self) -> None:
+        with mock.patch.object(core, "tqdm", FailingProgress(fail_at=3)):
+            with self.assertRaises(KeyboardInterrupt):
+                self.upload()
+        uploaded = len(StubS3Client.uploads)
+        self.assertGreater(uploaded, 0)
+        self.assertFalse(self.manifest_file.with_suffix(".tmp").exists())
+
+        # Only what the interrupted run did not upload is sent
+        report = self.upload()
+        self.assertEqual(report.skipped, uploaded)
+        self.assertEqual(report.uploaded, len(self.files) - uploaded)
+        self.assertEqual(len(StubS3Client.uploads), len(self.files))
+
+
+if __name__ == "__main__":
+    unittest.main()
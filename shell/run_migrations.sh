@@ -4,4 +4,5 @@ backend_dir=backend
 cd "$backend_dir" || exit 1
 
 venv_dir=../.venv
-"$venv_dir/bin/yoyo" apply --batch
\ No newline at end of file
+"$venv_dir/bin/yoyo" apply --batch --config yoyo.ini
+"$venv_dir/bin/yoyo" apply --batch --config yoyo_user.ini